@@ -10,6 +10,8 @@ The database package exports the following classes and exceptions:
 
     :classes:
         - Database
+        - IngestReport
+        - DownloadReport
     :exceptions:
         - EntryAlreadyAddedError
         - NoSuchEntryError
@@ -27,11 +29,13 @@ from __future__ import absolute_import
 
 from sunpy.database.database import Database, EntryAlreadyAddedError,\
     EntryAlreadyStarredError, EntryAlreadyUnstarredError, NoSuchTagError,\
-    EntryNotFoundError, TagAlreadyAssignedError, disable_undo, split_database
+    EntryNotFoundError, TagAlreadyAssignedError, disable_undo, split_database,\
+    IngestReport, DownloadReport
 from sunpy.database.commands import NoSuchEntryError, NonRemovableTagError
 
 __all__ = [
-    'Database', 'EntryAlreadyAddedError', 'NoSuchEntryError', 'NoSuchTagError',
-    'NonRemovableTagError', 'EntryAlreadyStarredError',
-    'EntryAlreadyUnstarredError', 'EntryNotFoundError',
-    'TagAlreadyAssignedError', 'disable_undo', 'split_database']
+    'Database', 'IngestReport', 'DownloadReport', 'EntryAlreadyAddedError',
+    'NoSuchEntryError', 'NoSuchTagError', 'NonRemovableTagError',
+    'EntryAlreadyStarredError', 'EntryAlreadyUnstarredError',
+    'EntryNotFoundError', 'TagAlreadyAssignedError', 'disable_undo',
+    'split_database']
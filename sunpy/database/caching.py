@@ -5,6 +5,8 @@
 
 from __future__ import absolute_import
 
+import sys
+import threading
 from abc import ABCMeta, abstractmethod, abstractproperty
 from collections import MutableMapping, OrderedDict, Counter
 
@@ -23,12 +25,59 @@ class BaseCache(object):
     override the methods ``__getitem__`` and ``__setitem__``.
     Call the method `sunpy.database.caching.BaseCache.callback` as soon
     as an item from the cache is removed.
+
+    The capacity may additionally be given in bytes with ``maxbytes``, in
+    which case the size of every value is determined by the function
+    ``sizeof``. The default, `sys.getsizeof`, only measures the object itself
+    and not the objects it references, so a function which adds up the
+    referenced objects should be given for anything but flat values, e.g.
+    the estimate of :class:`sunpy.database.Database` for database entries.
+    The builtin caches are safe to be shared between threads:
+    every operation holds the reentrant lock ``lock``, which may also be used
+    to group several operations. The number of cache hits, misses and
+    evictions are counted in the attributes `hits`, `misses` and
+    `evictions`.
     """
 
-    def __init__(self, maxsize=float('inf')):
+    def __init__(self, maxsize=float('inf'), maxbytes=None,
+                 sizeof=sys.getsizeof):
         self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.lock = threading.RLock()
+        self.hits = self.misses = self.evictions = 0
+        self._sizes = {}
         self._dict = OrderedDict()
 
+    @property
+    def stats(self):
+        """A dictionary with the number of hits, misses and evictions, the
+        number of items and their size in bytes (if `maxbytes` is set)."""
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions, 'items': len(self),
+                    'nbytes': self.nbytes}
+
+    def _set_size(self, key, value):
+        """Update the size of the cache in bytes for the new value of key."""
+        if self.maxbytes is None:
+            return
+        size = self.sizeof(value)
+        self.nbytes += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+
+    def _must_evict(self, key, value):
+        """True if an item has to be removed before ``value`` can be stored
+        as a new item under ``key``."""
+        if not self._dict:
+            return False
+        if len(self._dict) >= self.maxsize:
+            return True
+        return (self.maxbytes is not None and
+                self.nbytes - self._sizes.get(key, 0) + self.sizeof(value) >
+                self.maxbytes)
+
     def get(self, key, default=None):  # pragma: no cover
         """Return the corresponding value to `key` if `key` is in the cache,
         `default` otherwise. This method has no side-effects, multiple calls
@@ -36,10 +85,11 @@ class BaseCache(object):
         value.
 
         """
-        try:
-            return self._dict[key]
-        except KeyError:
-            return default
+        with self.lock:
+            try:
+                return self._dict[key]
+            except KeyError:
+                return default
 
     @abstractmethod
     def __getitem__(self, key):
@@ -83,23 +133,28 @@ class BaseCache(object):
 
     @property
     def is_full(self):
-        """True if the number of items in the cache equals :attr:`maxsize`,
-        False otherwise.
+        """True if the number of items in the cache equals :attr:`maxsize` or
+        their size reached :attr:`maxbytes`, False otherwise.
 
         """
-        return len(self._dict) == self.maxsize
+        return (len(self._dict) >= self.maxsize or
+                (self.maxbytes is not None and self.nbytes >= self.maxbytes))
 
     def __delitem__(self, key):
-        self._dict.__delitem__(key)
+        with self.lock:
+            self._dict.__delitem__(key)
+            self.nbytes -= self._sizes.pop(key, 0)
 
     def __contains__(self, key):
-        return key in self._dict.keys()
+        return key in self._dict
 
     def __len__(self):
         return len(self._dict)
 
     def __iter__(self):
-        for key in self._dict.__iter__():
+        with self.lock:
+            keys = list(self._dict)
+        for key in keys:
             yield key
 
     def __reversed__(self):  # pragma: no cover
@@ -107,7 +162,10 @@ class BaseCache(object):
             yield key
 
     def clear(self):  # pragma: no cover
-        return self._dict.clear()
+        with self.lock:
+            self._sizes.clear()
+            self.nbytes = 0
+            return self._dict.clear()
 
     def keys(self):  # pragma: no cover
         return list(self._dict.keys())
@@ -133,13 +191,23 @@ class BaseCache(object):
         self._dict.update(*args, **kwds)
 
     def pop(self, key, default=MutableMapping._MutableMapping__marker):  # pragma: no cover
-        return self._dict.pop(key, default)
+        with self.lock:
+            if key in self._dict:
+                value = self._dict[key]
+                del self[key]
+                return value
+            if default is MutableMapping._MutableMapping__marker:
+                raise KeyError(key)
+            return default
 
     def setdefault(self, key, default=None):  # pragma: no cover
         return self._dict.setdefault(key, default)
 
     def popitem(self, last=True):  # pragma: no cover
-        return self._dict.popitem(last)
+        with self.lock:
+            key, value = self._dict.popitem(last)
+            self.nbytes -= self._sizes.pop(key, 0)
+            return key, value
 
     def __reduce__(self):  # pragma: no cover
         return self._dict.__reduce__()
@@ -180,11 +248,15 @@ class LRUCache(BaseCache):
         tuple.
 
         """
-        return six.next(self.iteritems())
+        with self.lock:
+            return six.next(six.iteritems(self._dict))
 
     def remove(self):
         """Remove the least recently used item."""
-        self.callback(*self.popitem(last=False))
+        with self.lock:
+            key, value = self.popitem(last=False)
+            self.evictions += 1
+        self.callback(key, value)
 
     def __getitem__(self, key):
         """Returns the value which is associated to the given key and put it
@@ -196,12 +268,15 @@ class LRUCache(BaseCache):
             If the key cannot be found in the cache.
 
         """
-        if key in self:
-            value = self._dict.__getitem__(key)
-            del self[key]
+        with self.lock:
+            try:
+                value = self._dict.pop(key)
+            except KeyError:
+                self.misses += 1
+                raise
             self._dict.__setitem__(key, value)
+            self.hits += 1
             return value
-        raise KeyError
 
     def __setitem__(self, key, value):
         """If the key does already exist in the cache, move it to the end of
@@ -210,20 +285,87 @@ class LRUCache(BaseCache):
         inserting the new key-value pair.
 
         """
-        if key in self:
-            del self[key]
-        if self.is_full:
-            self.remove()
-        self._dict.__setitem__(key, value)
+        with self.lock:
+            if key in self:
+                del self[key]
+            while self._must_evict(key, value):
+                self.remove()
+            self._dict.__setitem__(key, value)
+            self._set_size(key, value)
 
 
 class LFUCache(BaseCache):
     """
     LFUCache
+
+    The items are kept in buckets of equal access frequency, which are linked
+    in the order of their frequencies, so that reading, inserting, evicting
+    and deleting an item take constant time. Of several items with the lowest
+    frequency, the one which reached it first is removed.
     """
-    def __init__(self, maxsize=float('inf')):
-        self.usage_counter = Counter()
-        BaseCache.__init__(self, maxsize)
+    def __init__(self, maxsize=float('inf'), maxbytes=None,
+                 sizeof=sys.getsizeof):
+        # key -> frequency and frequency -> keys in the order they got it
+        self._frequencies = {}
+        self._buckets = {}
+        # the next lower and higher frequency with keys of every frequency
+        # with keys, or None
+        self._lower = {}
+        self._higher = {}
+        self._min_frequency = None
+        BaseCache.__init__(self, maxsize, maxbytes, sizeof)
+
+    @property
+    def usage_counter(self):
+        """A `~collections.Counter` with the access frequency of every key."""
+        with self.lock:
+            return Counter(self._frequencies)
+
+    def _add(self, key, frequency, lower=None):
+        """Give ``key`` the ``frequency``. ``lower`` is the highest frequency
+        below it which had keys, or None if there was none."""
+        if frequency not in self._buckets:
+            if lower not in self._buckets:
+                # evicted together with all frequencies below it
+                lower = None
+            if lower is None:
+                higher = self._min_frequency
+                self._min_frequency = frequency
+            else:
+                higher = self._higher[lower]
+                self._higher[lower] = frequency
+            if higher is not None:
+                self._lower[higher] = frequency
+            self._lower[frequency] = lower
+            self._higher[frequency] = higher
+            self._buckets[frequency] = OrderedDict()
+        self._buckets[frequency][key] = None
+        self._frequencies[key] = frequency
+
+    def _discard(self, key, frequency):
+        """Remove ``key`` from the bucket of ``frequency``."""
+        bucket = self._buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[frequency]
+            lower = self._lower.pop(frequency)
+            higher = self._higher.pop(frequency)
+            if lower is None:
+                self._min_frequency = higher
+            else:
+                self._higher[lower] = higher
+            if higher is not None:
+                self._lower[higher] = lower
+
+    def _forget(self, key):
+        frequency = self._frequencies.pop(key)
+        self._discard(key, frequency)
+        return frequency
+
+    def _increment(self, key):
+        frequency = self._frequencies[key]
+        self._add(key, frequency + 1, frequency)
+        self._discard(key, frequency)
 
     @property
     def to_be_removed(self):
@@ -231,21 +373,40 @@ class LFUCache(BaseCache):
         corresponding value as a tuple.
 
         """
-        min_ = float('inf')
-        lfu_key = None
-        for k, v in six.iteritems(self.usage_counter):
-            if v < min_:
-                min_ = v
-                lfu_key = k
-        return lfu_key, self.get(lfu_key)
+        with self.lock:
+            if self._min_frequency is None:
+                return None, None
+            lfu_key = six.next(iter(self._buckets[self._min_frequency]))
+            return lfu_key, self._dict[lfu_key]
 
     def remove(self):
         """Remove the least frequently used item."""
-        lfu_key, val = self.to_be_removed
-        del self[lfu_key]
-        del self.usage_counter[lfu_key]
+        with self.lock:
+            lfu_key, val = self.to_be_removed
+            del self[lfu_key]
+            self.evictions += 1
         self.callback(lfu_key, val)
 
+    def __delitem__(self, key):
+        with self.lock:
+            BaseCache.__delitem__(self, key)
+            self._forget(key)
+
+    def clear(self):  # pragma: no cover
+        with self.lock:
+            self._frequencies.clear()
+            self._buckets.clear()
+            self._lower.clear()
+            self._higher.clear()
+            self._min_frequency = None
+            return BaseCache.clear(self)
+
+    def popitem(self, last=True):  # pragma: no cover
+        with self.lock:
+            key, value = BaseCache.popitem(self, last)
+            self._forget(key)
+            return key, value
+
     def __getitem__(self, key):
         """Returns the value which is associated to the given key and
         increments the frequency counter of this key.
@@ -256,9 +417,15 @@ class LFUCache(BaseCache):
             If the key cannot be found in the cache.
 
         """
-        value = self._dict.__getitem__(key)
-        self.usage_counter[key] += 1
-        return value
+        with self.lock:
+            try:
+                value = self._dict.__getitem__(key)
+            except KeyError:
+                self.misses += 1
+                raise
+            self._increment(key)
+            self.hits += 1
+            return value
 
     def __setitem__(self, key, value):
         """Increment the frequency counter of the given key if it is already
@@ -267,7 +434,18 @@ class LFUCache(BaseCache):
         key-value pair.
 
         """
-        self.usage_counter[key] += 1
-        if self.is_full:
-            self.remove()
-        self._dict.__setitem__(key, value)
+        with self.lock:
+            frequency = self._frequencies.get(key, 0)
+            lower = None
+            if key in self._dict:
+                # the highest frequency up to the key's one which keeps keys
+                if len(self._buckets[frequency]) > 1:
+                    lower = frequency
+                else:
+                    lower = self._lower[frequency]
+                del self[key]
+            while self._must_evict(key, value):
+                self.remove()
+            self._dict.__setitem__(key, value)
+            self._set_size(key, value)
+            self._add(key, frequency + 1, lower)
@@ -7,17 +7,19 @@ from __future__ import absolute_import
 
 from abc import ABCMeta, abstractmethod
 import os
+import sys
 
 from sqlalchemy.orm import make_transient
 from sqlalchemy.exc import InvalidRequestError
 
+from sunpy.database import tables
 from sunpy.extern import six
 
 from sunpy.extern.six.moves import range
 
 __all__ = [
     'EmptyCommandStackError', 'NoSuchEntryError', 'NonRemovableTagError',
-    'DatabaseOperation', 'AddEntry', 'RemoveEntry', 'EditEntry',
+    'DatabaseOperation', 'AddEntry', 'AddEntries', 'RemoveEntry', 'EditEntry',
     'CommandManager']
 
 
@@ -67,6 +69,10 @@ class DatabaseOperation(object):
 
     """
 
+    # the value of nbytes when the operation was stored in the history of a
+    # bounded CommandManager
+    _history_nbytes = None
+
     @abstractmethod
     def __call__(self):
         return  # pragma: no cover
@@ -75,6 +81,28 @@ class DatabaseOperation(object):
     def undo(self):
         return  # pragma: no cover
 
+    @property
+    def nbytes(self):
+        """An estimate of the memory in bytes which is kept alive by this
+        operation while it is stored in the undo or redo history."""
+        return sum(_entry_nbytes(value) for key, value in vars(self).items()
+                   if key != '_history_nbytes')
+
+
+def _entry_nbytes(value):
+    """Estimate the memory used by a database entry (including its FITS header
+    entries) or by another value referenced by an operation."""
+    entries = getattr(value, 'fits_header_entries', None)
+    if entries is None:
+        return sys.getsizeof(value)
+    size = sys.getsizeof(value)
+    for column in value.__table__.columns:
+        size += sys.getsizeof(getattr(value, column.key))
+    for entry in list(entries) + list(value.fits_key_comments):
+        size += (sys.getsizeof(entry) + sys.getsizeof(entry.key) +
+                 sys.getsizeof(entry.value))
+    return size
+
 
 class CompositeOperation(DatabaseOperation):
     def __init__(self, operations=None):
@@ -107,6 +135,10 @@ class CompositeOperation(DatabaseOperation):
     def __len__(self):
         return len(self._operations)
 
+    @property
+    def nbytes(self):
+        return sum(operation.nbytes for operation in self._operations)
+
 
 class AddEntry(DatabaseOperation):
     """Add a new database entry to this session. It is not checked whether an
@@ -142,6 +174,108 @@ class AddEntry(DatabaseOperation):
             self.__class__.__name__, self.session, self.database_entry.id)
 
 
+class AddEntries(DatabaseOperation):
+    """Add many database entries to the session at once. Unlike a
+    :class:`CompositeOperation` of :class:`AddEntry` operations, this
+    operation does not keep the entries alive: when it is called, the entries
+    are flushed to the database to assign their IDs and only their column
+    values, FITS header entries, key comments and tag names are kept as plain
+    tuples. The ``undo`` method deletes the rows by their IDs and calling the
+    operation again inserts the saved rows again.
+
+    """
+    def __init__(self, session, database_entries):
+        self.session = session
+        self.database_entries = list(database_entries)
+        self.rows = None
+
+    def __call__(self):
+        if self.rows is None:
+            for database_entry in self.database_entries:
+                try:
+                    self.session.add(database_entry)
+                except InvalidRequestError:
+                    # the entry was removed from a database -> send it back
+                    # to the transient state, see AddEntry
+                    make_transient(database_entry)
+                    self.session.add(database_entry)
+            self.session.flush()
+            self.columns = [column.key for column in
+                            tables.DatabaseEntry.__table__.columns]
+            rows = {}
+            for entry in self.database_entries:
+                rows[entry.id] = (
+                    tuple(getattr(entry, column) for column in self.columns),
+                    tuple((h.key, h.value) for h in entry.fits_header_entries),
+                    tuple((c.key, c.value) for c in entry.fits_key_comments),
+                    tuple(tag.name for tag in entry.tags))
+            self.rows = [rows[entry_id] for entry_id in sorted(rows)]
+            self.database_entries = None
+            return
+        entry_rows, header_rows, comment_rows, tag_rows = [], [], [], []
+        for values, headers, comments, tag_names in self.rows:
+            row = dict(zip(self.columns, values))
+            entry_rows.append(row)
+            header_rows.extend({'dbentry_id': row['id'], 'key': key,
+                                'value': value} for key, value in headers)
+            comment_rows.extend({'dbentry_id': row['id'], 'key': key,
+                                 'value': value} for key, value in comments)
+            tag_rows.extend({'tag_name': name, 'entry_id': row['id']}
+                            for name in tag_names)
+        self.session.bulk_insert_mappings(tables.DatabaseEntry, entry_rows)
+        self.session.bulk_insert_mappings(tables.FitsHeaderEntry, header_rows)
+        self.session.bulk_insert_mappings(tables.FitsKeyComment, comment_rows)
+        if tag_rows:
+            names = set(row['tag_name'] for row in tag_rows)
+            existing = set(name for name, in self.session.query(
+                tables.Tag.name).filter(tables.Tag.name.in_(names)))
+            self.session.bulk_insert_mappings(
+                tables.Tag, [{'name': name} for name in names - existing])
+            self.session.execute(tables.association_table.insert(), tag_rows)
+
+    @property
+    def ids(self):
+        """The IDs of the added entries."""
+        index = self.columns.index('id')
+        return [values[index] for values, _, _, _ in self.rows]
+
+    def undo(self):
+        ids = self.ids
+        tag_names = set(name for row in self.rows for name in row[3])
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            for table in (tables.FitsHeaderEntry, tables.FitsKeyComment):
+                self.session.query(table).filter(
+                    table.dbentry_id.in_(chunk)).delete(
+                        synchronize_session='fetch')
+            self.session.execute(tables.association_table.delete().where(
+                tables.association_table.c.entry_id.in_(chunk)))
+            self.session.query(tables.DatabaseEntry).filter(
+                tables.DatabaseEntry.id.in_(chunk)).delete(
+                    synchronize_session='fetch')
+        if tag_names:
+            # remove the tags which are not assigned to any entry anymore
+            used = self.session.query(tables.association_table.c.tag_name)
+            self.session.query(tables.Tag).filter(
+                tables.Tag.name.in_(tag_names), ~tables.Tag.name.in_(used)
+            ).delete(synchronize_session='fetch')
+
+    @property
+    def nbytes(self):
+        if self.rows is None:
+            return sum(map(_entry_nbytes, self.database_entries))
+        size = sys.getsizeof(self.rows)
+        for row in self.rows:
+            for part in row:
+                size += sys.getsizeof(part) + sum(map(sys.getsizeof, part))
+        return size
+
+    def __repr__(self):
+        return '<{0}(session {1!r}, {2} entries)>'.format(
+            self.__class__.__name__, self.session,
+            len(self.rows if self.rows is not None else self.database_entries))
+
+
 class RemoveEntry(DatabaseOperation):
     """Remove the given database entry from the session. If it cannot be
     removed, because it is not stored in the session,
@@ -292,10 +426,42 @@ class CommandManager(object):
     instead, use the methods ``push_undo_command``, ``pop_undo_command``,
     ``push_redo_command``, and ``pop_redo_command``, respectively.
 
+    The history can be bounded by the number of commands with ``max_depth``
+    and by the estimated memory kept alive by the commands (see
+    :attr:`DatabaseOperation.nbytes`) with ``max_bytes``. If a new command
+    exceeds one of the limits, the oldest commands are dropped from the
+    history so that they cannot be undone anymore.
+
     """
-    def __init__(self):
+    def __init__(self, max_depth=None, max_bytes=None):
         self.undo_commands = []
         self.redo_commands = []
+        self.max_depth = max_depth
+        self.max_bytes = max_bytes
+
+    @property
+    def nbytes(self):
+        """The estimated memory in bytes kept alive by the histories."""
+        return sum(map(self._size, self.undo_commands + self.redo_commands))
+
+    def _size(self, command):
+        """Return the size of the command, which is estimated only once and
+        stored with the command."""
+        size = getattr(command, '_history_nbytes', None)
+        if size is None:
+            size = command._history_nbytes = command.nbytes
+        return size
+
+    def _trim(self):
+        """Drop the oldest commands until the history fits into its limits.
+        The last executed command is always kept."""
+        if self.max_depth is not None:
+            while len(self.undo_commands) > max(self.max_depth, 1):
+                self.undo_commands.pop(0)
+        if self.max_bytes is not None:
+            total = sum(map(self._size, self.undo_commands + self.redo_commands))
+            while len(self.undo_commands) > 1 and total > self.max_bytes:
+                total -= self._size(self.undo_commands.pop(0))
 
     def clear_histories(self):
         """Clears all entries from the undo and redo history. If one or
@@ -306,8 +472,12 @@ class CommandManager(object):
         del self.redo_commands[:]
 
     def push_undo_command(self, command):
-        """Push the given command to the undo command stack."""
+        """Push the given command to the undo command stack, dropping the
+        oldest commands if the history exceeds its limits."""
         self.undo_commands.append(command)
+        if self.max_depth is not None or self.max_bytes is not None:
+            self._size(command)
+            self._trim()
 
     def pop_undo_command(self):
         """Remove the last command from the undo command stack and return it.
@@ -345,6 +515,13 @@ class CommandManager(object):
 
         """
         command()
+        self.record(command)
+
+    def record(self, command):
+        """Save the given command, which has already been executed, in the
+        undo history as if it was executed using the ``do`` method.
+
+        """
         self.push_undo_command(command)
         # clear the redo stack when a new command was executed
         self.redo_commands[:] = []
@@ -6,12 +6,15 @@
 from __future__ import absolute_import, print_function
 
 import itertools
-import operator
+import fnmatch
+from collections import Counter, namedtuple
 from datetime import datetime
 from contextlib import contextmanager
 import os.path
 
-from sqlalchemy import create_engine, exists
+import sqlalchemy
+from sqlalchemy import create_engine, exists, func, inspect, select, \
+    MetaData, Table, Column, Integer, Float
 from sqlalchemy.orm import sessionmaker, scoped_session
 
 from astropy import units
@@ -23,9 +26,12 @@ from sunpy.database.caching import LRUCache
 from sunpy.database.commands import CompositeOperation
 from sunpy.database.attrs import walker
 from sunpy.net.hek2vso import H2VClient
-from sunpy.net.attr import and_
-from sunpy.net.vso import VSOClient
-from sunpy.extern.six.moves import range
+from sunpy.net.attr import and_, AttrAnd
+from sunpy.net.vso import VSOClient, attrs as vso_attrs
+from sunpy.net.download import Downloader
+from sunpy.util.progressbar import TTYProgressBar as ProgressBar
+from sunpy.extern.six.moves import range, map
+from sunpy.extern import six
 
 __authors__ = ['Simon Liedtke', 'Rajul Srivastava']
 __emails__ = [
@@ -117,6 +123,128 @@ class TagAlreadyAssignedError(Exception):
         return errmsg.format(self.database_entry, self.tag_name)
 
 
+# The optional SQLite R*Tree index over the observation time and the
+# wavelength range of the entries. It is kept up to date by triggers, so that
+# bulk operations need not know about it. R*Trees store 32 bit floats which
+# are rounded outwards, so the index is only used to preselect the candidates
+# of a query, which are then filtered exactly. The times are stored as days
+# since _RTREE_EPOCH rather than as Julian days, whose size of about 2.4e6
+# leaves a 32 bit float a resolution of only a quarter of a day; around the
+# epoch it is about 40 seconds for the years of solar data.
+_RTREE_EPOCH = datetime(2000, 1, 1)
+
+_rtree_table = Table('data_rtree', MetaData(),
+                     Column('id', Integer, primary_key=True),
+                     Column('time_start', Float), Column('time_end', Float),
+                     Column('wavemin', Float), Column('wavemax', Float))
+
+
+def _rtree_values(prefix=''):
+    """Return the SQL expressions of the values of an R*Tree row of the entry
+    in the table ``data`` (or in a trigger's ``NEW`` row if ``prefix`` is
+    ``'NEW.'``). 2451544.5 is the Julian day of ``_RTREE_EPOCH``."""
+    return """{0}id, julianday({0}observation_time_start) - 2451544.5,
+    julianday({0}observation_time_end) - 2451544.5,
+    coalesce({0}wavemin, -1e38), coalesce({0}wavemax, 1e38)""".format(prefix)
+
+_RTREE_CONDITION = """{0}observation_time_start IS NOT NULL
+    AND {0}observation_time_end IS NOT NULL"""
+
+_RTREE_DDL = [
+    """CREATE VIRTUAL TABLE data_rtree USING rtree(
+    id, time_start, time_end, wavemin, wavemax)""",
+    """CREATE TRIGGER data_rtree_insert AFTER INSERT ON data BEGIN
+    INSERT INTO data_rtree SELECT {0} WHERE {1}; END""".format(
+        _rtree_values('NEW.'), _RTREE_CONDITION.format('NEW.')),
+    """CREATE TRIGGER data_rtree_update AFTER UPDATE OF observation_time_start,
+    observation_time_end, wavemin, wavemax ON data BEGIN
+    DELETE FROM data_rtree WHERE id = OLD.id;
+    INSERT INTO data_rtree SELECT {0} WHERE {1}; END""".format(
+        _rtree_values('NEW.'), _RTREE_CONDITION.format('NEW.')),
+    """CREATE TRIGGER data_rtree_delete AFTER DELETE ON data BEGIN
+    DELETE FROM data_rtree WHERE id = OLD.id; END""",
+    """INSERT INTO data_rtree SELECT {0} FROM data WHERE {1}""".format(
+        _rtree_values(), _RTREE_CONDITION.format('')),
+]
+
+
+def _rtree_time(time):
+    """Return the time as stored in the R*Tree index, in days since
+    ``_RTREE_EPOCH``."""
+    return (time - _RTREE_EPOCH).total_seconds() / 86400.
+
+
+class DownloadReport(namedtuple('DownloadReport', 'added failed errors')):
+    """The result of a pipelined :meth:`Database.download`.
+
+    Attributes
+    ----------
+    added : list of str
+        The sorted paths of the downloaded files whose entries were saved.
+    failed : list of str
+        The sorted file IDs of the query result records which could not be
+        downloaded or read, or whose entries were already saved.
+    errors : list of Exception
+        The exceptions raised while downloading or reading the files.
+
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return '{0} added, {1} failed'.format(len(self.added),
+                                              len(self.failed))
+
+
+def _bulk_records(pairs):
+    """Turn ``(entry, target)`` pairs into the records inserted by
+    :meth:`Database._bulk_insert`, which sets the ``id`` of ``target`` to the
+    ID of the new row of ``entry``."""
+    columns = [column.key for column in tables.DatabaseEntry.__table__.columns
+               if column.key != 'id']
+    for entry, target in pairs:
+        row = dict((column, getattr(entry, column)) for column in columns)
+        yield (row,
+               [(header.key, header.value)
+                for header in entry.fits_header_entries],
+               [(comment.key, comment.value)
+                for comment in entry.fits_key_comments],
+               [tag.name for tag in entry.tags],
+               target)
+
+
+class _InsertedFlag(object):
+    """Target of the records of all entries of one file, whose ``id`` is set
+    once any of them is inserted."""
+    id = None
+
+
+class IngestReport(namedtuple('IngestReport',
+                              'added updated removed skipped')):
+    """The result of an incremental :meth:`Database.add_from_dir` pass. Each
+    attribute is a sorted list of file paths.
+
+    Attributes
+    ----------
+    added : list of str
+        FITS files which were not indexed before and of which at least one
+        entry was added.
+    updated : list of str
+        Files whose size, modification time or inode changed since the last
+        pass. Their old entries were replaced.
+    removed : list of str
+        Files which no longer exist. Their entries were removed.
+    skipped : list of str
+        Files which are unchanged since the last pass, are no FITS files or
+        whose entries were all already saved.
+
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return '{0} added, {1} updated, {2} removed, {3} skipped'.format(
+            *map(len, self))
+
+
 def split_database(source_database, destination_database, *query_string):
     """
     Queries the source database with the query string, and moves the
@@ -194,7 +322,7 @@ def disable_undo(database):
 
 class Database(object):
     """
-    Database(url[, CacheClass[, cache_size[, default_waveunit]]])
+    Database(url[, CacheClass[, cache_size[, default_waveunit[, rtree[, history_depth[, history_bytes[, cache_bytes]]]]]]])
 
     Parameters
     ----------
@@ -221,6 +349,34 @@ class Database(object):
         is raised. If `None` (the default), attempting to add an entry without knowing
         the wavelength unit results in a
         :exc:`sunpy.database.WaveunitNotFoundError`.
+    rtree : bool, optional
+        If True, an SQLite R*Tree index over the observation time and the
+        wavelength range of the entries is created, which speeds up queries
+        for overlapping time and wavelength ranges. This requires an SQLite
+        database with the R*Tree module. Once created, the index is used
+        whenever the database is opened. The default is False.
+    history_depth : int, optional
+        The maximum number of operations which can be undone. By default the
+        undo history is unlimited.
+    history_bytes : int, optional
+        The maximum estimated memory in bytes kept alive by the undo and redo
+        history. If it is exceeded, the oldest operations are dropped from
+        the history. By default there is no limit.
+    cache_bytes : int, optional
+        The maximum estimated memory in bytes of the database entries in the
+        cache, including their FITS header entries. Like ``cache_size``, it
+        limits the number of entries kept in the database. By default there
+        is no limit.
+
+    Notes
+    -----
+    Indexes which are missing in a database created by an older version of
+    SunPy are added when it is opened.
+
+    Entries added with :meth:`add_many` or :meth:`add_from_dir` are saved in
+    the undo history by the values of their rows, so that the entries
+    themselves can be freed. If more than ``history_bulk_threshold``
+    entries are added at once, the operation is not saved in the history.
     """
     """
     Attributes
@@ -288,14 +444,20 @@ class Database(object):
         Get the number of database entries.
 
     """
+    # add_many and add_from_dir add more entries than this without saving them
+    # in the undo history
+    history_bulk_threshold = 10000
+
     def __init__(self, url=None, CacheClass=LRUCache, cache_size=float('inf'),
-                 default_waveunit=None):
+                 default_waveunit=None, rtree=False, history_depth=None,
+                 history_bytes=None, cache_bytes=None):
         if url is None:
             url = sunpy.config.get('database', 'url')
         self._engine = create_engine(url)
         self._session_cls = sessionmaker(bind=self._engine)
         self.session = scoped_session(self._session_cls)
-        self._command_manager = commands.CommandManager()
+        self._command_manager = commands.CommandManager(
+            history_depth, history_bytes)
         self.default_waveunit = default_waveunit
         if self.default_waveunit is not None:
             try:
@@ -305,18 +467,79 @@ class Database(object):
         self._enable_history = True
 
         class Cache(CacheClass):
+            # The ID the next appended entry gets. It is only recomputed from
+            # the table and the cached keys if it is unknown, e.g. after the
+            # entry with the highest ID was removed.
+            next_id = None
+
             def callback(this, entry_id, database_entry):
                 self.remove(database_entry)
 
+            def __setitem__(this, key, value):
+                CacheClass.__setitem__(this, key, value)
+                if (this.next_id is not None and key is not None and
+                        key >= this.next_id):
+                    this.next_id = key + 1
+
             def append(this, value):
-                try:
-                    this[max(this or [0]) + 1] = value
-                except TypeError:
-                    this[1] = value
+                if this.next_id is None:
+                    # Entries added in bulk or not accessed yet are not
+                    # necessarily cached, so the largest ID in the table has
+                    # to be taken into account too.
+                    with self.session.no_autoflush:
+                        max_id = self.session.query(
+                            func.max(tables.DatabaseEntry.id)).scalar() or 0
+                    keys = [key for key in this if key is not None]
+                    this.next_id = max(keys + [max_id]) + 1
+                this[this.next_id] = value
+
         self._create_tables()
-        self._cache = Cache(cache_size)
+        self._rtree = self._create_rtree(rtree)
+        if cache_bytes is None:
+            self._cache = Cache(cache_size)
+        else:
+            # sys.getsizeof, the default, would ignore the column values and
+            # FITS header entries of the entries
+            self._cache = Cache(cache_size, cache_bytes,
+                                commands._entry_nbytes)
+        # An unlimited cache is filled lazily when entries are accessed. A
+        # limited one decides which entries are removed from the database, so
+        # it has to know all of them.
+        if self._cache_is_limited:
+            self._fill_cache()
+
+    @property
+    def _cache_is_limited(self):
+        """True if the cache has a maximum number of entries or bytes."""
+        return (self._cache.maxsize != float('inf') or
+                self._cache.maxbytes is not None)
+
+    def _fill_cache(self):
+        """Put all entries which are not cached yet into the cache."""
+        cached = set(self._cache)
         for entry in self:
-            self._cache[entry.id] = entry
+            if entry.id not in cached:
+                self._cache[entry.id] = entry
+
+    def _cache_entry(self, database_entry):
+        """Touch the given entry in the cache, adding it if necessary."""
+        try:
+            self._cache[database_entry.id]
+        except KeyError:
+            self._cache[database_entry.id] = database_entry
+
+    def _uncache(self, entry_id):
+        """Remove the entry with the given ID from the cache if it is in it."""
+        try:
+            del self._cache[entry_id]
+        except KeyError:
+            # entry cannot be removed because it was already removed or never
+            # existed in the database. This can be safely ignored, the user
+            # doesn't even know there's a cache here
+            pass
+        if (self._cache.next_id is not None and
+                entry_id is not None and entry_id >= self._cache.next_id - 1):
+            self._cache.next_id = None
 
     @property
     def url(self):
@@ -342,6 +565,8 @@ class Database(object):
         :class:`sunpy.database.caching.LFUCache`).
 
         """
+        if not self._cache_is_limited and cache_size != float('inf'):
+            self._fill_cache()
         cmds = CompositeOperation()
         # remove items from the cache if the given argument is lower than the
         # current cache size
@@ -354,7 +579,7 @@ class Database(object):
                 cmds.add(cmd)
             else:
                 cmd()
-            del self._cache[entry_id]
+            self._uncache(entry_id)
         self._cache.maxsize = cache_size
         if cmds:
             self._command_manager.do(cmds)
@@ -367,6 +592,65 @@ class Database(object):
         """
         metadata = tables.Base.metadata
         metadata.create_all(self._engine, checkfirst=checkfirst)
+        self._create_missing_indexes()
+
+    def _create_missing_indexes(self):
+        """Create the indexes declared on the tables which are missing in an
+        existing database, e.g. because it was created by an older version of
+        SunPy. ``create_all`` only creates indexes together with new tables.
+
+        """
+        inspector = inspect(self._engine)
+        for table in tables.Base.metadata.sorted_tables:
+            existing = set(index['name'] for index in
+                           inspector.get_indexes(table.name))
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(self._engine)
+
+    def _create_rtree(self, create):
+        """Create the R*Tree index if ``create`` is True and it does not exist
+        yet. Return whether the database has an R*Tree index.
+
+        """
+        if _rtree_table.name in inspect(self._engine).get_table_names():
+            return True
+        if not create:
+            return False
+        if self._engine.dialect.name != 'sqlite':
+            raise ValueError('an R*Tree index requires an SQLite database')
+        with self._engine.begin() as connection:
+            for statement in _RTREE_DDL:
+                connection.execute(statement)
+        return True
+
+    def _rtree_criterion(self, query):
+        """Return a criterion which preselects the candidates of the attributes
+        ``query`` through the R*Tree index or None if the index cannot be used.
+        Only time and wavelength attributes on the top level of the query,
+        i.e. which are not ORed with other attributes, are considered. Entries
+        without observation times are not in the index, so it is only used if
+        the query has a time attribute, which excludes them anyway.
+
+        """
+        if not self._rtree:
+            return None
+        attrs = query.attrs if isinstance(query, AttrAnd) else [query]
+        if not any(isinstance(attr, vso_attrs.Time) for attr in attrs):
+            return None
+        rtree = _rtree_table.c
+        conditions = []
+        for attr in attrs:
+            if isinstance(attr, vso_attrs.Time):
+                # the overlap with the interval of the attribute is a superset
+                # of the exact criterion, also after rounding outwards
+                conditions.extend([rtree.time_end >= _rtree_time(attr.start),
+                                   rtree.time_start <= _rtree_time(attr.end)])
+            elif isinstance(attr, vso_attrs.Wavelength):
+                conditions.extend([rtree.wavemax >= attr.min.value,
+                                   rtree.wavemin <= attr.max.value])
+        return tables.DatabaseEntry.id.in_(
+            select([rtree.id]).where(sqlalchemy.and_(*conditions)))
 
     def commit(self):
         """Flush pending changes and commit the current transaction. This is a
@@ -392,32 +676,133 @@ class Database(object):
         paths = client.get(query_result, path, methods).wait(progress=progress)
 
         for (path, block) in zip(paths, query_result):
-            qr_entry = tables.DatabaseEntry._from_query_result_block(block)
+            for entry in self._entries_from_download(path, block):
+                yield entry
 
-            if os.path.isfile(path):
-                entries = tables.entries_from_file(path, self.default_waveunit)
-            elif os.path.isdir(path):
-                entries = tables.entries_from_dir(path, self.default_waveunit)
-            else:
-                raise ValueError('The path is neither a file nor directory')
+    def _entries_from_download(self, path, block):
+        """Generate the entries of the file or directory ``path`` which was
+        downloaded for the VSO query result block ``block``."""
+        qr_entry = tables.DatabaseEntry._from_query_result_block(block)
 
-            for entry in entries:
-                entry.source = qr_entry.source
-                entry.provider = qr_entry.provider
-                entry.physobs = qr_entry.physobs
-                entry.fileid = qr_entry.fileid
-                entry.observation_time_start = qr_entry.observation_time_start
-                entry.observation_time_end = qr_entry.observation_time_end
-                entry.instrument = qr_entry.instrument
-                entry.size = qr_entry.size
-                entry.wavemin = qr_entry.wavemin
-                entry.wavemax = qr_entry.wavemax
-                entry.path = path
-                entry.download_time = datetime.utcnow()
-                yield entry
+        if os.path.isfile(path):
+            entries = tables.entries_from_file(path, self.default_waveunit)
+        elif os.path.isdir(path):
+            entries = tables.entries_from_dir(path, self.default_waveunit)
+        else:
+            raise ValueError('The path is neither a file nor directory')
+
+        for entry in entries:
+            entry.source = qr_entry.source
+            entry.provider = qr_entry.provider
+            entry.physobs = qr_entry.physobs
+            entry.fileid = qr_entry.fileid
+            entry.observation_time_start = qr_entry.observation_time_start
+            entry.observation_time_end = qr_entry.observation_time_end
+            entry.instrument = qr_entry.instrument
+            entry.size = qr_entry.size
+            entry.wavemin = qr_entry.wavemin
+            entry.wavemax = qr_entry.wavemax
+            entry.path = path
+            entry.download_time = datetime.utcnow()
+            yield entry
+
+    def _update_downloaded_entries(self, entries):
+        """Update the entries which have the file ID of one of the given
+        entries with the information of the new download."""
+        for entry in entries:
+            old_entry = self.session.query(
+                tables.DatabaseEntry).filter_by(fileid=entry.fileid).first()
+            if old_entry is not None:
+                attrs = [
+                    'source', 'provider', 'physobs',
+                    'observation_time_start', 'observation_time_end',
+                    'instrument', 'size', 'wavemin', 'wavemax',
+                    'download_time']
+                kwargs = dict((k, getattr(entry, k)) for k in attrs)
+                cmd = commands.EditEntry(old_entry, **kwargs)
+                if self._enable_history:
+                    self._command_manager.do(cmd)
+                else:
+                    cmd()
+
+    def _download_pipelined(self, query_result, update, client=None,
+                            path=None, progress=False,
+                            methods=('URL-FILE_Rice', 'URL-FILE'),
+                            max_conn=5, batch_size=100):
+        """Download the files of the query result and save the entries of
+        every completed file while the remaining files are still being
+        transferred. The new entries are committed in batches of at least
+        ``batch_size`` entries and form a single operation of the undo
+        history. If ``update`` is True, existing entries with the same file
+        IDs are edited instead. Return a :class:`DownloadReport`.
+
+        """
+        if client is None:
+            client = VSOClient()
+        downloader = Downloader(max_conn=max_conn, max_total=max_conn)
+        results = client.get(query_result, path, methods,
+                             downloader=downloader)
+        if progress:
+            with results.lock:
+                results.progress = ProgressBar(
+                    results.total, results.total - results.n)
+                results.progress.start()
+                results.progress.draw()
+
+        blocks = dict((str(block.fileid), block) for block in query_result)
+        pending = set(blocks)
+        added, failed, errors = set(), set(), []
+        operations = CompositeOperation()
+        batch = []
+
+        def flush():
+            if batch:
+                operations.add(self._add_entries(batch, record=False))
+                self.commit()
+                del batch[:]
+
+        for keys, value in iter(results.queue.get, None):
+            if keys is None:
+                # the downloader does not know which file failed; the
+                # records which never arrive are marked as failed below
+                errors.append(value)
+                continue
+            for key in keys:
+                if key not in blocks:
+                    continue
+                pending.discard(key)
+                try:
+                    entries = list(self._entries_from_download(
+                        value['path'], blocks[key]))
+                    if not update:
+                        for entry in entries:
+                            if self._is_already_added(entry):
+                                raise EntryAlreadyAddedError(entry)
+                except Exception as e:
+                    failed.add(key)
+                    errors.append(e)
+                    continue
+                if update:
+                    self._update_downloaded_entries(entries)
+                    self.commit()
+                else:
+                    batch.extend(entries)
+                    if len(batch) >= batch_size:
+                        flush()
+                added.add(value['path'])
+        flush()
+        if progress:
+            results.progress.finish()
+
+        if (operations and self._enable_history and
+                sum(len(op.rows) for op in operations.operations) <=
+                self.history_bulk_threshold):
+            self._command_manager.record(operations)
+        failed.update(pending)
+        return DownloadReport(sorted(added), sorted(failed), errors)
 
     def download(self, *query, **kwargs):
-        """download(*query, client=sunpy.net.vso.VSOClient(), path=None, progress=False)
+        """download(*query, client=sunpy.net.vso.VSOClient(), path=None, progress=False, pipeline=False, max_conn=5, batch_size=100)
         Search for data using the VSO interface (see
         :meth:`sunpy.net.vso.VSOClient.query`). If querying the VSO results in
         no data, no operation is performed. Concrete, this means that no entry
@@ -428,10 +813,20 @@ class Database(object):
         is added to the database in a way that each FITS header is represented
         by one database entry.
 
+        If ``pipeline`` is True, every file is read and its entries are saved
+        as soon as its download is complete, while the remaining files are
+        still being transferred by at most ``max_conn`` connections. The new
+        entries are committed in batches of ``batch_size`` entries. Files
+        which cannot be downloaded or read, or whose entries are already
+        saved in the database, do not abort the operation but are recorded
+        in the returned :class:`DownloadReport`. The query is only remembered
+        for :meth:`fetch` if no file failed.
+
         """
         if not query:
             raise TypeError('at least one attribute required')
 
+        pipeline = kwargs.pop('pipeline', False)
         client = kwargs.get('client', None)
         if client is None:
             client = VSOClient()
@@ -439,31 +834,23 @@ class Database(object):
 
         # don't do anything if querying the VSO results in no data
         if not qr:
-            return
+            return DownloadReport([], [], []) if pipeline else None
 
-        entries = list(self._download_and_collect_entries(
-            qr, **kwargs))
         dump = serialize.dump_query(and_(*query))
         (dump_exists,), = self.session.query(
             exists().where(tables.JSONDump.dump == tables.JSONDump(dump).dump))
+        if pipeline:
+            report = self._download_pipelined(qr, dump_exists, **kwargs)
+            if not dump_exists and not report.failed:
+                self.session.add(tables.JSONDump(dump))
+            return report
+
+        entries = list(self._download_and_collect_entries(
+            qr, **kwargs))
         if dump_exists:
             # dump already exists in table jsondumps -> edit instead of add
             # update all entries with the fileid `entry.fileid`
-            for entry in entries:
-                old_entry = self.session.query(
-                    tables.DatabaseEntry).filter_by(fileid=entry.fileid).first()
-                if old_entry is not None:
-                    attrs = [
-                        'source', 'provider', 'physobs',
-                        'observation_time_start', 'observation_time_end',
-                        'instrument', 'size', 'wavemin', 'wavemax',
-                        'download_time']
-                    kwargs = dict((k, getattr(entry, k)) for k in attrs)
-                    cmd = commands.EditEntry(old_entry, **kwargs)
-                    if self._enable_history:
-                        self._command_manager.do(cmd)
-                    else:
-                        cmd()
+            self._update_downloaded_entries(entries)
         else:
             self.add_many(entries)
             # serialize the query and save the serialization in the database
@@ -495,7 +882,7 @@ class Database(object):
 
     def query(self, *query, **kwargs):
         """
-        query(*query[, sortby])
+        query(*query[, sortby, limit, offset])
         Send the given query to the database and return a list of
         database entries that satisfy all of the given attributes.
 
@@ -515,6 +902,9 @@ class Database(object):
         An important difference to the VSO attributes is that these attributes
         may also be used in negated form using the tilde ~ operator.
 
+        The whole query, including sorting and slicing, is translated to a
+        single SQL statement, so only the returned entries are loaded.
+
         Parameters
         ----------
         query : list
@@ -525,13 +915,19 @@ class Database(object):
             The column by which to sort the returned entries. The default is to
             sort by the start of the observation. See the attributes of
             :class:`sunpy.database.tables.DatabaseEntry` for a list of all
-            possible values.
+            possible values. If any matching entry has no value for this
+            column, the entries are sorted by their ID instead.
+        limit : int, optional
+            The maximum number of entries to return.
+        offset : int, optional
+            The number of entries to skip at the beginning of the sorted
+            result.
 
         Raises
         ------
         TypeError
             if no attribute is given or if some keyword argument other than
-            'sortby' is given.
+            'sortby', 'limit' or 'offset' is given.
 
         Examples
         --------
@@ -544,19 +940,137 @@ class Database(object):
         if not query:
             raise TypeError('at least one attribute required')
         sortby = kwargs.pop('sortby', 'observation_time_start')
+        limit = kwargs.pop('limit', None)
+        offset = kwargs.pop('offset', None)
         if kwargs:
             k, v = kwargs.popitem()
             raise TypeError('unexpected keyword argument {0!r}'.format(k))
 
-        db_entries = walker.create(and_(*query), self.session)
+        query = and_(*query)
+        criterion = walker.apply(query)
+        rtree_criterion = self._rtree_criterion(query)
+        if rtree_criterion is not None:
+            criterion = sqlalchemy.and_(rtree_criterion, criterion)
+        sort_column = getattr(tables.DatabaseEntry, sortby)
+        # If any of the matching entries lack the sorting attribute, the
+        # sorting key falls back to 'id' to keep the order well defined
+        (has_null,), = self.session.query(exists().where(
+            sqlalchemy.and_(criterion, sort_column == None)))  # noqa: E711
+        if has_null:
+            sort_column = tables.DatabaseEntry.id
+
+        db_query = self.session.query(tables.DatabaseEntry).filter(
+            criterion).order_by(sort_column, tables.DatabaseEntry.id)
+        if limit is not None:
+            db_query = db_query.limit(limit)
+        if offset is not None:
+            db_query = db_query.offset(offset)
+        return db_query.all()
+
+    def to_table(self, *query, **kwargs):
+        """
+        to_table(*query[, header_keys])
+        Return the entries which satisfy all of the given attributes (all
+        entries if no attribute is given) as an :class:`astropy.table.Table`
+        with one column per column of the database table, ordered by ID.
+
+        The table is built with a single SQL statement; each FITS header key
+        in ``header_keys`` adds a column holding the value of that key in the
+        header of each entry. Header columns whose values are all integers or
+        numbers become integer or float columns and all others string
+        columns; values saved as strings, which is how SQLite stores them,
+        are never converted. All columns are masked where a value is missing.
+        Unlike iterating over the entries and their FITS headers, this makes
+        it cheap to analyze the whole database, e.g.::
+
+            >>> table = database.to_table(header_keys=['EXPTIME'])  # doctest: +SKIP
+            >>> exptime = table['EXPTIME'].filled('nan').astype(float)  # doctest: +SKIP
+            >>> table[exptime > 2]  # doctest: +SKIP
 
-        # If any of the DatabaseEntry-s lack the sorting attribute, the
-        # sorting key should fall back to 'id', orherwise it fails with
-        # TypeError on py3
-        if any([getattr(entry, sortby) is None for entry in db_entries]):
-            sortby = 'id'
+        Parameters
+        ----------
+        query : list
+            Attributes as accepted by :meth:`query`.
+        header_keys : list of str, optional
+            The FITS header keys to add as columns.
 
-        return sorted(db_entries, key=operator.attrgetter(sortby))
+        """
+        header_keys = list(kwargs.pop('header_keys', ()))
+        if kwargs:
+            k, v = kwargs.popitem()
+            raise TypeError('unexpected keyword argument {0!r}'.format(k))
+
+        data = tables.DatabaseEntry.__table__
+        headers = tables.FitsHeaderEntry.__table__
+        names = [column.key for column in data.columns]
+        kinds = [tables._column_kind(column) for column in data.columns]
+        # times are read as they are stored, which NumPy parses much faster
+        # than it converts datetime objects
+        columns = [
+            sqlalchemy.type_coerce(column, sqlalchemy.String).label(column.key)
+            if kind == 'datetime' else column
+            for column, kind in zip(data.columns, kinds)]
+        for key in header_keys:
+            if key in names:
+                raise ValueError(
+                    'header key {0!r} clashes with a column'.format(key))
+            # a correlated subquery, which uses the index on the ID and key of
+            # the header entries and yields one value even if a key occurs
+            # more than once in a header
+            columns.append(select([func.min(headers.c.value)]).where(
+                sqlalchemy.and_(headers.c.dbentry_id == data.c.id,
+                                headers.c.key == key)).as_scalar().label(key))
+            names.append(key)
+            kinds.append('header')
+        statement = select(columns).order_by(data.c.id)
+        if query:
+            query = and_(*query)
+            criterion = walker.apply(query)
+            rtree_criterion = self._rtree_criterion(query)
+            if rtree_criterion is not None:
+                criterion = sqlalchemy.and_(rtree_criterion, criterion)
+            statement = statement.where(criterion)
+        rows = self.session.execute(statement).fetchall()
+        table = tables._table_from_rows(rows, names, kinds)
+        table.meta['header_keys'] = header_keys
+        return table
+
+    def export_table(self, path, *query, **kwargs):
+        """
+        export_table(path, *query[, header_keys])
+        Save the table returned by :meth:`to_table` with the same arguments
+        as a compressed NumPy ``.npz`` file, which can be read again with
+        :meth:`import_table`.
+
+        """
+        tables._write_table(self.to_table(*query, **kwargs), path)
+
+    def import_table(self, table, ignore_already_added=False, batch_size=500):
+        """Add the rows of a table made by :meth:`to_table` or of a file
+        written by :meth:`export_table` as new entries using
+        :meth:`bulk_add`. The header columns of the table become FITS header
+        entries of the new entries. The IDs of the exported entries are not
+        kept.
+
+        Parameters
+        ----------
+        table : astropy.table.Table or str
+            The table or the path of the ``.npz`` file.
+        ignore_already_added : bool, optional
+            See :meth:`bulk_add`.
+        batch_size : int, optional
+            See :meth:`bulk_add`.
+
+        Returns
+        -------
+        int
+            The number of entries that were added.
+
+        """
+        if isinstance(table, six.string_types):
+            table = tables._read_table(table)
+        return self._bulk_insert(tables._records_from_table(table),
+                                 ignore_already_added, batch_size)
 
     def get_entry_by_id(self, entry_id):
         """Get a database entry by its unique ID number. If an entry with the
@@ -567,7 +1081,14 @@ class Database(object):
         try:
             return self._cache[entry_id]
         except KeyError:
+            pass
+        # the cache is filled lazily and entries added in bulk are not
+        # necessarily held in it
+        entry = self.session.query(tables.DatabaseEntry).get(entry_id)
+        if entry is None:
             raise EntryNotFoundError(entry_id)
+        self._cache[entry_id] = entry
+        return entry
 
     @property
     def tags(self):
@@ -679,24 +1200,241 @@ class Database(object):
             See Database.add
 
         """
-        cmds = CompositeOperation()
+        entries = []
         for database_entry in database_entries:
-            # use list(self) instead of simply self because __contains__ checks
-            # for existence in the database and not only all attributes except
-            # ID.
-            if database_entry in list(self) and not ignore_already_added:
+            # use _is_already_added instead of simply self because
+            # __contains__ checks for existence in the database and not only
+            # all attributes except ID.
+            if not ignore_already_added and self._is_already_added(database_entry):
                 raise EntryAlreadyAddedError(database_entry)
-            cmd = commands.AddEntry(self.session, database_entry)
-            if self._enable_history:
-                cmds.add(cmd)
-            else:
-                cmd()
-            if database_entry.id is None:
-                self._cache.append(database_entry)
-            else:
+            entries.append(database_entry)
+        self._add_entries(entries)
+
+    def _add_entries(self, database_entries, record=True):
+        """Add the given list of entries as a single operation of the undo
+        history, which only stores the values of the rows. If there are more
+        than ``history_bulk_threshold`` entries or if ``record`` is False,
+        they are added without being saved in the history. The executed
+        operation is returned.
+
+        """
+        if not database_entries:
+            return None
+        # SQLite gives new rows IDs after the largest one in the table
+        appended = all(entry.id is None for entry in database_entries)
+        cmd = commands.AddEntries(self.session, database_entries)
+        if (record and self._enable_history and
+                len(database_entries) <= self.history_bulk_threshold):
+            self._command_manager.do(cmd)
+        else:
+            cmd()
+        if self._cache_is_limited:
+            # a limited cache decides which entries are kept, so it must know
+            # about the new ones; an unlimited one is filled lazily, so that
+            # the entries themselves can be freed
+            for database_entry in database_entries:
                 self._cache[database_entry.id] = database_entry
-        if cmds:
-            self._command_manager.do(cmds)
+        if appended:
+            self._cache.next_id = database_entries[-1].id + 1
+        return cmd
+
+    def _is_already_added(self, database_entry):
+        """Return True if an entry equal to ``database_entry`` is saved in the
+        database. Only the rows sharing path, file ID and provider with the
+        entry are compared, which are found through an index.
+
+        """
+        candidates = self.session.query(tables.DatabaseEntry).filter_by(
+            path=database_entry.path, fileid=database_entry.fileid,
+            provider=database_entry.provider)
+        headers = None
+        for candidate in candidates:
+            if candidate == database_entry:
+                return True
+            # an entry loaded again from the database has its header values
+            # as strings and maybe in another order
+            if not candidate._equal_except_headers(database_entry):
+                continue
+            if headers is None:
+                headers = self._stored_headers(database_entry)
+            if headers == Counter((header.key, header.value)
+                                  for header in candidate.fits_header_entries):
+                return True
+        return False
+
+    def _stored_headers(self, database_entry):
+        """Return the counts of the ``(key, value)`` pairs of the FITS header
+        of ``database_entry`` with the values converted like the database
+        does when saving them.
+
+        """
+        value_type = tables.FitsHeaderEntry.__table__.c.value.type
+        keys = [header.key for header in database_entry.fits_header_entries]
+        values = [header.value
+                  for header in database_entry.fits_header_entries]
+        stored = []
+        for start in range(0, len(values), 500):
+            stored.extend(self.session.query(*[
+                sqlalchemy.cast(sqlalchemy.literal(value), value_type)
+                for value in values[start:start + 500]]).one())
+        return Counter(zip(keys, stored))
+
+    def _existing_natural_keys(self, keys):
+        """Return the subset of the given natural keys (see
+        :attr:`sunpy.database.tables.DatabaseEntry.natural_key`) which belong
+        to entries saved in the database.
+
+        """
+        entry = tables.DatabaseEntry
+        query = self.session.query(
+            entry.path, entry.fileid, entry.provider, entry.hdu_index)
+        paths = list(set(key[0] for key in keys if key[0] is not None))
+        fileids = list(set(key[1] for key in keys
+                           if key[0] is None and key[1] is not None))
+        found = set()
+        # SQLite builds before 3.32 allow at most 999 bound variables, so the
+        # keys are looked up in chunks independent of the batch size
+        for start in range(0, len(paths), 500):
+            found.update(map(tuple, query.filter(
+                entry.path.in_(paths[start:start + 500]))))
+        for start in range(0, len(fileids), 500):
+            found.update(map(tuple, query.filter(
+                entry.path.is_(None),
+                entry.fileid.in_(fileids[start:start + 500]))))
+        if any(key[0] is None and key[1] is None for key in keys):
+            found.update(map(tuple, query.filter(
+                entry.path.is_(None), entry.fileid.is_(None))))
+        return found & set(keys)
+
+    def bulk_add(self, database_entries, ignore_already_added=False,
+                 batch_size=500):
+        """Add a large number of database entries efficiently.
+
+        Unlike :meth:`add_many`, entries are not compared with the whole
+        database. An entry counts as already added if an entry with the same
+        path, file ID, provider and HDU index is saved, which is looked up
+        through an index in batches of ``batch_size`` entries. The new rows,
+        their FITS header entries and key comments are inserted with
+        SQLAlchemy bulk operations and each batch is committed in its own
+        transaction. This operation is not saved in the undo history.
+
+        Parameters
+        ----------
+        database_entries : iterable of sunpy.database.tables.DatabaseEntry
+            The database entries that will be added to the database.
+
+        ignore_already_added : bool, optional
+            If False (the default), entries which are already saved in the
+            database or occur more than once in ``database_entries`` are
+            skipped. If True, they are added anyway.
+
+        batch_size : int, optional
+            The number of entries inserted per transaction.
+
+        Returns
+        -------
+        int
+            The number of entries that were added.
+
+        """
+        return self._bulk_insert(
+            _bulk_records((entry, entry) for entry in database_entries),
+            ignore_already_added, batch_size)
+
+    def _bulk_insert(self, records, ignore_already_added, batch_size):
+        """Insert the given records as described in :meth:`bulk_add`. Each
+        record is a tuple of a dictionary with the column values of the new
+        row, lists of ``(key, value)`` pairs of its FITS header entries and
+        key comments, a list of tag names and the :class:`DatabaseEntry` (or
+        any other object) whose ``id`` attribute is to be set, or None.
+
+        """
+        records = iter(records)
+        data = tables.DatabaseEntry.__table__
+        # the rows are inserted with an executemany statement, so all of them
+        # need the same columns and the defaults have to be filled in here
+        defaults = dict((column.key, column.default.arg)
+                        for column in data.columns
+                        if column.default is not None)
+        added = 0
+        # if the table is empty, the natural keys of the inserted rows are
+        # remembered instead of being looked up in the table
+        (not_empty,), = self.session.query(exists().where(data.c.id != None))  # noqa: E711
+        seen = None if not_empty else set()
+        while True:
+            batch = list(itertools.islice(records, batch_size))
+            if not batch:
+                break
+            if not ignore_already_added:
+                keys = [(row['path'], row['fileid'], row['provider'],
+                         row['hdu_index']) for row, _, _, _, _ in batch]
+                if not_empty:
+                    seen = self._existing_natural_keys(keys)
+                new_records = []
+                for key, record in zip(keys, batch):
+                    if key not in seen:
+                        seen.add(key)
+                        new_records.append(record)
+                batch = new_records
+            if not batch:
+                continue
+
+            next_id = (self.session.query(
+                func.max(tables.DatabaseEntry.id)).scalar() or 0) + 1
+            first_id = next_id
+            rows, header_rows, comment_rows, tag_rows = [], [], [], []
+            for row, headers, comments, tag_names, entry in batch:
+                entry_id = next_id
+                next_id += 1
+                if entry is not None:
+                    entry.id = entry_id
+                row = dict((column.key, row.get(column.key))
+                           for column in data.columns)
+                for key, value in six.iteritems(defaults):
+                    if row[key] is None:
+                        row[key] = value
+                row['id'] = entry_id
+                rows.append(row)
+                header_rows.extend(
+                    {'dbentry_id': entry_id, 'key': key, 'value': value}
+                    for key, value in headers)
+                comment_rows.extend(
+                    {'dbentry_id': entry_id, 'key': key, 'value': value}
+                    for key, value in comments)
+                tag_rows.extend({'tag_name': name, 'entry_id': entry_id}
+                                for name in tag_names)
+
+            self.session.execute(data.insert(), rows)
+            for table, table_rows in [
+                    (tables.FitsHeaderEntry.__table__, header_rows),
+                    (tables.FitsKeyComment.__table__, comment_rows)]:
+                if table_rows:
+                    self.session.execute(table.insert(), table_rows)
+            if tag_rows:
+                tag_names = list(set(row['tag_name'] for row in tag_rows))
+                existing_tags = set()
+                for start in range(0, len(tag_names), 500):
+                    existing_tags.update(name for name, in self.session.query(
+                        tables.Tag.name).filter(tables.Tag.name.in_(
+                            tag_names[start:start + 500])))
+                new_tags = set(tag_names) - existing_tags
+                if new_tags:
+                    self.session.execute(tables.Tag.__table__.insert(),
+                                         [{'name': name} for name in new_tags])
+                self.session.execute(
+                    tables.association_table.insert(), tag_rows)
+            self.session.commit()
+            added += len(batch)
+
+            if self._cache_is_limited:
+                # a limited cache decides which entries are kept, so it must
+                # know about the new ones
+                for entry_id in range(first_id, next_id):
+                    self._cache[entry_id] = self.session.query(
+                        tables.DatabaseEntry).get(entry_id)
+            elif self._cache.next_id is not None:
+                self._cache.next_id = max(self._cache.next_id, next_id)
+        return added
 
     def add(self, database_entry, ignore_already_added=False):
         """Add the given database entry to the database table.
@@ -788,7 +1526,8 @@ class Database(object):
             ignore_already_added)
 
     def add_from_dir(self, path, recursive=False, pattern='*',
-                     ignore_already_added=False, time_string_parse_format=None):
+                     ignore_already_added=False, time_string_parse_format=None,
+                     bulk=False, incremental=False, workers=None):
         """Search the given directory for FITS files and use their FITS headers
         to add new entries to the database. Note that one entry in the database
         is assigned to a list of FITS headers, so not the number of FITS headers
@@ -823,22 +1562,136 @@ class Database(object):
             `~datetime.datetime.strftime` if `sunpy.time.parse_time` is unable to
             automatically read the `date-obs` metadata.
 
+        bulk : bool, optional
+            If True, the entries are added with :meth:`bulk_add`, i.e. files
+            which are already saved in the database are skipped and the
+            operation cannot be undone. The number of added entries is
+            returned.
+
+        incremental : bool, optional
+            If True, the size, modification time and inode of every file are
+            recorded and only files which are new or changed since the last
+            incremental pass over the directory are read. The entries of
+            changed files are replaced, including their tags, and the entries
+            of deleted files are removed. Entries are added as with ``bulk``
+            and an :class:`IngestReport` is returned.
+
+        workers : int, optional
+            If greater than 1, the FITS headers are read by a pool of this
+            many processes. See :func:`sunpy.database.tables.entries_from_dir`.
+
         """
-        cmds = CompositeOperation()
+        if incremental:
+            return self._reindex_dir(path, recursive, pattern,
+                                     ignore_already_added,
+                                     time_string_parse_format, workers)
         entries = tables.entries_from_dir(
             path, recursive, pattern, self.default_waveunit,
-            time_string_parse_format=time_string_parse_format)
-        for database_entry, filepath in entries:
-            if database_entry in list(self) and not ignore_already_added:
-                raise EntryAlreadyAddedError(database_entry)
-            cmd = commands.AddEntry(self.session, database_entry)
-            if self._enable_history:
-                cmds.add(cmd)
+            time_string_parse_format=time_string_parse_format,
+            workers=workers)
+        if bulk:
+            return self.bulk_add((entry for entry, _ in entries),
+                                 ignore_already_added)
+        self.add_many((database_entry for database_entry, _ in entries),
+                      ignore_already_added)
+
+    def _reindex_dir(self, path, recursive, pattern, ignore_already_added,
+                     time_string_parse_format, workers):
+        root = os.path.abspath(path)
+        current = {}
+        for filepath in tables._files_in_dir(root, recursive, pattern):
+            try:
+                current[filepath] = tables.IndexedFile.from_path(filepath)
+            except OSError:
+                # the file was deleted while walking the directory
+                continue
+
+        # LIKE also matches paths containing wildcard characters in place of
+        # ``root``, so the candidates are filtered once more in Python
+        prefix = os.path.join(root, '')
+        known = {}
+        for record in self.session.query(tables.IndexedFile).filter(
+                tables.IndexedFile.path.like(prefix + '%')):
+            filepath = record.path
+            if (filepath.startswith(prefix) and
+                    (recursive or os.path.dirname(filepath) == root) and
+                    fnmatch.fnmatch(filepath, pattern)):
+                known[filepath] = record
+
+        changed, skipped = [], []
+        for filepath in sorted(current):
+            record = known.get(filepath)
+            if record is not None and record.signature == current[filepath].signature:
+                skipped.append(filepath)
             else:
-                cmd()
-            self._cache.append(database_entry)
-        if cmds:
-            self._command_manager.do(cmds)
+                changed.append(filepath)
+        removed = sorted(set(known) - set(current))
+        self._remove_entries_by_path(removed)
+        for filepath in removed:
+            self.session.delete(known[filepath])
+        self.session.commit()
+
+        read = []
+
+        def read_changed_files():
+            for filepath, entries in tables._entries_from_paths(
+                    changed, self.default_waveunit, time_string_parse_format,
+                    workers):
+                # the old entries are only deleted once the file was read and
+                # in the transaction which inserts the new ones
+                if filepath in known:
+                    self._remove_entries_by_path([filepath], commit=False)
+                self.session.merge(current[filepath])
+                inserted = _InsertedFlag()
+                read.append((filepath, inserted))
+                for entry in entries:
+                    yield entry, inserted
+
+        try:
+            self._bulk_insert(_bulk_records(read_changed_files()),
+                              ignore_already_added, 500)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+        added, updated = [], []
+        for filepath, inserted in read:
+            if filepath in known:
+                updated.append(filepath)
+            elif inserted.id is not None:
+                added.append(filepath)
+            else:
+                # no FITS file or all its entries were already saved
+                skipped.append(filepath)
+        return IngestReport(added, updated, removed, sorted(skipped))
+
+    def _remove_entries_by_path(self, paths, batch_size=500, commit=True):
+        """Delete all entries whose path is in ``paths`` together with their
+        FITS header entries, key comments and tag associations. This operation
+        is not saved in the undo history. If ``commit`` is False, the
+        transaction is left open.
+
+        """
+        paths = list(paths)
+        for start in range(0, len(paths), batch_size):
+            ids = [entry_id for entry_id, in self.session.query(
+                tables.DatabaseEntry.id).filter(
+                    tables.DatabaseEntry.path.in_(paths[start:start + batch_size]))]
+            if not ids:
+                continue
+            for table in (tables.FitsHeaderEntry, tables.FitsKeyComment):
+                self.session.query(table).filter(
+                    table.dbentry_id.in_(ids)).delete(synchronize_session='fetch')
+            self.session.execute(tables.association_table.delete().where(
+                tables.association_table.c.entry_id.in_(ids)))
+            self.session.query(tables.DatabaseEntry).filter(
+                tables.DatabaseEntry.id.in_(ids)).delete(
+                    synchronize_session='fetch')
+            for entry_id in ids:
+                self._uncache(entry_id)
+        if commit:
+            self.session.commit()
 
     def add_from_file(self, file, ignore_already_added=False):
         """Generate as many database entries as there are FITS headers in the
@@ -889,10 +1742,7 @@ class Database(object):
                 cmds.add(cmd)
             else:
                 cmd()
-            try:
-                del self._cache[database_entry.id]
-            except KeyError:
-                pass
+            self._uncache(database_entry.id)
 
         if cmds:
             self._command_manager.do(cmds)
@@ -904,13 +1754,7 @@ class Database(object):
             self._command_manager.do(remove_entry_cmd)
         else:
             remove_entry_cmd()
-        try:
-            del self._cache[database_entry.id]
-        except KeyError:
-            # entry cannot be removed because it was already removed or never
-            # existed in the database. This can be safely ignored, the user
-            # doesn't even know there's a cache here
-            pass
+        self._uncache(database_entry.id)
 
     def clear(self):
         """Remove all entries from the database. This operation can be undone
@@ -926,13 +1770,13 @@ class Database(object):
         # remove all entries from all helper tables
         database_tables = [
             tables.JSONDump, tables.Tag, tables.FitsHeaderEntry,
-            tables.FitsKeyComment]
+            tables.FitsKeyComment, tables.IndexedFile]
         for table in database_tables:
             for entry in self.session.query(table):
                 cmds.add(commands.RemoveEntry(self.session, entry))
         for entry in self:
             cmds.add(commands.RemoveEntry(self.session, entry))
-            del self._cache[entry.id]
+            self._uncache(entry.id)
         if self._enable_history:
             self._command_manager.do(cmds)
         else:
@@ -967,37 +1811,121 @@ class Database(object):
         """
         self._command_manager.redo(n)  # pragma: no cover
 
-    def display_entries(self, columns=None, sort=False):
-        print(_create_display_table(self, columns, sort))
+    def _iter_pages(self, page_size, order_by=None):
+        """Yield the entries in pages of at most ``page_size`` entries. Without
+        ``order_by``, the pages are read in the order of the IDs using the
+        last ID of the previous page, so that each page is found through the
+        primary key. Otherwise, the entries are sorted by the given columns and
+        read with OFFSET and LIMIT.
+
+        """
+        entry_id = tables.DatabaseEntry.id
+        query = self.session.query(tables.DatabaseEntry)
+        if order_by is None:
+            last_id = None
+            while True:
+                page_query = query
+                if last_id is not None:
+                    page_query = page_query.filter(entry_id > last_id)
+                page = page_query.order_by(entry_id).limit(page_size).all()
+                if not page:
+                    return
+                yield page
+                last_id = page[-1].id
+        query = query.order_by(*(list(order_by) + [entry_id]))
+        offset = 0
+        while True:
+            page = query.offset(offset).limit(page_size).all()
+            if not page:
+                return
+            yield page
+            offset += len(page)
+
+    def display_entries(self, columns=None, sort=False, page_size=None):
+        """Print a table of the database entries.
+
+        Parameters
+        ----------
+        columns : iterable of str, optional
+            See :func:`sunpy.database.tables.display_entries`.
+
+        sort : bool, optional
+            If True, sorts the entries before displaying them.
+
+        page_size : int, optional
+            If given, the entries are read and printed in tables of at most
+            this many entries, so that only one page is held in memory at a
+            time. Sorting is then done by the database using the displayed
+            columns which are columns of the table.
+
+        """
+        if page_size is None:
+            print(_create_display_table(self, columns, sort))
+            return
+        order_by = None
+        if sort:
+            names = tables.DISPLAY_COLUMNS if columns is None else columns
+            order_by = [getattr(tables.DatabaseEntry, name) for name in names
+                        if name in tables.DatabaseEntry.__table__.columns]
+        for number, page in enumerate(self._iter_pages(page_size, order_by)):
+            if number:
+                print()
+            print(_create_display_table(page, columns))
 
     def show_in_browser(self, columns=None, sort=False, jsviewer=True):
         _create_display_table(self, columns, sort).show_in_browser(jsviewer)
 
+    def _entries_in_range(self, start, stop):
+        """Return the entries with the indices ``start`` to ``stop`` (exclusive)
+        in the order of their IDs."""
+        return self.session.query(tables.DatabaseEntry).order_by(
+            tables.DatabaseEntry.id).offset(start).limit(stop - start).all()
+
+    def _entries_with_ids(self, ids, batch_size=500):
+        """Return the entries with the given IDs in the same order."""
+        found = {}
+        for start in range(0, len(ids), batch_size):
+            found.update(
+                (entry.id, entry) for entry in
+                self.session.query(tables.DatabaseEntry).filter(
+                    tables.DatabaseEntry.id.in_(ids[start:start + batch_size])))
+        return [found[entry_id] for entry_id in ids]
+
     def __getitem__(self, key):
         if isinstance(key, slice):
-            entries = []
-            start = 0 if key.start is None else key.start
-            stop = len(self) if key.stop is None else key.stop
-            step = 1 if key.step is None else key.step
-            for i in range(start, stop, step):
-                try:
-                    entry = self[i]
-                except IndexError:
-                    break
-                else:
-                    self._cache[entry.id]
-                    entries.append(entry)
+            start, stop, step = key.indices(len(self))
+            indices = range(start, stop, step)
+            if not indices:
+                return []
+            first = min(indices[0], indices[-1])
+            last = max(indices[0], indices[-1]) + 1
+            if abs(step) == 1:
+                entries = self._entries_in_range(first, last)
+                entries = [entries[i - first] for i in indices
+                           if i - first < len(entries)]
+            else:
+                # only the IDs of the range are read, and only the entries
+                # the slice picks out of it are loaded
+                entry_id = tables.DatabaseEntry.id
+                ids = [row_id for row_id, in self.session.query(entry_id).
+                       order_by(entry_id).offset(first).limit(last - first)]
+                entries = self._entries_with_ids(
+                    [ids[i - first] for i in indices if i - first < len(ids)])
+            for entry in entries:
+                self._cache_entry(entry)
             return entries
         # support negative indices
-        if key < 0 < abs(key) <= len(self):
-            key %= len(self)
-        for i, entry in enumerate(self):
-            if i == key:
-                # "touch" the entry in the cache to intentionally cause
-                # possible side-effects
-                self._cache[entry.id]
-                return entry
-        raise IndexError
+        if key < 0:
+            key += len(self)
+            if key < 0:
+                raise IndexError
+        entries = self._entries_in_range(key, key + 1)
+        if not entries:
+            raise IndexError
+        # "touch" the entry in the cache to intentionally cause possible
+        # side-effects
+        self._cache_entry(entries[0])
+        return entries[0]
 
     def __contains__(self, database_entry):
         """Return True if the given database_entry entry is saved in the
@@ -1016,11 +1944,34 @@ class Database(object):
         """Get the number of rows in the table."""
         return self.session.query(tables.DatabaseEntry).count()
 
+    # The maximum number of entries shown by the representations of a
+    # database, None shows all of them. Set it to keep the representations of
+    # large databases short; display_entries with a page size shows all
+    # entries page by page.
+    display_max_rows = None
+
+    def _display_first_entries(self, method, more):
+        """Call ``method`` of the table of the first ``display_max_rows``
+        entries (all if it is None) and note how many entries are not shown
+        using ``more``."""
+        if self.display_max_rows is None:
+            entries = self.session.query(tables.DatabaseEntry).order_by(
+                tables.DatabaseEntry.id).all()
+            return getattr(_create_display_table(entries), method)()
+        entries = self._entries_in_range(0, self.display_max_rows)
+        text = getattr(_create_display_table(entries), method)()
+        if len(entries) == self.display_max_rows:
+            hidden = len(self) - len(entries)
+            if hidden:
+                text += more.format(hidden, 's' if hidden > 1 else '')
+        return text
+
     def __repr__(self):
-        return _create_display_table(self).__repr__()
+        return self._display_first_entries('__repr__', '\n... {0} more row{1}')
 
     def __str__(self):
-        return _create_display_table(self).__str__()
+        return self._display_first_entries('__str__', '\n... {0} more row{1}')
 
     def _repr_html_(self):
-        return _create_display_table(self)._repr_html_()
+        return self._display_first_entries(
+            '_repr_html_', '<p>... {0} more row{1}</p>')
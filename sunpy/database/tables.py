@@ -6,17 +6,21 @@ from __future__ import absolute_import, print_function
 
 from time import strptime, mktime
 from datetime import datetime
+from functools import partial
+from multiprocessing import Pool
 import fnmatch
+import numbers
 import os
 
+import numpy as np
 from astropy.units import Unit, nm, equivalencies
 import astropy.table
 from sqlalchemy import Column, Integer, Float, String, DateTime, Boolean,\
-    Table, ForeignKey
+    Table, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 
-from sunpy.time import parse_time
+from sunpy.time import parse_time, parse_times
 from sunpy.io import fits, file_tools as sunpy_filetools
 from sunpy.util import print_table
 from sunpy.extern.six.moves import map
@@ -27,9 +31,15 @@ from sunpy import config
 
 TIME_FORMAT = config.get("general", "time_format")
 
+# the columns shown by display_entries by default
+DISPLAY_COLUMNS = [
+    'id', 'observation_time_start', 'observation_time_end', 'instrument',
+    'source', 'provider', 'physobs', 'wavemin', 'wavemax', 'path', 'fileid',
+    'tags', 'starred', 'download_time', 'size']
+
 __all__ = [
     'WaveunitNotFoundError', 'WaveunitNotConvertibleError', 'JSONDump',
-    'FitsHeaderEntry', 'FitsKeyComment', 'Tag', 'DatabaseEntry',
+    'FitsHeaderEntry', 'FitsKeyComment', 'Tag', 'IndexedFile', 'DatabaseEntry',
     'entries_from_query_result', 'entries_from_file', 'entries_from_dir',
     'display_entries']
 
@@ -39,7 +49,8 @@ Base = declarative_base()
 association_table = Table(
                           'association', Base.metadata,
                           Column('tag_name', String, ForeignKey('tags.name')),
-                          Column('entry_id', Integer, ForeignKey('data.id'))
+                          Column('entry_id', Integer, ForeignKey('data.id')),
+                          Index('ix_association_entry_id', 'entry_id')
                          )
 
 
@@ -98,6 +109,13 @@ class JSONDump(Base):
 
 class FitsHeaderEntry(Base):
     __tablename__ = 'fitsheaderentries'
+    __table_args__ = (
+        # looking up the headers of one entry and the existence checks of the
+        # FitsHeaderEntry query attribute
+        Index('ix_fitsheaderentries_entry_key', 'dbentry_id', 'key', 'value'),
+        # finding the entries which have a given key and value
+        Index('ix_fitsheaderentries_key_value', 'key', 'value'),
+    )
 
     dbentry_id = Column(Integer, ForeignKey('data.id'))
     id = Column(Integer, primary_key=True)
@@ -127,6 +145,9 @@ class FitsHeaderEntry(Base):
 
 class FitsKeyComment(Base):
     __tablename__ = 'fitskeycomments'
+    __table_args__ = (
+        Index('ix_fitskeycomments_entry', 'dbentry_id'),
+    )
 
     dbentry_id = Column(Integer, ForeignKey('data.id'))
     id = Column(Integer, primary_key=True)
@@ -182,6 +203,49 @@ class Tag(Base):
         return '<{0}(name {1!r})>'.format(self.__class__.__name__, self.name)
 
 
+class IndexedFile(Base):
+    """The state of a file on disk at the time it was last read by
+    :meth:`sunpy.database.Database.add_from_dir` in incremental mode. A file
+    whose size, modification time and inode are unchanged is not read again.
+
+    """
+    __tablename__ = 'indexed_files'
+
+    path = Column(String, nullable=False, primary_key=True)
+    size = Column(Integer)
+    mtime = Column(Float)
+    inode = Column(Integer)
+
+    def __init__(self, path, size=None, mtime=None, inode=None):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.inode = inode
+
+    @classmethod
+    def from_path(cls, path):
+        """Create an instance from the current state of the file ``path``."""
+        stat = os.stat(path)
+        return cls(path, stat.st_size, stat.st_mtime, stat.st_ino)
+
+    @property
+    def signature(self):
+        return self.size, self.mtime, self.inode
+
+    def __eq__(self, other):
+        return self.path == other.path and self.signature == other.signature
+
+    def __hash__(self):
+        return super(IndexedFile, self).__hash__()
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __repr__(self):  # pragma: no cover
+        return '<{0}(path {1!r}, size {2!r}, mtime {3!r})>'.format(
+            self.__class__.__name__, self.path, self.size, self.mtime)
+
+
 class DatabaseEntry(Base):
     """
     DatabaseEntry()
@@ -237,6 +301,15 @@ class DatabaseEntry(Base):
 
     """
     __tablename__ = 'data'
+    # The columns identifying the origin of an entry. They are indexed so that
+    # duplicates can be found without loading the whole table.
+    __table_args__ = (
+        Index('ix_data_natural_key', 'path', 'fileid', 'provider', 'hdu_index'),
+        Index('ix_data_observation_time',
+              'observation_time_start', 'observation_time_end'),
+        Index('ix_data_instrument', 'instrument', 'observation_time_start'),
+        Index('ix_data_wavelength', 'wavemin', 'wavemax'),
+    )
 
     # FIXME: primary key is data provider + file ID + download_time!
     id = Column(Integer, primary_key=True)
@@ -259,7 +332,8 @@ class DatabaseEntry(Base):
     tags = relationship('Tag', secondary=association_table, backref='data')
 
     @classmethod
-    def _from_query_result_block(cls, qr_block, default_waveunit=None):
+    def _from_query_result_block(cls, qr_block, default_waveunit=None,
+                                 times=None):
         """Make a new :class:`DatabaseEntry` instance from a VSO query result
         block. The values of :attr:`wavemin` and :attr:`wavemax` are converted
         to nm (nanometres).
@@ -273,6 +347,8 @@ class DatabaseEntry(Base):
         default_waveunit : str, optional
             The wavelength unit that is used if it cannot be found in the
             `qr_block`.
+        times : tuple of datetime, optional
+            The start and end time of the block if they were already parsed.
 
         Examples
         --------
@@ -301,10 +377,13 @@ class DatabaseEntry(Base):
         (17.1, 17.1)
 
         """
-        time_start = timestamp2datetime('%Y%m%d%H%M%S', qr_block.time.start)
         if not qr_block.time.end:
             qr_block.time.end = qr_block.time.start
-        time_end = timestamp2datetime('%Y%m%d%H%M%S', qr_block.time.end)
+        if times is None:
+            time_start = timestamp2datetime('%Y%m%d%H%M%S', qr_block.time.start)
+            time_end = timestamp2datetime('%Y%m%d%H%M%S', qr_block.time.end)
+        else:
+            time_start, time_end = times
         wave = qr_block.wave
         unit = None
         if wave.waveunit is None:
@@ -342,7 +421,18 @@ class DatabaseEntry(Base):
             instrument=instrument, size=qr_block.size,
             wavemin=wavemin, wavemax=wavemax)
 
+    @property
+    def natural_key(self):
+        """The tuple ``(path, fileid, provider, hdu_index)`` which identifies
+        the origin of this entry. Bulk ingestion uses it to detect entries
+        which are already saved in the database."""
+        return (self.path, self.fileid, self.provider, self.hdu_index)
+
     def __eq__(self, other):
+        return (self._equal_except_headers(other) and
+                self.fits_header_entries == other.fits_header_entries)
+
+    def _equal_except_headers(self, other):
         wavemins_equal = self.wavemin is None and other.wavemin is None or\
             self.wavemin is not None and other.wavemin is not None and\
             round(self.wavemin, 10) == round(other.wavemin, 10)
@@ -364,7 +454,6 @@ class DatabaseEntry(Base):
             self.path == other.path and
             self.download_time == other.download_time and
             bool(self.starred) == bool(other.starred) and
-            self.fits_header_entries == other.fits_header_entries and
             self.tags == other.tags)
 
     def __hash__(self):
@@ -430,8 +519,15 @@ def entries_from_query_result(qr, default_waveunit=None):
     (17.1, 17.1)
 
     """
-    for block in qr:
-        yield DatabaseEntry._from_query_result_block(block, default_waveunit)
+    blocks = list(qr)
+    # the times of all blocks are parsed at once
+    starts = parse_times([str(block.time.start) for block in blocks],
+                         '%Y%m%d%H%M%S').astype(datetime)
+    ends = parse_times([str(block.time.end or block.time.start)
+                        for block in blocks], '%Y%m%d%H%M%S').astype(datetime)
+    for block, start, end in zip(blocks, starts, ends):
+        yield DatabaseEntry._from_query_result_block(
+            block, default_waveunit, (start, end))
 
 
 def entries_from_file(file, default_waveunit=None,
@@ -547,8 +643,58 @@ def entries_from_file(file, default_waveunit=None,
         yield entry
 
 
+def _files_in_dir(fitsdir, recursive=False, pattern='*'):
+    """Yield the paths of all files in ``fitsdir`` which match ``pattern``."""
+    for dirpath, dirnames, filenames in os.walk(fitsdir):
+        filename_paths = (os.path.join(dirpath, name) for name in filenames)
+        for path in fnmatch.filter(filename_paths, pattern):
+            yield path
+        if not recursive:
+            break
+
+
+def _entries_from_path(path, default_waveunit=None,
+                       time_string_parse_format=None):
+    """Return the list of database entries of the file ``path`` or an empty
+    list if it is not a FITS file. This is a module level function so that it
+    can be run in a worker process."""
+    try:
+        filetype = sunpy_filetools._detect_filetype(path)
+    except (
+            sunpy_filetools.UnrecognizedFileTypeError,
+            sunpy_filetools.InvalidJPEG2000FileExtension):
+        return []
+    if filetype != 'fits':
+        return []
+    return list(entries_from_file(
+        path, default_waveunit,
+        time_string_parse_format=time_string_parse_format))
+
+
+def _entries_from_paths(paths, default_waveunit=None,
+                        time_string_parse_format=None, workers=None):
+    """Yield ``(path, entries)`` pairs for every path in ``paths``, in the
+    given order. If ``workers`` is greater than 1, the files are read by a
+    pool of that many processes."""
+    read = partial(_entries_from_path, default_waveunit=default_waveunit,
+                   time_string_parse_format=time_string_parse_format)
+    if workers is None or workers <= 1:
+        for path in paths:
+            yield path, read(path)
+        return
+    paths = list(paths)
+    pool = Pool(workers)
+    try:
+        chunksize = max(1, min(64, len(paths) // (4 * workers)))
+        for path, entries in zip(paths, pool.imap(read, paths, chunksize)):
+            yield path, entries
+    finally:
+        pool.terminate()
+
+
 def entries_from_dir(fitsdir, recursive=False, pattern='*',
-                     default_waveunit=None, time_string_parse_format=None):
+                     default_waveunit=None, time_string_parse_format=None,
+                     workers=None):
     """Search the given directory for FITS files and use the corresponding FITS
     headers to generate instances of :class:`DatabaseEntry`. FITS files are
     detected by reading the content of each file, the `pattern` argument may be
@@ -581,6 +727,12 @@ def entries_from_dir(fitsdir, recursive=False, pattern='*',
         `~datetime.datetime.strftime` if `sunpy.time.parse_time` is unable to
         automatically read the `date-obs` metadata.
 
+    workers : int, optional
+        If greater than 1, the files are detected and their headers are read
+        by a pool of this many processes. The entries are still generated in
+        the same order as in the serial case. The default is to read the
+        files in the current process.
+
     Returns
     -------
     generator of (DatabaseEntry, str) pairs
@@ -601,23 +753,39 @@ def entries_from_dir(fitsdir, recursive=False, pattern='*',
     59
 
     """
-    for dirpath, dirnames, filenames in os.walk(fitsdir):
-        filename_paths = (os.path.join(dirpath, name) for name in filenames)
-        for path in fnmatch.filter(filename_paths, pattern):
-            try:
-                filetype = sunpy_filetools._detect_filetype(path)
-            except (
-                    sunpy_filetools.UnrecognizedFileTypeError,
-                    sunpy_filetools.InvalidJPEG2000FileExtension):
-                continue
-            if filetype == 'fits':
-                for entry in entries_from_file(
-                        path, default_waveunit,
-                        time_string_parse_format=time_string_parse_format
-                        ):
-                    yield entry, path
-        if not recursive:
-            break
+    paths = _files_in_dir(fitsdir, recursive, pattern)
+    for path, entries in _entries_from_paths(
+            paths, default_waveunit, time_string_parse_format, workers):
+        for entry in entries:
+            yield entry, path
+
+
+def _display_row(entry, columns):
+    """Format the given columns of a database entry as a table row."""
+    row = []
+    for col in columns:
+        if col == 'starred':
+            row.append('Yes' if entry.starred else 'No')
+        elif col == 'tags':
+            row.append(', '.join(map(str, entry.tags)) or 'N/A')
+        elif col == 'hdu_index':
+            row.append(entry.hdu_index)
+        # do not display microseconds in datetime columns
+        elif col in (
+                'observation_time_start',
+                'observation_time_end',
+                'download_time'):
+            time = getattr(entry, col, None)
+            if time is None:
+                formatted_time = 'N/A'
+            else:
+                formatted_time = time.strftime(TIME_FORMAT)
+            row.append(formatted_time)
+        else:
+            row.append(str(getattr(entry, col) or 'N/A'))
+    if not row:
+        raise TypeError('at least one column must be given')
+    return row
 
 
 def _create_display_table(database_entries, columns=None, sort=False):
@@ -643,37 +811,9 @@ def _create_display_table(database_entries, columns=None, sort=False):
 
     """
     if columns is None:
-        columns = ['id', 'observation_time_start', 'observation_time_end',
-                   'instrument', 'source', 'provider', 'physobs', 'wavemin',
-                   'wavemax', 'path', 'fileid', 'tags', 'starred',
-                   'download_time', 'size']
-
-    data = []
-    for entry in database_entries:
-        row = []
-        for col in columns:
-            if col == 'starred':
-                row.append('Yes' if entry.starred else 'No')
-            elif col == 'tags':
-                row.append(', '.join(map(str, entry.tags)) or 'N/A')
-            elif col == 'hdu_index':
-                row.append(entry.hdu_index)
-            # do not display microseconds in datetime columns
-            elif col in (
-                    'observation_time_start',
-                    'observation_time_end',
-                    'download_time'):
-                time = getattr(entry, col, None)
-                if time is None:
-                    formatted_time = 'N/A'
-                else:
-                    formatted_time = time.strftime(TIME_FORMAT)
-                row.append(formatted_time)
-            else:
-                row.append(str(getattr(entry, col) or 'N/A'))
-        if not row:
-            raise TypeError('at least one column must be given')
-        data.append(row)
+        columns = DISPLAY_COLUMNS
+
+    data = [_display_row(entry, columns) for entry in database_entries]
     if not data:
         raise TypeError('given iterable is empty')
     if sort:
@@ -698,3 +838,160 @@ def display_entries(database_entries, columns=None, sort=False):
 
     """
     return _create_display_table(database_entries, columns, sort).__str__()
+
+
+def _column_kind(column):
+    """Return the kind of array a column of the data table is exported to."""
+    for type_, kind in [(DateTime, 'datetime'), (Boolean, 'bool'),
+                        (Integer, 'int'), (Float, 'float')]:
+        if isinstance(column.type, type_):
+            return kind
+    return 'str'
+
+
+def _header_kind(values):
+    """Return the kind of column the values of a FITS header key are exported
+    to: ``'int'`` or ``'float'`` if all of them are integers or numbers and
+    ``'str'`` otherwise. Strings are never converted, even if they look like
+    numbers.
+
+    """
+    values = [value for value in values if value is not None]
+    if not values or any(isinstance(value, (bool, np.bool_)) or
+                         not isinstance(value, numbers.Real)
+                         for value in values):
+        return 'str'
+    if all(isinstance(value, numbers.Integral) for value in values):
+        return 'int'
+    return 'float'
+
+
+def _make_column(name, values, kind):
+    """Build a masked column of the given kind from a list of values in which
+    None marks missing values."""
+    mask = np.array([value is None for value in values], dtype=bool)
+    if kind == 'datetime':
+        # the values are datetime objects or strings in ISO format
+        data = np.array(values, dtype='datetime64[us]')
+    elif kind == 'bool':
+        data = np.array([bool(value) for value in values], dtype=bool)
+    elif kind == 'int':
+        data = np.array([0 if value is None else value for value in values],
+                        dtype=np.int64)
+    elif kind == 'float':
+        data = np.array([np.nan if value is None else value
+                         for value in values], dtype=float)
+    else:
+        data = np.array(['' if value is None else six.text_type(value)
+                         for value in values], dtype=six.text_type)
+    return astropy.table.MaskedColumn(data, name=name, mask=mask)
+
+
+def _table_from_rows(rows, names, kinds):
+    """Turn the rows of a query into an :class:`astropy.table.Table` with one
+    masked column per name. The kind of each column of FITS header values
+    (kind ``'header'``) is chosen by :func:`_header_kind` and saved in
+    ``table.meta['header_kinds']``.
+
+    """
+    columns = list(zip(*rows)) or [()] * len(names)
+    header_kinds = []
+    table_columns = []
+    for name, values, kind in zip(names, columns, kinds):
+        values = list(values)
+        if kind == 'header':
+            kind = _header_kind(values)
+            header_kinds.append(kind)
+        table_columns.append(_make_column(name, values, kind))
+    table = astropy.table.Table(table_columns, masked=True)
+    table.meta['header_kinds'] = header_kinds
+    return table
+
+
+def _write_table(table, path):
+    """Save a table made by :meth:`sunpy.database.Database.to_table` as a
+    compressed ``.npz`` file, the mask of every column in an extra array."""
+    arrays = {'columns': np.array(table.colnames, dtype=six.text_type),
+              'header_keys': np.array(table.meta.get('header_keys', []),
+                                      dtype=six.text_type),
+              'header_kinds': np.array(_header_kinds(table),
+                                       dtype=six.text_type)}
+    for i, name in enumerate(table.colnames):
+        column = table[name]
+        arrays['data{0}'.format(i)] = np.asarray(column)
+        arrays['mask{0}'.format(i)] = np.ma.getmaskarray(column)
+    np.savez_compressed(path, **arrays)
+
+
+def _read_table(path):
+    """Load a table saved by :func:`_write_table`."""
+    with np.load(path) as arrays:
+        names = [six.text_type(name) for name in arrays['columns']]
+        table = astropy.table.Table(
+            [astropy.table.MaskedColumn(arrays['data{0}'.format(i)],
+                                        name=name,
+                                        mask=arrays['mask{0}'.format(i)])
+             for i, name in enumerate(names)],
+            masked=True)
+        table.meta['header_keys'] = [
+            six.text_type(key) for key in arrays['header_keys']]
+        table.meta['header_kinds'] = [
+            six.text_type(kind) for kind in arrays['header_kinds']]
+    return table
+
+
+def _header_kinds(table):
+    """Return the kinds of the header columns of a table, taken from
+    ``table.meta['header_kinds']`` or, for tables built by hand rather than
+    by :meth:`sunpy.database.Database.to_table`, from the type of the
+    columns.
+
+    """
+    header_keys = table.meta.get('header_keys', [])
+    kinds = table.meta.get('header_kinds')
+    if kinds is not None and len(kinds) == len(header_keys):
+        return list(kinds)
+    return [{'i': 'int', 'u': 'int', 'f': 'float'}.get(
+        table[key].dtype.kind, 'str') for key in header_keys]
+
+
+def _column_values(column):
+    """Return the values of a column as a list of Python objects with None
+    for masked values."""
+    data = np.asarray(column)
+    if data.dtype.kind == 'M':
+        values = data.astype('datetime64[us]').astype(datetime).tolist()
+    else:
+        values = data.tolist()
+    for i in np.flatnonzero(np.ma.getmaskarray(column)):
+        values[i] = None
+    return values
+
+
+def _records_from_table(table):
+    """Generate a record as expected by
+    :meth:`sunpy.database.Database._bulk_insert` for every row of a table
+    made by :meth:`sunpy.database.Database.to_table`. The columns listed in
+    ``table.meta['header_keys']`` become FITS header entries whose values
+    have the kind the column was exported with.
+
+    """
+    header_keys = table.meta.get('header_keys', [])
+    entry_columns = [name for name in table.colnames
+                     if name != 'id' and name not in header_keys and
+                     name in DatabaseEntry.__table__.columns]
+    entry_values = [_column_values(table[name]) for name in entry_columns]
+    converters = {'int': int, 'float': float, 'str': six.text_type}
+    header_values = []
+    for key, kind in zip(header_keys, _header_kinds(table)):
+        convert = converters[kind]
+        header_values.append([
+            None if value is None else convert(value)
+            for value in _column_values(table[key])])
+    for i in range(len(table)):
+        row = dict((name, values[i])
+                   for name, values in zip(entry_columns, entry_values))
+        headers = [(key, values[i])
+                   for key, values in zip(header_keys, header_values)
+                   if values[i] is not None]
+        yield row, headers, [], [], None
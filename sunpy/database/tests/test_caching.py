@@ -5,6 +5,7 @@
 
 from __future__ import absolute_import
 
+import threading
 from collections import deque
 
 import pytest
@@ -84,3 +85,122 @@ def test_lfu_cache():
     assert len(lfucache) == 3
     assert lfucache.to_be_removed == (4, 'd')
     assert lfucache == {1: 'a', 2: 'b', 4: 'd'}
+
+
+def test_lfu_cache_ties_and_deletion():
+    lfucache = LFUCache(3)
+    lfucache[1] = 'a'
+    lfucache[2] = 'b'
+    lfucache[2]
+    lfucache[1]
+    lfucache[3] = 'c'
+    assert lfucache.usage_counter == {1: 2, 2: 2, 3: 1}
+    del lfucache[3]
+    # of the items with the lowest frequency, the first one to get it is
+    # removed
+    assert lfucache.to_be_removed == (2, 'b')
+    lfucache[4] = 'd'
+    lfucache[5] = 'e'
+    assert lfucache == {1: 'a', 2: 'b', 5: 'e'}
+    assert lfucache.evictions == 1
+    # setting an existing key does not evict anything
+    lfucache[5] = 'f'
+    assert lfucache == {1: 'a', 2: 'b', 5: 'f'}
+    assert lfucache.usage_counter[5] == 2
+
+
+def test_lfu_cache_deletion_then_increment():
+    lfucache = LFUCache()
+    for key, frequency in [('x', 2), ('c', 3), ('b', 5)]:
+        lfucache[key] = key
+        for _ in range(frequency - 1):
+            lfucache[key]
+    del lfucache['x']
+    lfucache['b']
+    assert lfucache.to_be_removed == ('c', 'c')
+    lfucache.remove()
+    assert lfucache == {'b': 'b'}
+
+
+def test_lfu_cache_deletion_keeps_lowest_frequency():
+    lfucache = LFUCache(maxbytes=3, sizeof=len)
+    for key, frequency in [('a', 1), ('b', 3), ('c', 6)]:
+        lfucache[key] = key
+        for _ in range(frequency - 1):
+            lfucache[key]
+    del lfucache['a']
+    assert lfucache._min_frequency == 3
+    # the new value of 'c' only fits once 'b' is evicted
+    lfucache['c'] = 'ccc'
+    assert lfucache == {'c': 'ccc'}
+    assert lfucache._min_frequency == 7
+    del lfucache['c']
+    assert lfucache._min_frequency is None
+    assert lfucache.to_be_removed == (None, None)
+
+
+@pytest.mark.parametrize('cache_class', [LRUCache, LFUCache])
+def test_cache_stats(cache_class):
+    cache = cache_class(2)
+    cache[1] = 'a'
+    cache[2] = 'b'
+    cache[1]
+    with pytest.raises(KeyError):
+        cache[3]
+    cache[3] = 'c'
+    assert cache.stats == {'hits': 1, 'misses': 1, 'evictions': 1,
+                           'items': 2, 'nbytes': 0}
+
+
+@pytest.mark.parametrize('cache_class', [LRUCache, LFUCache])
+def test_cache_maxbytes(cache_class):
+    removed = []
+
+    class Cache(cache_class):
+        def callback(self, key, value):
+            removed.append(key)
+
+    cache = Cache(maxbytes=10, sizeof=len)
+    cache[1] = 'aaaa'
+    cache[2] = 'bbbb'
+    assert cache.nbytes == 8
+    assert not cache.is_full
+    cache[3] = 'cccc'
+    assert removed == [1]
+    assert cache.nbytes == 8
+    cache[2] = 'bbbbbbbb'
+    assert removed == [1, 3]
+    assert cache.nbytes == 8
+    del cache[2]
+    assert cache.nbytes == 0
+    # an item larger than the limit is kept as the only one
+    cache[4] = 'd' * 20
+    cache[5] = 'e' * 20
+    assert list(cache) == [5]
+    assert cache.is_full
+
+
+@pytest.mark.parametrize('cache_class', [LRUCache, LFUCache])
+def test_cache_threads(cache_class):
+    cache = cache_class(50)
+
+    def worker(offset):
+        for i in range(2000):
+            key = (offset + i) % 100
+            cache[key] = i
+            try:
+                cache[(key + 1) % 100]
+            except KeyError:
+                pass
+
+    threads = [threading.Thread(target=worker, args=(n * 7,))
+               for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) == 50
+    assert cache.hits + cache.misses == 8 * 2000
+    assert cache.evictions > 0
+    if cache_class is LFUCache:
+        assert set(cache.usage_counter) == set(cache)
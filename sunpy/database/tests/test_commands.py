@@ -13,8 +13,8 @@ import pytest
 
 from sunpy.database.commands import AddEntry, RemoveEntry, EditEntry,\
     AddTag, RemoveTag, NoSuchEntryError, NonRemovableTagError,\
-    EmptyCommandStackError, CommandManager, CompositeOperation
-from sunpy.database.tables import DatabaseEntry, Tag
+    EmptyCommandStackError, CommandManager, CompositeOperation, AddEntries
+from sunpy.database.tables import DatabaseEntry, Tag, FitsHeaderEntry
 
 
 @pytest.fixture
@@ -292,3 +292,71 @@ def test_undo_redo_multiple_cmds_at_once(session, command_manager):
     command_manager.redo()
     assert command_manager.redo_commands == []
     assert session.query(DatabaseEntry).count() == 3
+
+
+def test_add_entries_undo_redo(session):
+    entries = [DatabaseEntry(path=str(i)) for i in range(3)]
+    entries[0].fits_header_entries.append(FitsHeaderEntry('INSTRUME', 'AIA'))
+    entries[1].tags.append(Tag('spam'))
+    cmd = AddEntries(session, entries)
+    cmd()
+    session.commit()
+    assert cmd.ids == [1, 2, 3]
+    # the operation does not keep the entries alive
+    assert cmd.database_entries is None
+    cmd.undo()
+    session.commit()
+    assert session.query(DatabaseEntry).count() == 0
+    assert session.query(FitsHeaderEntry).count() == 0
+    assert session.query(Tag).count() == 0
+    cmd()
+    session.commit()
+    restored = session.query(DatabaseEntry).order_by(DatabaseEntry.id).all()
+    assert [entry.path for entry in restored] == ['0', '1', '2']
+    assert restored[0].fits_header_entries == [
+        FitsHeaderEntry('INSTRUME', 'AIA')]
+    assert [tag.name for tag in restored[1].tags] == ['spam']
+
+
+def test_cmd_manager_max_depth(session):
+    command_manager = CommandManager(max_depth=2)
+    for _ in range(3):
+        command_manager.do(AddEntry(session, DatabaseEntry()))
+    assert len(command_manager.undo_commands) == 2
+    command_manager.undo(2)
+    with pytest.raises(EmptyCommandStackError):
+        command_manager.undo()
+
+
+def test_cmd_manager_max_depth_push_undo_command(session):
+    command_manager = CommandManager(max_depth=2)
+    for _ in range(3):
+        command_manager.push_undo_command(AddEntry(session, DatabaseEntry()))
+    assert len(command_manager.undo_commands) == 2
+
+
+def test_cmd_manager_max_bytes(session):
+    cmd = AddEntries(session, [DatabaseEntry() for _ in range(10)])
+    command_manager = CommandManager(max_bytes=1)
+    command_manager.do(cmd)
+    # the last command is kept even if it exceeds the limit on its own
+    assert command_manager.undo_commands == [cmd]
+    assert command_manager.nbytes == cmd.nbytes > 1
+    command_manager.do(AddEntries(session, [DatabaseEntry()]))
+    assert len(command_manager.undo_commands) == 1
+    assert command_manager.undo_commands[0] is not cmd
+
+
+def test_cmd_manager_max_bytes_sizes_stay_with_commands(session):
+    command_manager = CommandManager(max_bytes=10 ** 9)
+    for i in range(3):
+        command_manager.do(AddEntry(session, DatabaseEntry(path=str(i))))
+    cmd = command_manager.undo_commands[0]
+    nbytes = cmd.nbytes
+    command_manager.max_bytes = command_manager.nbytes - 1
+    command_manager.do(AddEntry(session, DatabaseEntry(path='3')))
+    assert cmd not in command_manager.undo_commands
+    # storing the size does not change the estimate of the operation
+    assert cmd.nbytes == nbytes
+    assert command_manager.nbytes == sum(
+        command.nbytes for command in command_manager.undo_commands)
@@ -8,9 +8,12 @@
 from __future__ import absolute_import
 
 import glob
+from collections import namedtuple
+from datetime import datetime
 import os
 import os.path
 import shutil
+import threading
 
 import pytest
 import sqlalchemy
@@ -18,15 +21,17 @@ import sqlalchemy
 from astropy import units
 
 import sunpy
-from sunpy.database import Database, EntryAlreadyAddedError,\
+from sunpy.database import Database, IngestReport, DownloadReport,\
+    EntryAlreadyAddedError,\
     EntryAlreadyStarredError, EntryAlreadyUnstarredError, NoSuchTagError,\
     EntryNotFoundError, TagAlreadyAssignedError, disable_undo, split_database
 from sunpy.database.tables import DatabaseEntry, Tag, FitsHeaderEntry,\
     FitsKeyComment, JSONDump
 from sunpy.database.commands import EmptyCommandStackError, NoSuchEntryError
+from sunpy.database import commands
 from sunpy.database.caching import LRUCache, LFUCache
-from sunpy.database import attrs
-from sunpy.net import vso, hek
+from sunpy.database import attrs, tables
+from sunpy.net import vso, hek, download
 from sunpy.data.test.waveunit import waveunitdir
 # importing the waveunitdir from sunpy/data/test/waveunit
 
@@ -128,6 +133,44 @@ def test_tags_unique(database):
         database.commit()
 
 
+def test_cache_filled_lazily(tmpdir):
+    url = 'sqlite:///' + str(tmpdir.join('lazy.sqlite'))
+    database = Database(url)
+    database.add_many(DatabaseEntry(path=str(i)) for i in range(5))
+    database.commit()
+    database = Database(url)
+    assert database.cache_size == 0
+    assert database.get_entry_by_id(2).path == '1'
+    assert database[4].path == '4'
+    assert sorted(database._cache) == [2, 5]
+    database.set_cache_size(3)
+    assert database.cache_size == 3
+    database.commit()
+    assert len(database) == 3
+    assert Database(url, cache_size=10).cache_size == 3
+
+
+def test_next_id(database):
+    database.add_many(DatabaseEntry() for _ in range(3))
+    database.commit()
+    assert database._cache.next_id == 4
+    # removing the newest entry makes the database reuse its ID
+    database.remove(database.get_entry_by_id(3))
+    database.commit()
+    assert database._cache.next_id is None
+    entry = DatabaseEntry()
+    database.add(entry)
+    database.commit()
+    assert entry.id == 3
+    assert database._cache[3] is entry
+    database.bulk_add([DatabaseEntry(path='a'), DatabaseEntry(path='b')])
+    entry = DatabaseEntry()
+    database.add(entry)
+    database.commit()
+    assert entry.id == 6
+    assert database._cache[6] is entry
+
+
 def test_setting_cache_size(database_using_lrucache):
     assert database_using_lrucache.cache_maxsize == 3
     assert database_using_lrucache.cache_size == 0
@@ -386,6 +429,49 @@ def test_add_many(database):
     assert len(database) == 5
 
 
+def test_add_many_history_bulk_threshold(database):
+    database.history_bulk_threshold = 4
+    database.add_many(DatabaseEntry() for _ in range(5))
+    assert len(database) == 5
+    with pytest.raises(EmptyCommandStackError):
+        database.undo()
+    database.add_many(DatabaseEntry(path=str(i)) for i in range(4))
+    assert len(database) == 9
+    database.undo()
+    assert len(database) == 5
+
+
+def test_history_depth():
+    database = Database('sqlite:///:memory:', history_depth=2)
+    for _ in range(3):
+        database.add(DatabaseEntry())
+    database.undo(2)
+    assert len(database) == 1
+    with pytest.raises(EmptyCommandStackError):
+        database.undo()
+
+
+def test_add_many_does_not_keep_entries(database):
+    database.add_many(DatabaseEntry(path=str(i)) for i in range(3))
+    database.commit()
+    assert database.cache_size == 0
+    assert database._cache.next_id == 4
+
+
+def test_add_many_reloaded_existing_entry(database):
+    entry = DatabaseEntry(path='a')
+    entry.fits_header_entries = [FitsHeaderEntry('SIMPLE', True),
+                                 FitsHeaderEntry('NAXIS', 2)]
+    database.add_many([entry])
+    database.commit()
+    database.session.expunge_all()
+    duplicate = DatabaseEntry(path='a')
+    duplicate.fits_header_entries = [FitsHeaderEntry('NAXIS', 2),
+                                     FitsHeaderEntry('SIMPLE', True)]
+    with pytest.raises(EntryAlreadyAddedError):
+        database.add_many([duplicate])
+
+
 def test_add_many_with_existing_entry(database):
     evil_entry = DatabaseEntry()
     database.add(evil_entry)
@@ -500,6 +586,325 @@ def test_add_fom_path_ignore_duplicates(database):
     assert len(database) == 8
 
 
+def test_add_from_dir_bulk(database):
+    assert database.add_from_dir(waveunitdir, bulk=True) == 4
+    assert len(database) == 4
+    entries = list(database)
+    assert all(entry.fits_header_entries for entry in entries)
+    assert len(set(entry.path for entry in entries)) == 4
+    # a second pass finds every file in the database already
+    assert database.add_from_dir(waveunitdir, bulk=True) == 0
+    assert len(database) == 4
+    assert database.add_from_dir(waveunitdir, bulk=True,
+                                 ignore_already_added=True) == 4
+    assert len(database) == 8
+
+
+def test_bulk_add(database):
+    database.add(DatabaseEntry(path='/a', hdu_index=0))
+    database.commit()
+    entries = [DatabaseEntry(path='/a', hdu_index=0),
+               DatabaseEntry(path='/a', hdu_index=1),
+               DatabaseEntry(path='/a', hdu_index=1),
+               DatabaseEntry(fileid='x', provider='p'),
+               DatabaseEntry(fileid='x', provider='q')]
+    entries[1].fits_header_entries.append(FitsHeaderEntry('KEY', 'value'))
+    entries[1].fits_key_comments.append(FitsKeyComment('KEY', 'comment'))
+    entries[1].tags.append(Tag('foo'))
+    assert database.bulk_add(entries, batch_size=2) == 3
+    assert len(database) == 4
+    assert database.bulk_add(entries) == 0
+    entry = database.get_entry_by_id(2)
+    assert entry.path == '/a' and entry.hdu_index == 1
+    assert entry.fits_header_entries == [FitsHeaderEntry('KEY', 'value')]
+    assert entry.fits_key_comments == [FitsKeyComment('KEY', 'comment')]
+    assert entry.tags == [Tag('foo')]
+    assert not entry.starred
+    assert database.get_tag('foo').data == [entry]
+    assert sorted((e.fileid, e.provider) for e in database if e.fileid) == [
+        ('x', 'p'), ('x', 'q')]
+    # entries added afterwards get IDs following the bulk inserted ones
+    new_entry = DatabaseEntry()
+    database.add(new_entry)
+    database.commit()
+    assert new_entry.id == 5
+    assert database.get_entry_by_id(5) == new_entry
+
+
+def test_bulk_add_limited_cache(database_using_lrucache):
+    database_using_lrucache.bulk_add(
+        DatabaseEntry(path=str(i)) for i in range(5))
+    assert len(database_using_lrucache) == 3
+    assert [entry.path for entry in database_using_lrucache] == ['2', '3', '4']
+
+
+def test_cache_bytes():
+    def entry(path):
+        entry = DatabaseEntry(path=path)
+        entry.fits_header_entries.extend(
+            FitsHeaderEntry('KEY{0}'.format(i), 'x' * 100) for i in range(20))
+        return entry
+
+    size = commands._entry_nbytes(entry('/0'))
+    # the header entries are counted, not only the entry objects
+    assert size > 20 * 100
+    database = Database('sqlite:///:memory:', cache_bytes=int(2.5 * size))
+    assert database._cache.sizeof is commands._entry_nbytes
+    for i in range(3):
+        database.add(entry('/{0}'.format(i)))
+    assert [entry.path for entry in database] == ['/1', '/2']
+    database.bulk_add(entry('/{0}'.format(i)) for i in range(3, 5))
+    assert [entry.path for entry in database] == ['/3', '/4']
+
+
+def test_bulk_add_large_batches(database):
+    database.bulk_add(DatabaseEntry(path=str(i)) for i in range(600))
+    parameters = []
+
+    def count(conn, cursor, statement, params, context, executemany):
+        if statement.startswith('SELECT'):
+            parameters.append(len(params))
+
+    sqlalchemy.event.listen(database._engine, 'before_cursor_execute', count)
+    entries = [DatabaseEntry(path=str(i)) for i in range(1200)]
+    assert database.bulk_add(entries, batch_size=1200) == 600
+    sqlalchemy.event.remove(database._engine, 'before_cursor_execute', count)
+    # SQLite builds before 3.32 allow at most 999 bound variables
+    assert 0 < max(parameters) <= 500
+
+
+def test_bulk_add_empty_database(database):
+    entries = [DatabaseEntry(path='/a'), DatabaseEntry(path='/b'),
+               DatabaseEntry(path='/a')]
+    assert database.bulk_add(entries, batch_size=2) == 2
+    assert sorted(entry.path for entry in database) == ['/a', '/b']
+
+
+def test_to_table(database):
+    database.default_waveunit = 'angstrom'
+    database.add_from_dir(waveunitdir)
+    database.commit()
+    table = database.to_table(header_keys=['BITPIX', 'DATE-OBS', 'NOPE'])
+    assert len(table) == 4
+    assert list(table['id']) == [1, 2, 3, 4]
+    # SQLite saves the header values as strings
+    assert table['BITPIX'].dtype.kind == 'U'
+    assert sorted(int(value) for value in table['BITPIX']) == [-32, -32, 16, 16]
+    assert table['DATE-OBS'].dtype.kind == 'U'
+    assert table['NOPE'].mask.all()
+    assert table['observation_time_start'].dtype.kind == 'M'
+    assert table['source'].mask.all()
+    entry = database[2]
+    assert (table['observation_time_start'][2].astype(datetime) ==
+            entry.observation_time_start)
+    assert table['path'][2] == entry.path
+    selected = database.to_table(
+        vso.attrs.Instrument(entry.instrument), header_keys=['BITPIX'])
+    assert list(selected['id']) == [entry.id]
+    with pytest.raises(ValueError):
+        database.to_table(header_keys=['path'])
+
+
+def test_export_import_table(database, tmpdir):
+    database.default_waveunit = 'angstrom'
+    database.add_from_dir(waveunitdir)
+    database.commit()
+    path = str(tmpdir.join('export.npz'))
+    database.export_table(path, header_keys=['BITPIX', 'DATE-OBS'])
+    imported = Database('sqlite:///:memory:')
+    assert imported.import_table(path) == 4
+    for old, new in zip(database, imported):
+        assert old.path == new.path
+        assert old.observation_time_start == new.observation_time_start
+        assert old.wavemin == new.wavemin
+        assert not new.starred
+        headers = dict((header.key, header.value)
+                       for header in old.fits_header_entries)
+        expected = [FitsHeaderEntry(key, headers[key])
+                    for key in ['BITPIX', 'DATE-OBS'] if key in headers]
+        assert sorted(new.fits_header_entries, key=lambda h: h.key) == expected
+    # the exported entries are recognized as already added
+    assert imported.import_table(path) == 0
+
+
+def test_export_import_table_keeps_header_types(database, tmpdir):
+    entry = DatabaseEntry(path='/a')
+    entry.fits_header_entries.extend([
+        FitsHeaderEntry('OBJECT', '007'), FitsHeaderEntry('EXPTIME', 2.0)])
+    database.add(entry)
+    database.commit()
+    path = str(tmpdir.join('export.npz'))
+    database.export_table(path, header_keys=['OBJECT', 'EXPTIME'])
+    imported = Database('sqlite:///:memory:')
+    assert imported.import_table(path) == 1
+    headers = dict((header.key, header.value)
+                   for header in imported[0].fits_header_entries)
+    assert headers == {'OBJECT': '007', 'EXPTIME': '2.0'}
+    # values which are still Python numbers keep their type as well
+    table = tables._table_from_rows(
+        [('/a', '007', 2.0, 16), ('/b', '1e3', None, 8)],
+        ['path', 'OBJECT', 'EXPTIME', 'BITPIX'],
+        ['str', 'header', 'header', 'header'])
+    table.meta['header_keys'] = ['OBJECT', 'EXPTIME', 'BITPIX']
+    assert table.meta['header_kinds'] == ['str', 'float', 'int']
+    path = str(tmpdir.join('numbers.npz'))
+    tables._write_table(table, path)
+    records = list(tables._records_from_table(tables._read_table(path)))
+    assert [headers for _, headers, _, _, _ in records] == [
+        [('OBJECT', '007'), ('EXPTIME', 2.0), ('BITPIX', 16)],
+        [('OBJECT', '1e3'), ('BITPIX', 8)]]
+    assert isinstance(records[0][1][1][1], float)
+
+
+def test_indexes_created_on_existing_database(tmpdir):
+    url = 'sqlite:///' + str(tmpdir.join('old.sqlite'))
+    Database(url)
+    engine = sqlalchemy.create_engine(url)
+    declared = {}
+    for table in tables.Base.metadata.sorted_tables:
+        declared[table.name] = sorted(index.name for index in table.indexes)
+        for name in declared[table.name]:
+            engine.execute('DROP INDEX {0}'.format(name))
+    assert not sqlalchemy.inspect(engine).get_indexes('data')
+    Database(url)
+    inspector = sqlalchemy.inspect(engine)
+    for name, indexes in declared.items():
+        assert sorted(index['name'] for index in
+                      inspector.get_indexes(name)) == indexes
+    assert 'ix_data_observation_time' in declared['data']
+    assert 'ix_fitsheaderentries_key_value' in declared['fitsheaderentries']
+
+
+def test_rtree(tmpdir):
+    url = 'sqlite:///' + str(tmpdir.join('rtree.sqlite'))
+    database = Database(url)
+    database.add(DatabaseEntry(
+        observation_time_start=datetime(2012, 1, 1, 10),
+        observation_time_end=datetime(2012, 1, 1, 11),
+        wavemin=171, wavemax=171, instrument='AIA'))
+    database.commit()
+    # creating the index fills it with the existing entries
+    database = Database(url, rtree=True)
+    for hour, wave in [(12, 193), (14, 171)]:
+        database.add(DatabaseEntry(
+            observation_time_start=datetime(2012, 1, 1, hour),
+            observation_time_end=datetime(2012, 1, 1, hour, 0, 1),
+            wavemin=wave, wavemax=wave, instrument='AIA'))
+    database.add(DatabaseEntry(instrument='AIA'))
+    # an entry with a wavelength but without observation times
+    database.add(DatabaseEntry(wavemin=180, wavemax=180, instrument='AIA'))
+    database.commit()
+    database.edit(database.get_entry_by_id(3), wavemin=304, wavemax=304)
+    database.commit()
+    rows = database.session.execute('SELECT id FROM data_rtree').fetchall()
+    assert sorted(row[0] for row in rows) == [1, 2, 3]
+
+    # the index is used as soon as it exists
+    database = Database(url)
+    time = vso.attrs.Time('2012-01-01 10:30', '2012-01-01 12:00')
+    assert [entry.id for entry in database.query(time)] == [1]
+    time = vso.attrs.Time('2012-01-01 10:30', '2012-01-01 12:00:00.5')
+    assert [entry.id for entry in database.query(time)] == [1, 2]
+    # the index alone resolves less than a minute
+    rtree_criterion = database._rtree_criterion(
+        vso.attrs.Time('2012-01-01 11:58', '2012-01-01 11:59'))
+    assert database.session.query(tables.DatabaseEntry).filter(
+        rtree_criterion).count() == 0
+    wave = vso.attrs.Wavelength(170 * units.AA, 200 * units.AA)
+    wave_entries = database.query(vso.attrs.Time('2012-01-01', '2012-01-02'),
+                                  wave)
+    assert [entry.id for entry in wave_entries] == [1, 2]
+    assert [entry.id for entry in database.query(
+        vso.attrs.Instrument('AIA'), wave | attrs.Path('x'))] == [1, 2, 5]
+    # entries without times are found by queries without a time attribute
+    assert [entry.id for entry in database.query(wave)] == [1, 2, 5]
+    database.remove(database.get_entry_by_id(1))
+    database.commit()
+    assert [entry.id for entry in database.query(wave)] == [2, 5]
+    rows = database.session.execute('SELECT id FROM data_rtree').fetchall()
+    assert sorted(row[0] for row in rows) == [2, 3]
+
+
+def test_rtree_requires_sqlite(database, monkeypatch):
+    assert not database._rtree
+    monkeypatch.setattr(database._engine.dialect, 'name', 'postgresql')
+    with pytest.raises(ValueError):
+        database._create_rtree(True)
+
+
+def test_add_from_dir_incremental(database, tmpdir):
+    archive = tmpdir.mkdir('archive')
+    for filename in os.listdir(waveunitdir):
+        if filename.endswith(('.fits', '.fts')):
+            shutil.copy(os.path.join(waveunitdir, filename), str(archive))
+    archive.join('notes.txt').write('not a FITS file')
+    path = str(archive)
+    fits_files = sorted(str(f) for f in archive.listdir() if f.ext != '.txt')
+    notes = str(archive.join('notes.txt'))
+
+    report = database.add_from_dir(path, incremental=True, workers=2)
+    assert isinstance(report, IngestReport)
+    assert report.added == fits_files
+    assert report.skipped == [notes]
+    assert report.updated == report.removed == []
+    assert len(database) == 4
+    assert str(report) == '4 added, 0 updated, 0 removed, 1 skipped'
+
+    report = database.add_from_dir(path, incremental=True)
+    assert report.added == report.updated == report.removed == []
+    assert report.skipped == sorted(fits_files + [notes])
+    assert len(database) == 4
+
+    changed, deleted = fits_files[:2]
+    shutil.copy(changed, changed + '.new')
+    os.remove(changed)
+    os.rename(changed + '.new', changed)
+    os.utime(changed, (0, 0))
+    os.remove(deleted)
+    report = database.add_from_dir(path, incremental=True)
+    assert report.added == []
+    assert report.updated == [changed]
+    assert report.removed == [deleted]
+    assert len(database) == 3
+    assert sorted(entry.path for entry in database) == fits_files[:1] + fits_files[2:]
+    assert not database.session.query(FitsHeaderEntry).filter(
+        FitsHeaderEntry.dbentry_id.notin_([entry.id for entry in database])).count()
+
+
+def test_add_from_dir_incremental_read_error(database, tmpdir, monkeypatch):
+    archive = tmpdir.mkdir('archive')
+    shutil.copy(RHESSI_IMAGE, str(archive))
+    path = str(archive)
+    database.add_from_dir(path, incremental=True)
+    assert len(database) == 4
+    filepath = str(archive.listdir()[0])
+    os.utime(filepath, (0, 0))
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('unreadable')
+
+    monkeypatch.setattr(tables, '_entries_from_path', fail)
+    with pytest.raises(RuntimeError):
+        database.add_from_dir(path, incremental=True)
+    # the entries of the file are kept until it could be read again
+    assert len(database) == 4
+    monkeypatch.undo()
+    report = database.add_from_dir(path, incremental=True)
+    assert report.updated == [filepath]
+    assert len(database) == 4
+
+
+def test_add_from_dir_incremental_already_added(database, tmpdir):
+    archive = tmpdir.mkdir('archive')
+    shutil.copy(RHESSI_IMAGE, str(archive))
+    database.add_from_dir(str(archive), bulk=True)
+    assert len(database) == 4
+    report = database.add_from_dir(str(archive), incremental=True)
+    assert report.added == []
+    assert report.skipped == [str(archive.listdir()[0])]
+    assert len(database) == 4
+
+
 def test_add_from_file(database):
     assert len(database) == 0
     database.add_from_file(RHESSI_IMAGE)
@@ -641,6 +1046,60 @@ def test_getitem_negative_indices_slice(filled_database):
         DatabaseEntry(id=5, tags=[bar])]
 
 
+def test_getitem_slice_exceeding_range(filled_database):
+    assert filled_database[20:30] == []
+    assert [entry.id for entry in filled_database[-3:]] == [8, 9, 10]
+    assert [entry.id for entry in filled_database[::-4]] == [10, 6, 2]
+    with pytest.raises(IndexError):
+        filled_database[-11]
+
+
+def test_display_entries_paged(filled_database, capsys):
+    filled_database.display_entries(['id', 'path'], page_size=4)
+    out, _ = capsys.readouterr()
+    pages = out.strip().split('\n\n')
+    assert len(pages) == 3
+    assert [line.split() for line in pages[2].split('\n')[2:]] == [
+        ['9', 'N/A'], ['10', 'N/A']]
+    for entry in filled_database[:3]:
+        filled_database.edit(entry, path='z')
+    filled_database.display_entries(['path', 'id'], sort=True, page_size=5)
+    out, _ = capsys.readouterr()
+    rows = [line.split() for page in out.strip().split('\n\n')
+            for line in page.split('\n')[2:]]
+    assert [int(row[1]) for row in rows] == [4, 5, 6, 7, 8, 9, 10, 1, 2, 3]
+
+
+def test_getitem_strided_slice_loads_picked_entries(filled_database):
+    filled_database.session.expunge_all()
+    loaded = []
+
+    def on_load(entry, context):
+        loaded.append(entry.id)
+    sqlalchemy.event.listen(DatabaseEntry, 'load', on_load)
+    try:
+        assert [entry.id for entry in filled_database[1::4]] == [2, 6, 10]
+        assert [entry.id for entry in filled_database[-2::-3]] == [9, 6, 3]
+    finally:
+        sqlalchemy.event.remove(DatabaseEntry, 'load', on_load)
+    assert set(loaded) == set([2, 3, 6, 9, 10])
+
+
+def test_repr_shows_first_entries(filled_database):
+    assert 'length=10' in repr(filled_database)
+    assert 'more row' not in str(filled_database)
+    filled_database.display_max_rows = 3
+    assert 'length=3' in repr(filled_database)
+    assert repr(filled_database).endswith('\n... 7 more rows')
+    assert str(filled_database).endswith('\n... 7 more rows')
+    assert 'length=3' in filled_database._repr_html_()
+    assert filled_database._repr_html_().endswith('<p>... 7 more rows</p>')
+    filled_database.display_max_rows = 9
+    assert repr(filled_database).endswith('\n... 1 more row')
+    filled_database.display_max_rows = 10
+    assert 'more row' not in str(filled_database)
+
+
 def test_contains_exists(database):
     entry = DatabaseEntry()
     database.add(entry)
@@ -736,6 +1195,32 @@ def test_query(filled_database):
         DatabaseEntry(id=10, tags=[bar])]
 
 
+def test_query_limit_offset(filled_database):
+    entries = filled_database.query(
+        attrs.Tag('foo') | attrs.Tag('bar'), sortby='id', limit=2, offset=1)
+    assert [entry.id for entry in entries] == [5, 8]
+    entries = filled_database.query(
+        ~attrs.Starred(), attrs.Tag('foo') | attrs.Tag('bar'),
+        sortby='id', offset=3)
+    assert [entry.id for entry in entries] == [10]
+
+
+def test_query_sortby_falls_back_to_id(database):
+    for path in ['c', 'a', None, 'b']:
+        database.add(DatabaseEntry(path=path, instrument='EIT'))
+    database.add(DatabaseEntry(path='d', instrument='AIA'))
+    database.commit()
+    entries = database.query(vso.attrs.Instrument('EIT'), sortby='path')
+    assert [entry.id for entry in entries] == [1, 2, 3, 4]
+    entries = database.query(
+        (vso.attrs.Instrument('EIT') & ~attrs.Path('c')) | attrs.Path('d'),
+        sortby='path')
+    assert [entry.path for entry in entries] == ['a', None, 'b', 'd']
+    entries = database.query(attrs.Path('b') | attrs.Path('d') |
+                             attrs.Path('a'), sortby='path')
+    assert [entry.path for entry in entries] == ['a', 'b', 'd']
+
+
 def test_download_missing_arg(database):
     with pytest.raises(TypeError):
         database.download()
@@ -780,6 +1265,69 @@ def test_download_duplicates(database, download_query, tmpdir):
     assert database[0].download_time != download_time
 
 
+_RecordTime = namedtuple('_RecordTime', 'start end')
+_RecordWave = namedtuple('_RecordWave', 'waveunit wavemin wavemax')
+
+
+class _Record(object):
+    """A minimal stand-in for a block of a VSO query result."""
+    def __init__(self, fileid):
+        self.fileid = fileid
+        self.source = 'SOHO'
+        self.provider = 'SDAC'
+        self.physobs = 'intensity'
+        self.instrument = 'EIT'
+        self.size = 1.
+        self.time = _RecordTime('20040301000010', '20040301000022')
+        self.wave = _RecordWave('Angstrom', '195', '195')
+
+
+class _PipelineClient(object):
+    """Pretends to download the files in ``paths`` (one per record) in
+    background threads. A path of None makes the download fail."""
+    def __init__(self, paths):
+        self.paths = paths
+
+    def query(self, *query):
+        return [_Record('file{0}'.format(i)) for i in range(len(self.paths))]
+
+    def get(self, query_response, path, methods, downloader=None):
+        results = download.Results(lambda _: None, 1)
+        for record, filepath in zip(query_response, self.paths):
+            callback = results.require([record.fileid])
+            if filepath is None:
+                callback = results.add_error
+                value = IOError('download failed')
+            else:
+                value = {'path': filepath}
+            threading.Thread(target=callback, args=(value,)).start()
+        results.poke()
+        return results
+
+
+def test_download_pipelined(database):
+    eit_file = os.path.join(testpath, 'EIT', 'efz20040301.000010_s.fits')
+    client = _PipelineClient([eit_file, None, RHESSI_IMAGE])
+    query = [vso.attrs.Time('2004-03-01', '2004-03-02')]
+    database.default_waveunit = 'angstrom'
+    report = database.download(*query, client=client, pipeline=True,
+                               max_conn=2, batch_size=1)
+    assert isinstance(report, DownloadReport)
+    assert report.added == sorted([eit_file, RHESSI_IMAGE])
+    assert report.failed == ['file1']
+    assert len(report.errors) == 1
+    # one entry for every HDU of the files
+    assert len(database) == 5
+    assert set(entry.fileid for entry in database) == set(['file0', 'file2'])
+    # the query is not remembered because one download failed
+    assert not database.session.query(JSONDump).count()
+    # all batches are undone at once
+    database.undo()
+    assert len(database) == 0
+    with pytest.raises(EmptyCommandStackError):
+        database.undo()
+
+
 def test_fetch_missing_arg(database):
     with pytest.raises(TypeError):
         database.fetch()
@@ -283,6 +283,17 @@ def test_entries_from_dir_recursively_false():
     assert len(entries) == 79
 
 
+def test_entries_from_dir_workers():
+    serial = list(entries_from_dir(testdir, True,
+                                   default_waveunit='angstrom',
+                                   time_string_parse_format='%d/%m/%Y'))
+    parallel = list(entries_from_dir(testdir, True,
+                                     default_waveunit='angstrom',
+                                     time_string_parse_format='%d/%m/%Y',
+                                     workers=2))
+    assert parallel == serial
+
+
 @pytest.mark.online
 def test_entries_from_query_result(query_result):
     entries = list(entries_from_query_result(query_result))
@@ -297,6 +308,29 @@ def test_entries_from_query_result(query_result):
     assert snd_entry == expected_entry
 
 
+class FakeBlock(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def test_entries_from_query_result_times():
+    blocks = [
+        FakeBlock(time=FakeBlock(start='20010101070014', end='20010101070021'),
+                  wave=FakeBlock(waveunit=None, wavemin=None, wavemax=None),
+                  source='SOHO', provider='SDAC', fileid='a', instrument='EIT',
+                  size=1.0),
+        FakeBlock(time=FakeBlock(start='20130805000000', end=None),
+                  wave=FakeBlock(waveunit=None, wavemin=None, wavemax=None),
+                  source=None, provider=None, fileid='b', instrument=None,
+                  size=2.0)]
+    entries = list(entries_from_query_result(blocks))
+    assert [(entry.observation_time_start, entry.observation_time_end)
+            for entry in entries] == [
+        (datetime(2001, 1, 1, 7, 0, 14), datetime(2001, 1, 1, 7, 0, 21)),
+        (datetime(2013, 8, 5), datetime(2013, 8, 5))]
+    assert [entry.fileid for entry in entries] == ['a', 'b']
+
+
 @pytest.mark.online
 def test_entry_from_query_results_with_none_wave(qr_with_none_waves):
     # does not raise WaveunitNotFoundError because neither wavemin nor wavemax
@@ -11,7 +11,7 @@ import numpy as np
 from astropy.io import fits
 import pandas
 
-from sunpy.time import parse_time
+from sunpy.time import parse_time, parse_times
 from sunpy import config
 from sunpy.util.net import check_download_file
 from sunpy import lightcurve
@@ -238,7 +238,7 @@ def _remove_lytaf_events(time, channels=None, artifacts=None,
             print(all_lytaf_event_types)
             raise ValueError("{0} is not a valid artifact type. See above.".format(artifact))
     # Define outputs
-    clean_time = np.array([parse_time(t) for t in time])
+    clean_time = parse_times(time).astype(datetime.datetime)
     clean_channels = copy.deepcopy(channels)
     artifacts_not_found = []
     # Get LYTAF file for given time range
@@ -602,9 +602,7 @@ def split_series_using_lytaf(timearray, data, lytaf):
     el = len(lytaf)
 
     # make the input time array a list of datetime objects
-    datetime_array = []
-    for tim in timearray:
-        datetime_array.append(parse_time(tim))
+    datetime_array = list(parse_times(timearray).astype(datetime.datetime))
 
     # scan through each entry retrieved from the LYTAF database
     for j in range(0, el):
@@ -10,6 +10,7 @@ from datetime import datetime
 from collections import OrderedDict
 
 import matplotlib.pyplot as plt
+from pandas import DatetimeIndex
 from pandas.io.parsers import read_csv
 from os.path import basename
 
@@ -188,10 +189,13 @@ class EVELightCurve(LightCurve):
         #el = line.split()
         #len
 
-        # function to parse date column (HHMM)
-        parser = lambda x: datetime(year, month, day, int(x[0:2]), int(x[2:4]))
-
-        data = read_csv(fp, sep="\s*", names=fields, index_col=0, date_parser=parser, header=None, engine='python')
+        data = read_csv(fp, delim_whitespace=True, names=fields, index_col=0,
+                        header=None)
+        # the index column holds the time of day as HHMM, e.g. 1530 for 15:30
+        hhmm = data.index.values.astype(numpy.int64)
+        minutes = (hhmm // 100 * 60 + hhmm % 100).astype('timedelta64[m]')
+        date = numpy.datetime64(datetime(year, month, day), 'D')
+        data.index = DatetimeIndex(date + minutes, name=data.index.name)
         if is_missing_data :   #If missing data specified in header
             data[data == float(missing_data_val)] = numpy.nan
 
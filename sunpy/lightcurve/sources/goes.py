@@ -6,6 +6,7 @@ import datetime
 import matplotlib.dates
 from matplotlib import pyplot as plt
 from astropy.io import fits as pyfits
+import numpy as np
 from numpy import nan
 from numpy import floor
 from pandas import DataFrame
@@ -209,8 +210,11 @@ class GOESLightCurve(LightCurve):
         else:
             raise ValueError("Don't know how to parse this file")
 
-        times = [start_time + datetime.timedelta(seconds=int(floor(s)),
-                                                 microseconds=int((s - floor(s)) * 1e6)) for s in seconds_from_start]
+        seconds = floor(seconds_from_start)
+        microseconds = (seconds.astype(np.int64) * 1000000 +
+                        ((seconds_from_start - seconds) * 1e6).astype(np.int64))
+        times = (np.datetime64(start_time, 'us') +
+                 microseconds.astype('timedelta64[us]'))
 
         # remove bad values as defined in header comments
         xrsb[xrsb == -99999] = nan
@@ -6,6 +6,7 @@ import datetime
 import sys
 from collections import OrderedDict
 
+import numpy as np
 from matplotlib import pyplot as plt
 from astropy.io import fits
 import pandas
@@ -161,15 +162,16 @@ class LYRALightCurve(LightCurve):
 
         # First column are times.  For level 2 data, the units are [s].
         # For level 3 data, the units are [min]
+        offsets = fits_record.field(0).astype(np.float64)
         if hdulist[1].header['TUNIT1'] == 's':
-            times = [start + datetime.timedelta(seconds=n)
-                     for n in fits_record.field(0)]
+            microseconds = np.round(offsets * 1e6)
         elif hdulist[1].header['TUNIT1'] == 'MIN':
-            times = [start + datetime.timedelta(minutes=int(n))
-                     for n in fits_record.field(0)]
+            microseconds = np.trunc(offsets) * 60000000
         else:
             raise ValueError("Time unit in LYRA fits file not recognised.  "
                              "Value = {0}".format(hdulist[1].header['TUNIT1']))
+        times = (np.datetime64(start, 'us') +
+                 microseconds.astype('timedelta64[us]'))
 
         # Rest of columns are the data
         table = {}
@@ -2,13 +2,12 @@
 """Provides programs to process and analyze NOAA Solar Cycle data."""
 from __future__ import absolute_import
 
-import datetime
-
 from matplotlib import pyplot as plt
 from pandas.io.parsers import read_csv
 import numpy as np
 
 from sunpy.lightcurve import LightCurve
+from sunpy.time import parse_year_months
 
 __all__ = ['NOAAIndicesLightCurve', 'NOAAPredictIndicesLightCurve']
 
@@ -131,8 +130,7 @@ class NOAAIndicesLightCurve(LightCurve):
             fields = ('yyyy', 'mm', 'sunspot SWO', 'sunspot RI', 'sunspot ratio', 'sunspot SWO smooth', 'sunspot RI smooth', 'radio flux', 'radio flux smooth', 'geomagnetic ap', 'geomagnetic smooth')
             data = read_csv(fp, delim_whitespace=True, names = fields, comment='#', dtype={'yyyy':np.str, 'mm':np.str})
             data = data.dropna(how='any')
-            timeindex = [datetime.datetime.strptime(x + y, '%Y%m') for x,y in zip(data['yyyy'], data['mm'])]
-            data['time']=timeindex
+            data['time'] = parse_year_months(data['yyyy'], data['mm'])
             data = data.set_index('time')
             data = data.drop('mm',1)
             data = data.drop('yyyy',1)
@@ -234,8 +232,7 @@ class NOAAPredictIndicesLightCurve(LightCurve):
             fields = ('yyyy', 'mm', 'sunspot', 'sunspot low', 'sunspot high', 'radio flux', 'radio flux low', 'radio flux high')
             data = read_csv(filepath, delim_whitespace=True, names = fields, comment='#', skiprows=2, dtype={'yyyy':np.str, 'mm':np.str})
             data = data.dropna(how='any')
-            timeindex = [datetime.datetime.strptime(x + y, '%Y%m') for x,y in zip(data['yyyy'], data['mm'])]
-            data['time']=timeindex
+            data['time'] = parse_year_months(data['yyyy'], data['mm'])
             data = data.set_index('time')
             data = data.drop('mm',1)
             data = data.drop('yyyy',1)
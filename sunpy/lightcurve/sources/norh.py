@@ -2,7 +2,6 @@
 
 from __future__ import absolute_import
 
-import datetime
 from collections import OrderedDict
 
 import numpy as np
@@ -116,8 +115,7 @@ class NoRHLightCurve(LightCurve):
         cadence = np.float(header['CDELT1'])
         sec_array = np.linspace(0, length-1, (length/cadence))
 
-        norh_time = []
-        for s in sec_array:
-            norh_time.append(obs_start_time + datetime.timedelta(0,s))
+        norh_time = (np.datetime64(obs_start_time, 'us') +
+                     np.round(sec_array * 1e6).astype('timedelta64[us]'))
 
         return header, pandas.DataFrame(data, index=norh_time)
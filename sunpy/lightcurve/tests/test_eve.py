@@ -3,14 +3,22 @@ EVE tests
 """
 from __future__ import absolute_import
 
+import os
+import glob
+
 import pytest
+from pandas.util.testing import assert_frame_equal
 
 #pylint: disable=C0103,R0904,W0201,W0232,E1103
 import sunpy
 import sunpy.lightcurve
-from sunpy.data.test import get_test_filepath
+from sunpy.data.test import get_test_filepath, rootdir
+from sunpy.timeseries.sources.eve import EVESpWxTimeSeries
 
 EVE_AVERAGES_CSV = get_test_filepath("EVE_He_II_304_averages.csv")
+EVE_LEVEL_0CS = ([get_test_filepath("EVE_L0CS_DIODES_1m_truncated.txt"),
+                  get_test_filepath("LATEST_EVE_L0CS_DIODES_1m.txt")] +
+                 sorted(glob.glob(os.path.join(rootdir, "eve", "*.txt"))))
 
 @pytest.mark.online
 def test_eve():
@@ -28,3 +36,11 @@ def test_csv_parsing():
     """Check support for parsing EVE CSV files"""
     csv = sunpy.lightcurve.EVELightCurve.create(EVE_AVERAGES_CSV)
     assert isinstance(csv, sunpy.lightcurve.sources.eve.EVELightCurve)
+
+
+@pytest.mark.parametrize('filepath', EVE_LEVEL_0CS)
+def test_level_0cs_parsing_matches_timeseries(filepath):
+    """The vectorised parser gives the frame of the time series parser,
+    which is checked against the previous parser in sunpy.timeseries"""
+    header, data = sunpy.lightcurve.EVELightCurve._parse_csv(filepath)
+    assert_frame_equal(data, EVESpWxTimeSeries._parse_file(filepath)[0])
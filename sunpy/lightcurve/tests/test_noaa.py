@@ -4,10 +4,17 @@ NOAA LightCurve Tests
 from __future__ import absolute_import
 
 import pytest
+from pandas.util.testing import assert_frame_equal
+
 import sunpy.lightcurve
+from sunpy.data.test import get_test_filepath
 from sunpy.time import TimeRange
+from sunpy.timeseries.sources.noaa import (NOAAIndicesTimeSeries,
+                                           NOAAPredictIndicesTimeSeries)
 
 timerange_a = TimeRange('2004/01/01', '2007/01/01')
+indices_filepath = get_test_filepath('RecentIndices_truncated.txt')
+predict_filepath = get_test_filepath('predicted-sunspot-radio-flux_truncated.txt')
 
 class TestNOAAIndicesLightCurve(object):
 
@@ -83,3 +90,16 @@ class TestNOAAPredictIndicesLightCurve(object):
         """Test presence of GOES satellite number in header"""
         lc1 = sunpy.lightcurve.NOAAPredictIndicesLightCurve.create()
         assert 'comments' in lc1.header.keys()
+
+
+def test_indices_parsing_matches_timeseries():
+    """The vectorised parsers give the frames of the time series parsers,
+    which are checked against the previous parsers in sunpy.timeseries"""
+    header, data = sunpy.lightcurve.NOAAIndicesLightCurve._parse_csv(
+        indices_filepath)
+    assert_frame_equal(
+        data, NOAAIndicesTimeSeries._parse_file(indices_filepath)[0])
+    header, data = sunpy.lightcurve.NOAAPredictIndicesLightCurve._parse_csv(
+        predict_filepath)
+    assert_frame_equal(
+        data, NOAAPredictIndicesTimeSeries._parse_file(predict_filepath)[0])
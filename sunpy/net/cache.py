@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+A persistent index of downloaded files, used to avoid fetching the same URL
+twice.
+
+Every entry of the index maps a URL to the local path it was saved to,
+together with the size, the SHA-256 checksum and (if the server sent one) the
+ETag of the file. An entry is only considered valid if the file still exists
+on disk and its size matches the recorded one, so partially written or
+modified files are never handed out. The index keeps track of the order in
+which entries were used and removes the least recently used files from disk
+once the total size of the cached files exceeds a limit.
+
+The index file is a journal with one JSON line per change, so that recording
+a download appends a line instead of rewriting the whole index. It is
+compacted once it holds many more lines than entries.
+"""
+from __future__ import absolute_import, division, print_function
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+import sunpy
+from sunpy.util.util import _parse_size, _replace
+
+__all__ = ['DownloadCache', 'get_default_cache']
+
+_default_cache = None
+
+
+def _file_checksum(path, blocksize=1 << 20):
+    """Return the hex encoded SHA-256 checksum of the file at ``path``."""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as fd:
+        for block in iter(lambda: fd.read(blocksize), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+class DownloadCache(object):
+    """
+    Index of downloaded files keyed by their URL.
+
+    Parameters
+    ----------
+    index_path : `str`
+        Location of the file the index is persisted to. The file is created
+        on the first insertion.
+    max_size : `int`, `str` or `~astropy.units.Quantity`, optional
+        Upper limit for the summed size of all cached files, either in bytes
+        or as a string like ``'10 GB'``. If adding a file exceeds this limit,
+        the least recently used files are deleted from disk. By default the
+        cache is unbounded.
+
+    Examples
+    --------
+    >>> from sunpy.net.cache import DownloadCache
+    >>> cache = DownloadCache('/tmp/index.json', max_size='1 GB')  # doctest: +SKIP
+    >>> cache.add('http://example.com/file.fits', '/tmp/file.fits')  # doctest: +SKIP
+    >>> cache.get('http://example.com/file.fits')  # doctest: +SKIP
+    '/tmp/file.fits'
+    """
+
+    # The journal is compacted once it has this many lines more than twice
+    # the number of entries.
+    _slack = 100
+
+    def __init__(self, index_path, max_size=None):
+        self.index_path = index_path
+        self.max_size = _parse_size(max_size)
+        self._lock = threading.RLock()
+        self._lines = 0
+        self._entries = self._load()
+        self._size = sum(entry['size'] for entry in self._entries.values())
+
+    def _load(self):
+        entries = OrderedDict()
+        if not os.path.exists(self.index_path):
+            return entries
+        with open(self.index_path) as fd:
+            for line in fd:
+                try:
+                    record = json.loads(line, object_pairs_hook=OrderedDict)
+                except ValueError:
+                    # A line cut short or otherwise corrupt is not fatal, the
+                    # files are simply fetched again.
+                    continue
+                url, entry = record
+                entries.pop(url, None)
+                if entry is not None:
+                    entries[url] = entry
+                self._lines += 1
+        return entries
+
+    def _save(self):
+        """Rewrite the index with one line per entry."""
+        self._makedirs()
+        tmp = self.index_path + '.part'
+        with open(tmp, 'w') as fd:
+            for url, entry in self._entries.items():
+                fd.write(json.dumps([url, entry]) + '\n')
+        _replace(tmp, self.index_path)
+        self._lines = len(self._entries)
+
+    def _append(self, url, entry):
+        """Record in the index file that ``url`` now maps to ``entry`` (or to
+        nothing if it is `None`) and became the most recently used one."""
+        if self._lines > 2 * len(self._entries) + self._slack:
+            self._save()
+            return
+        self._makedirs()
+        with open(self.index_path, 'a') as fd:
+            fd.write(json.dumps([url, entry]) + '\n')
+        self._lines += 1
+
+    def _makedirs(self):
+        dir_ = os.path.dirname(os.path.abspath(self.index_path))
+        if not os.path.exists(dir_):
+            os.makedirs(dir_)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, url):
+        return self.get(url) is not None
+
+    @property
+    def size(self):
+        """The summed size in bytes of all files in the index."""
+        return self._size
+
+    def _is_valid(self, entry, verify):
+        path = entry['path']
+        if not os.path.isfile(path) or os.path.getsize(path) != entry['size']:
+            return False
+        return not verify or _file_checksum(path) == entry['sha256']
+
+    def etag(self, url):
+        """Return the ETag recorded for ``url`` or `None` if there is none."""
+        with self._lock:
+            entry = self._entries.get(url)
+            return None if entry is None else entry['etag']
+
+    def get(self, url, verify=False, directory=None):
+        """
+        Return the local path of the file downloaded from ``url`` or `None`
+        if there is no valid copy of it.
+
+        Parameters
+        ----------
+        url : `str`
+            The URL the file was downloaded from.
+        verify : `bool`, optional
+            If `True`, recompute the checksum of the file instead of only
+            comparing its size with the recorded one.
+        directory : `str`, optional
+            If given, only a copy saved in this directory is returned.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            if (directory is not None and
+                    os.path.dirname(entry['path']) !=
+                    os.path.abspath(directory)):
+                return None
+            del self._entries[url]
+            if not self._is_valid(entry, verify):
+                self._size -= entry['size']
+                self._append(url, None)
+                return None
+            # Re-inserting moves the entry to the most recently used end.
+            self._entries[url] = entry
+            self._append(url, entry)
+            return entry['path']
+
+    def add(self, url, path, etag=None, sha256=None):
+        """
+        Record that the file at ``path`` is the content of ``url``.
+
+        Parameters
+        ----------
+        url : `str`
+            The URL the file was downloaded from.
+        path : `str`
+            The local path of the completely written file.
+        etag : `str`, optional
+            The ETag header the server sent along with the file.
+        sha256 : `str`, optional
+            The hex encoded SHA-256 checksum of the file, e.g. computed while
+            it was downloaded. By default the file is read to compute it.
+        """
+        path = os.path.abspath(path)
+        entry = {'path': path,
+                 'size': os.path.getsize(path),
+                 'sha256': sha256 or _file_checksum(path),
+                 'etag': etag}
+        with self._lock:
+            old = self._entries.pop(url, None)
+            if old is not None:
+                self._size -= old['size']
+            self._entries[url] = entry
+            self._size += entry['size']
+            self._append(url, entry)
+            self._evict(keep=url)
+
+    def remove(self, url, delete=False):
+        """
+        Drop ``url`` from the index.
+
+        Parameters
+        ----------
+        url : `str`
+            The URL to forget.
+        delete : `bool`, optional
+            If `True`, also delete the cached file from disk.
+        """
+        with self._lock:
+            entry = self._entries.pop(url, None)
+            if entry is not None:
+                self._size -= entry['size']
+                if delete:
+                    self._delete_file(entry['path'])
+                self._append(url, None)
+
+    def clear(self, delete=False):
+        """Remove all entries from the index and, if ``delete`` is `True`,
+        all cached files from disk."""
+        with self._lock:
+            for url in list(self._entries):
+                entry = self._entries.pop(url)
+                if delete:
+                    self._delete_file(entry['path'])
+            self._size = 0
+            self._save()
+
+    def _evict(self, keep=None):
+        if self.max_size is None:
+            return
+        while self._size > self.max_size:
+            url = next((url for url in self._entries if url != keep), None)
+            if url is None:
+                break
+            entry = self._entries.pop(url)
+            self._size -= entry['size']
+            self._delete_file(entry['path'])
+            self._append(url, None)
+
+    @staticmethod
+    def _delete_file(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def get_default_cache():
+    """
+    Return the `DownloadCache` configured in the ``[downloads]`` section of
+    the sunpyrc file. Its index lives in the download directory.
+    """
+    global _default_cache
+    index_path = os.path.join(sunpy.config.get('downloads', 'download_dir'),
+                              'download_cache.json')
+    if _default_cache is None or _default_cache.index_path != index_path:
+        max_size = None
+        if sunpy.config.has_option('downloads', 'cache_size'):
+            max_size = sunpy.config.get('downloads', 'cache_size')
+        _default_cache = DownloadCache(index_path, max_size=max_size)
+    return _default_cache
@@ -15,11 +15,13 @@ import astropy.units as u
 
 import sunpy
 from sunpy.extern import six
+from sunpy.extern.six.moves import urllib
 from sunpy.time import TimeRange
 from sunpy.util import replacement_filename
 from sunpy import config
 
 from ..download import Downloader, Results
+from ..cache import get_default_cache
 from ..vso.attrs import Time, _Range
 
 TIME_FORMAT = config.get("general", "time_format")
@@ -31,6 +33,23 @@ def simple_path(path, sock, url):
     return path
 
 
+def cached_callback(cache, url, callback, result):
+    """Record a finished download in ``cache`` before passing it on."""
+    cache.add(url, result['path'], result.get('etag'), result.get('sha256'))
+    callback(result)
+
+
+def not_modified_errback(path, callback, errback, error):
+    """Pass the cached file at ``path`` on if the server answered a
+    conditional request with "304 Not Modified"."""
+    if isinstance(error, urllib.error.HTTPError) and error.code == 304:
+        callback({'path': path})
+    elif errback is None:
+        raise error
+    else:
+        errback(error)
+
+
 class QueryResponseBlock(object):
     """
     Represents url, source along with other information
@@ -249,7 +268,8 @@ class GenericClient(object):
             self.map_.get('TimeRange'), **kwergs)
         return QueryResponse.create(self.map_, urls)
 
-    def get(self, qres, path=None, error_callback=None, **kwargs):
+    def get(self, qres, path=None, error_callback=None, cache=True,
+            revalidate=False, max_conn=None, max_total=None, **kwargs):
         """
         Download a set of results.
 
@@ -258,10 +278,35 @@ class GenericClient(object):
         qres : `~sunpy.net.dataretriever.QueryResponse`
             Results to download.
 
+        cache : `bool` or `~sunpy.net.cache.DownloadCache`, optional
+            Index used to skip URLs which have already been downloaded. If
+            `True` (the default) the cache configured in the sunpyrc file is
+            used, if `False` every file is downloaded again. Only files
+            cached in the target directory are used.
+
+        revalidate : `bool`, optional
+            If `True`, a cached file is only used once the server confirmed,
+            through the ETag recorded with it, that it did not change.
+            Cached files without an ETag are downloaded again.
+
+        max_conn : `int`, optional
+            Maximum number of simultaneous connections to one server. Defaults
+            to the ``max_conn`` option in the ``[downloads]`` sunpyrc section.
+
+        max_total : `int`, optional
+            Maximum number of simultaneous connections in total. Defaults to
+            the ``max_total`` option in the ``[downloads]`` sunpyrc section.
+
         Returns
         -------
         Results Object
+            Its ``downloader`` attribute gives access to the transfer
+            statistics of the downloaded files.
         """
+        if cache is True:
+            cache = get_default_cache()
+        elif cache is False:
+            cache = None
 
         urls = []
         for qrblock in qres:
@@ -274,8 +319,15 @@ class GenericClient(object):
         # Create function to compute the filepath to download to if not set
         default_dir = sunpy.config.get("downloads", "download_dir")
 
-        paths = []
-        for i, filename in enumerate(filenames):
+        res = Results(lambda x: None, 0, lambda map_: self._link(map_))
+
+        # All results have to be required before the first one is submitted,
+        # otherwise a cache hit would finish the Results object early.
+        ncalls = [res.require([x]) for x in urls]
+
+        pending = []
+        for i, (aurl, ncall, filename) in enumerate(zip(urls, ncalls,
+                                                        filenames)):
             if path is None:
                 fname = os.path.join(default_dir, '{file}')
             elif isinstance(path, six.string_types) and '{file}' not in path:
@@ -286,22 +338,38 @@ class GenericClient(object):
             fname  = fname.format(**temp_dict)
             fname = os.path.expanduser(fname)
 
-            if os.path.exists(fname):
+            cached = None
+            if cache is not None:
+                cached = cache.get(aurl, directory=os.path.dirname(fname))
+            if cached is not None and not revalidate:
+                ncall({'path': cached})
+                continue
+
+            headers = None
+            errback = error_callback
+            etag = cache.etag(aurl) if cached is not None else None
+            if etag is not None:
+                # a changed file replaces the cached one
+                headers = {'If-None-Match': etag}
+                errback = partial(not_modified_errback, cached, ncall,
+                                  error_callback)
+            if cache is not None:
+                ncall = partial(cached_callback, cache, aurl, ncall)
+
+            if os.path.exists(fname) and os.path.abspath(fname) != cached:
                 fname = replacement_filename(fname)
 
-            fname = partial(simple_path, fname)
-
-            paths.append(fname)
-
-        res = Results(lambda x: None, 0, lambda map_: self._link(map_))
-
-        dobj = Downloader(max_conn=len(urls), max_total=len(urls))
-
-        # We cast to list here in list(zip... to force execution of 
-        # res.require([x]) at the start of the loop.
-        for aurl, ncall, fname in list(zip(urls, map(lambda x: res.require([x]),
-                                              urls), paths)):
-            dobj.download(aurl, fname, ncall, error_callback)
+            pending.append((aurl, ncall, partial(simple_path, fname),
+                            errback, headers))
+
+        if max_conn is None:
+            max_conn = sunpy.config.getint("downloads", "max_conn")
+        if max_total is None:
+            max_total = sunpy.config.getint("downloads", "max_total")
+        dobj = Downloader(max_conn=max_conn, max_total=max_total)
+        res.downloader = dobj
+        for aurl, ncall, fname, errback, headers in pending:
+            dobj.download(aurl, fname, ncall, errback, headers)
 
         return res
 
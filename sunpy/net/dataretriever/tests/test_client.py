@@ -1,5 +1,11 @@
+import os
+
+from sunpy.extern.six.moves import urllib
 from sunpy.time import parse_time
+from sunpy.net import download
+from sunpy.net.cache import DownloadCache
 from sunpy.net.dataretriever.client import QueryResponse
+from sunpy.net.dataretriever.sources.eve import EVEClient
 
 
 def test_reprs():
@@ -11,3 +17,68 @@ def test_reprs():
     strs = ["2012-01-01 00:00:00", "2012-01-02 00:00:00"]
     assert all(s in str(resp) for s in strs)
     assert all(s in repr(resp) for s in strs)
+
+
+def test_get_uses_cache(tmpdir):
+    source = tmpdir.mkdir('remote').join('20120101_EVE_L0CS_DIODES_1m.txt')
+    source.write('data')
+    url = 'file://' + str(source)
+    map_ = {'Time_start': parse_time("2012/1/1"),
+            'Time_end': parse_time("2012/1/2")}
+    resp = QueryResponse.create(map_, [url])
+    cache = DownloadCache(str(tmpdir.join('index.json')))
+    target = str(tmpdir.mkdir('local'))
+
+    client = EVEClient()
+    first = client.get(resp, path=target, cache=cache).wait(progress=False)
+    assert len(first) == 1
+    assert os.path.dirname(first[0]) == target
+    assert cache.get(url) == first[0]
+    assert not os.path.exists(first[0] + '.part')
+
+    # The second request is answered from the cache instead of downloading
+    # the file again under a replacement name.
+    second = client.get(resp, path=target, cache=cache).wait(progress=False)
+    assert second == first
+    assert os.listdir(target) == [os.path.basename(first[0])]
+
+
+def test_get_cache_other_directory(tmpdir):
+    source = tmpdir.mkdir('remote').join('20120101_EVE_L0CS_DIODES_1m.txt')
+    source.write('data')
+    url = 'file://' + str(source)
+    map_ = {'Time_start': parse_time("2012/1/1"),
+            'Time_end': parse_time("2012/1/2")}
+    resp = QueryResponse.create(map_, [url])
+    cache = DownloadCache(str(tmpdir.join('index.json')))
+
+    client = EVEClient()
+    first = client.get(resp, path=str(tmpdir.mkdir('a')),
+                       cache=cache).wait(progress=False)
+    target = str(tmpdir.mkdir('b'))
+    second = client.get(resp, path=target, cache=cache).wait(progress=False)
+    assert os.path.dirname(second[0]) == target
+    assert os.path.exists(first[0])
+
+
+def test_get_revalidate(monkeypatch, tmpdir):
+    url = 'http://example.com/20120101_EVE_L0CS_DIODES_1m.txt'
+    target = tmpdir.mkdir('local')
+    cached = target.join('20120101_EVE_L0CS_DIODES_1m.txt')
+    cached.write('data')
+    cache = DownloadCache(str(tmpdir.join('index.json')))
+    cache.add(url, str(cached), etag='"v1"')
+    requests = []
+
+    def fake_urlopen(request):
+        requests.append(request)
+        raise urllib.error.HTTPError(url, 304, 'Not Modified', {}, None)
+
+    monkeypatch.setattr(download.urllib.request, 'urlopen', fake_urlopen)
+    map_ = {'Time_start': parse_time("2012/1/1"),
+            'Time_end': parse_time("2012/1/2")}
+    resp = QueryResponse.create(map_, [url])
+    result = EVEClient().get(resp, path=str(target), cache=cache,
+                             revalidate=True).wait(progress=False)
+    assert result == [str(cached)]
+    assert requests[0].get_header('If-none-match') == '"v1"'
@@ -9,6 +9,8 @@ from __future__ import absolute_import
 
 import os
 import re
+import time
+import hashlib
 import threading
 
 from functools import partial
@@ -16,8 +18,7 @@ from contextlib import closing
 from collections import defaultdict, deque
 
 from sunpy.extern import six
-from sunpy.extern.six.moves import urllib
-from sunpy.extern.six import iteritems
+from sunpy.extern.six.moves import urllib, queue
 
 import sunpy
 from sunpy.util.progressbar import TTYProgressBar as ProgressBar
@@ -29,6 +30,27 @@ def default_name(path, sock, url):
 
 
 class Downloader(object):
+    """
+    Download files in background threads, limiting the number of concurrent
+    connections both per server and in total.
+
+    Downloads exceeding either limit are queued and started as soon as a
+    connection becomes free. The downloads from one server start in the
+    order they were requested, and the servers take turns.
+
+    Parameters
+    ----------
+    max_conn : int
+        Maximum number of concurrent connections to one server.
+    max_total : int
+        Maximum number of concurrent connections to all servers.
+
+    Attributes
+    ----------
+    transfers : list of dict
+        One entry with the keys ``url``, ``path``, ``size`` (in bytes) and
+        ``elapsed`` (in seconds) for every completed download.
+    """
     def __init__(self, max_conn=5, max_total=20):
         self.max_conn = max_conn
         self.max_total = max_total
@@ -36,58 +58,109 @@ class Downloader(object):
 
         self.connections = defaultdict(int)  # int() -> 0
         self.q = defaultdict(deque)
+        # Servers which have queued downloads and a free connection slot. It
+        # may contain stale entries which are skipped when popped.
+        self._ready = deque()
+        self._ready_set = set()
+
+        self.transfers = []
+        self._first_start = None
+        self._last_end = None
 
         self.buf = 9096
 
         self.done_lock = threading.Semaphore(0)
-        self.mutex = threading.Lock()
+        # Callbacks are run without the mutex held and may queue new
+        # downloads.
+        self.mutex = threading.RLock()
 
-    def _start_download(self, url, path, callback, errback):
+    def _start_download(self, url, path, callback, errback, headers=None):
+        server = self._get_server(url)
+        partname = None
         try:
-            server = self._get_server(url)
-
-            with self.mutex:
-                self.connections[server] += 1
-                self.conns += 1
-
-            with closing(urllib.request.urlopen(url)) as sock:
+            start = time.time()
+            request = url
+            if headers:
+                request = urllib.request.Request(url, headers=headers)
+            with closing(urllib.request.urlopen(request)) as sock:
                 fullname = path(sock, url)
                 dir_ = os.path.abspath(os.path.dirname(fullname))
                 if not os.path.exists(dir_):
                     os.makedirs(dir_)
 
-                with open(fullname, 'wb') as fd:
+                # Write to a temporary name and only move the file into place
+                # once it is complete, so that an interrupted download never
+                # leaves a truncated file under the final name.
+                partname = fullname + '.part'
+                size = 0
+                sha = hashlib.sha256()
+                with open(partname, 'wb') as fd:
                     while True:
                         rec = sock.read(self.buf)
                         if not rec:
-                            with self.mutex:
-                                self._close(callback, [{'path': fullname}], server)
                             break
                         else:
                             fd.write(rec)
+                            sha.update(rec)
+                            size += len(rec)
+                if os.name == 'nt' and os.path.exists(fullname):
+                    os.remove(fullname)
+                os.rename(partname, fullname)
+                partname = None
+                elapsed = time.time() - start
+                result = {'path': fullname, 'etag': sock.headers.get('ETag'),
+                          'sha256': sha.hexdigest(), 'size': size,
+                          'elapsed': elapsed}
         except Exception as e:
+            if partname is not None:
+                # do not leave the partial file of a failed download behind
+                try:
+                    os.remove(partname)
+                except OSError:
+                    pass
             # TODO: Fix the silent failing
-            if errback is not None:
-                with self.mutex:
-                    self._close(errback, [e], server)
-
-    def _attempt_download(self, url, path, callback, errback):
+            self._close(errback, [e], server)
+        else:
+            with self.mutex:
+                self.transfers.append({'url': url, 'path': fullname,
+                                       'size': size, 'elapsed': elapsed})
+                self._last_end = time.time()
+            self._close(callback, [result], server)
+
+    def _can_start(self, server):
+        return (self.connections[server] < self.max_conn and
+                self.conns < self.max_total)
+
+    def _start_thread(self, url, path, callback, errback, headers=None):
+        """Reserve a connection and start the download. Must be called with
+        the mutex held."""
+        server = self._get_server(url)
+        self.connections[server] += 1
+        self.conns += 1
+        if self._first_start is None:
+            self._first_start = time.time()
+        th = threading.Thread(
+            target=partial(self._start_download, url,
+                           path, callback, errback, headers)
+        )
+        th.daemon = True
+        th.start()
+
+    def _attempt_download(self, url, path, callback, errback, headers=None):
         """ Attempt download. If max. connection limit reached, queue for download later.
         """
-
-        num_connections = self.connections[self._get_server(url)]
-
         # If max downloads has not been exceeded, begin downloading
-        if num_connections < self.max_conn and self.conns < self.max_total:
-            th = threading.Thread(
-                target=partial(self._start_download, url,
-                               path, callback, errback)
-            )
-            th.daemon = True
-            th.start()
+        if self._can_start(self._get_server(url)):
+            self._start_thread(url, path, callback, errback, headers)
             return True
         return False
 
+    def _mark_ready(self, server):
+        if (server not in self._ready_set and self.q[server] and
+                self.connections[server] < self.max_conn):
+            self._ready.append(server)
+            self._ready_set.add(server)
+
     def _get_server(self, url):
         """Returns the server name for a given URL.
 
@@ -112,7 +185,27 @@ class Downloader(object):
     def init(self):
         pass
 
-    def download(self, url, path=None, callback=None, errback=None):
+    @property
+    def queued(self):
+        """The number of downloads waiting for a free connection."""
+        with self.mutex:
+            return sum(len(v) for v in self.q.values())
+
+    def throughput(self):
+        """
+        Return the aggregate download rate in bytes per second, i.e. the
+        number of bytes of all completed downloads divided by the time
+        between the start of the first and the end of the last one.
+        """
+        with self.mutex:
+            if self._first_start is None or self._last_end is None:
+                return 0.
+            total = sum(transfer['size'] for transfer in self.transfers)
+            elapsed = self._last_end - self._first_start
+        return total / elapsed if elapsed > 0 else float('inf')
+
+    def download(self, url, path=None, callback=None, errback=None,
+                 headers=None):
         """Downloads a file at a specified URL.
 
         Parameters
@@ -124,17 +217,20 @@ class Downloader(object):
             or a function with signature: (path, url).
             Defaults to directory specified in sunpy configuration
         callback : function
-            Function to call when download is successfully completed
+            Function to call when download is successfully completed. It is
+            passed a dictionary holding the ``path`` the file was saved to,
+            the ``etag`` sent by the server, the ``sha256`` checksum of the
+            file, the ``size`` in bytes and the ``elapsed`` time in seconds.
         errback : function
             Function to call when download fails
+        headers : dict, optional
+            Additional HTTP headers sent with the request, e.g.
+            ``If-None-Match``.
 
         Returns
         -------
         out : None
         """
-        # Load balancing?
-        # @todo: explain
-
         server = self._get_server(url)
 
         # Create function to compute the filepath to download to if not set
@@ -153,45 +249,58 @@ class Downloader(object):
         if errback is None:
             errback = self._default_error_callback
 
-        # Attempt to download file from URL
-        if not self._attempt_download(url, path, callback, errback):
-            # If there are too many concurrent downloads, queue for later
-            self.q[server].append((url, path, callback, errback))
+        with self.mutex:
+            # Attempt to download file from URL
+            if not self._attempt_download(url, path, callback, errback,
+                                          headers):
+                # If there are too many concurrent downloads, queue for later
+                self.q[server].append((url, path, callback, errback, headers))
+                self._mark_ready(server)
 
     def _close(self, callback, args, server):
         """ Called after download is done. Activated queued downloads, call callback.
-        """
-        callback(*args)
-
-        self.connections[server] -= 1
-        self.conns -= 1
 
-        if self.q[server]:
-            self._attempt_download(*self.q[server].pop())
-        else:
-            for k, v in iteritems(self.q):  # pylint: disable=W0612
-                while v:
-                    if self._attempt_download(*v[0]):
-                        v.popleft()
-                        if self.conns == self.max_total:
-                            return
-                    else:
-                        break
+        Starts at most one queued download without scanning the queues of
+        all servers. The servers with queued downloads take turns: the
+        server whose connection was just freed queues up behind the ones
+        already waiting. The callback is run after the mutex was released.
+        """
+        with self.mutex:
+            self.connections[server] -= 1
+            self.conns -= 1
+            self._mark_ready(server)
+            while self._ready and self.conns < self.max_total:
+                other = self._ready.popleft()
+                self._ready_set.discard(other)
+                if self.q[other] and self.connections[other] < self.max_conn:
+                    self._start_thread(*self.q[other].popleft())
+                    self._mark_ready(other)
+                    break
 
+        callback(*args)
 
 
 class Results(object):
     """ Returned by VSOClient.get. Use .wait to wait
-    for completion of download.
+    for completion of download. If set, the ``downloader`` attribute is the
+    `Downloader` transferring the files.
+
+    To process the results while the remaining downloads are still running,
+    read them from the ``queue`` attribute: every submitted value is put into
+    it as a ``(keys, value)`` pair and every error as ``(None, exception)``
+    as soon as it arrives. Once all results are complete, `None` is put into
+    the queue.
     """
     def __init__(self, callback, n=0, done=None):
         self.callback = callback
+        self.downloader = None
         self.n = self.total = n
         self.map_ = {}
         self.done = done
         self.evt = threading.Event()
         self.errors = []
         self.lock = threading.RLock()
+        self.queue = queue.Queue()
 
         self.progress = None
 
@@ -208,6 +317,7 @@ class Results(object):
         """
         for key in keys:
             self.map_[key] = value
+        self.queue.put((keys, value))
         self.poke()
 
     def poke(self):
@@ -222,6 +332,7 @@ class Results(object):
                 if self.done is not None:
                     self.map_ = self.done(self.map_)
                 self.callback(self.map_)
+                self.queue.put(None)
                 self.evt.set()
 
     def require(self, keys):
@@ -258,4 +369,5 @@ class Results(object):
         """ Signal a required result cannot be submitted because of an
         error. """
         self.errors.append(exception)
+        self.queue.put((None, exception))
         self.poke()
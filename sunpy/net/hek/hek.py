@@ -12,8 +12,10 @@ from __future__ import absolute_import
 
 import json
 import codecs
+import threading
 
 from itertools import chain
+from collections import deque
 from datetime import datetime
 from sunpy.net import attr
 from sunpy.net.hek import attrs
@@ -37,6 +39,40 @@ def _freeze(obj):
     return obj
 
 
+def _event_id(record):
+    """ Return the key by which duplicate records are recognized: the unique
+    ID of the HEK event or, if the record has none, a frozen copy of it. """
+    try:
+        return record['kb_archivid']
+    except KeyError:
+        return _freeze(record)
+
+
+class _PageRequest(threading.Thread):
+    """ Fetch one result page of a HEK query in a background thread. """
+    def __init__(self, client, data, page):
+        super(_PageRequest, self).__init__()
+        self.daemon = True
+        self.client = client
+        self.data = data
+        self.page = page
+        self.result = None
+        self.error = None
+
+    def run(self):
+        try:
+            self.result = self.client._fetch_page(self.data, self.page)
+        except Exception as e:
+            self.error = e
+
+    def get(self):
+        """ Wait for the page and return its decoded JSON. """
+        self.join()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
 class HEKClient(object):
     """ Client to interact with the Heliophysics Event Knowledgebase (HEK).
     The HEK stores solar feature and event data generated by algorithms and
@@ -56,31 +92,52 @@ class HEKClient(object):
     def __init__(self, url=DEFAULT_URL):
         self.url = url
 
-    def _download(self, data):
-        """ Download all data, even if paginated. """
-        page = 1
-        results = []
+    def _fetch_page(self, data, page):
+        """ Download and decode a single result page. """
+        data = dict(data, page=page)
         reader = codecs.getreader("utf-8")
+        fd = urllib.request.urlopen(
+            self.url, urllib.parse.urlencode(data).encode('utf-8'))
+        try:
+            return json.load(reader(fd))
+        finally:
+            fd.close()
 
-        while True:
-            data['page'] = page
-            fd = urllib.request.urlopen(
-                self.url, urllib.parse.urlencode(data).encode('utf-8'))
-            try:
-                result = json.load(reader(fd))
-            finally:
-                fd.close()
-            results.extend(result['result'])
-
-            if not result['overmax']:
-                return list(map(Response, results))
-            page += 1
-
-    def query(self, *query):
-        """ Retrieves information about HEK records matching the criteria
-        given in the query expression. If multiple arguments are passed,
-        they are connected with AND. The result of a query is a list of
-        unique HEK Response objects that fulfill the criteria."""
+    def _iter_pages(self, data, prefetch=0):
+        """ Yield the decoded result pages of a query in order. If
+        ``prefetch`` is positive, up to that many of the following pages are
+        requested concurrently while the current one is consumed. The first
+        page is fetched alone, so queries whose results fit on one page send
+        no further requests. """
+        result = self._fetch_page(data, 1)
+        yield result
+        pending = deque()
+        next_page = 2
+        while result['overmax']:
+            if prefetch <= 0:
+                result = self._fetch_page(data, next_page)
+                next_page += 1
+            else:
+                while len(pending) <= prefetch:
+                    request = _PageRequest(self, data, next_page)
+                    request.start()
+                    pending.append(request)
+                    next_page += 1
+                # Requests for pages beyond the last one are simply abandoned.
+                result = pending.popleft().get()
+            yield result
+
+    def _iter_download(self, data, prefetch=0):
+        """ Yield the records of all pages of a query as they arrive. """
+        for result in self._iter_pages(data, prefetch):
+            for record in result['result']:
+                yield Response(record)
+
+    def _download(self, data, prefetch=0):
+        """ Download all data, even if paginated. """
+        return list(self._iter_download(data, prefetch))
+
+    def _create_queries(self, query):
         query = attr.and_(*query)
 
         data = attrs.walker.create(query, {})
@@ -89,15 +146,67 @@ class HEKClient(object):
             new = self.default.copy()
             new.update(elem)
             ndata.append(new)
+        return ndata
+
+    def query(self, *query, **kwargs):
+        """ Retrieves information about HEK records matching the criteria
+        given in the query expression. If multiple arguments are passed,
+        they are connected with AND. The result of a query is a list of
+        unique HEK Response objects that fulfill the criteria.
+
+        Parameters
+        ----------
+        prefetch : int, optional
+            Number of result pages to request concurrently ahead of the one
+            being processed. Defaults to 0, i.e. pages are fetched one after
+            another. Prefetching starts once the first page reports that
+            there are more, and as the number of pages is not known in
+            advance, up to ``prefetch`` requests for pages past the last one
+            are sent and discarded."""
+        prefetch = kwargs.pop('prefetch', 0)
+        ndata = self._create_queries(query)
+
+        if len(ndata) == 1:
+            return self._download(ndata[0], prefetch)
+        else:
+            return self._merge(self._download(data, prefetch)
+                               for data in ndata)
+
+    def query_iter(self, *query, **kwargs):
+        """ Like `query`, but yield unique HEK Response objects as soon as
+        the result page containing them has been received instead of
+        collecting all of them in a list first. Only the pages currently in
+        flight are held in memory; for queries combining several
+        alternatives with OR, the event IDs (``kb_archivid``) of the records
+        yielded so far are kept as well to skip duplicates.
+
+        Parameters
+        ----------
+        prefetch : int, optional
+            Number of result pages to request concurrently ahead of the one
+            being processed. Defaults to 0. See `query`.
+
+        Examples
+        --------
+        >>> from sunpy.net import hek
+        >>> client = hek.HEKClient()
+        >>> for event in client.query_iter(hek.attrs.Time('2011/1/1', '2011/12/31'),
+        ...                                hek.attrs.FL, prefetch=4):  # doctest: +SKIP
+        ...     print(event['fl_goescls'])
+        """
+        prefetch = kwargs.pop('prefetch', 0)
+        ndata = self._create_queries(query)
 
         if len(ndata) == 1:
-            return self._download(ndata[0])
+            return self._iter_download(ndata[0], prefetch)
         else:
-            return self._merge(self._download(data) for data in ndata)
+            return unique(chain.from_iterable(
+                self._iter_download(data, prefetch) for data in ndata),
+                _event_id)
 
     def _merge(self, responses):
-        """ Merge responses, removing duplicates. """
-        return list(unique(chain.from_iterable(responses), _freeze))
+        """ Merge responses, removing duplicate events. """
+        return list(unique(chain.from_iterable(responses), _event_id))
 
 
 class Response(dict):
@@ -4,6 +4,7 @@ from __future__ import print_function, absolute_import
 import os
 import time
 import warnings
+import threading
 
 import requests
 import numpy as np
@@ -20,7 +21,7 @@ from sunpy.net.jsoc.attrs import walker
 from sunpy.extern.six.moves import urllib
 from sunpy.extern import six
 
-__all__ = ['JSOCClient', 'JSOCResponse']
+__all__ = ['JSOCClient', 'JSOCResponse', 'JSOCExportManager']
 
 JSOC_INFO_URL = 'http://jsoc.stanford.edu/cgi-bin/ajax/jsoc_info'
 JSOC_EXPORT_URL = 'http://jsoc.stanford.edu/cgi-bin/ajax/jsoc_fetch'
@@ -59,6 +60,209 @@ class JSOCResponse(object):
             self.table = astropy.table.vstack([self.table, table])
 
 
+class JSOCExportManager(object):
+    """
+    Track a set of JSOC export requests and download the files of each one as
+    soon as it has been staged.
+
+    The status of every pending request is polled in a background thread,
+    the first time ``initial_wait`` seconds after `start`. The interval
+    between two polls of the same request starts at ``initial_wait`` seconds
+    as well and is multiplied by ``backoff`` after every unsuccessful poll,
+    up to ``max_wait`` seconds. Requests which are queued are polled again,
+    and so are requests whose status cannot be fetched, until this failed
+    ``max_failures`` times in a row. Once a request reports
+    that it is ready, its files are handed to a shared
+    `~sunpy.net.download.Downloader`, so they transfer while the remaining
+    requests are still being staged.
+
+    Parameters
+    ----------
+    path : string
+        Path to save data to, defaults to SunPy download dir
+
+    overwrite : bool
+        Replace files with the same name if True
+
+    progress : bool
+        Print a message whenever a request has been staged or failed
+
+    max_conn : int
+        Maximum number of download connections.
+
+    downloader : `sunpy.download.Downloader` instance
+        A Custom downloader to use
+
+    initial_wait, max_wait : float
+        The first and the longest interval in seconds between two status
+        checks of the same request.
+
+    backoff : float
+        Factor by which the polling interval grows after each check.
+
+    max_failures : int
+        The number of consecutive status checks of a request which may fail,
+        e.g. because the server cannot be reached, before the request is
+        given up and recorded as an error.
+
+    export_url, base_url : string
+        The ``jsoc_fetch`` endpoint and the server the exported files are
+        downloaded from.
+
+    Examples
+    --------
+    >>> from sunpy.net import jsoc
+    >>> client = jsoc.JSOCClient()
+    >>> requestIDs = client.request_data(response)  # doctest: +SKIP
+    >>> res = jsoc.JSOCExportManager(max_wait=30).start(requestIDs)  # doctest: +SKIP
+    >>> res.wait()  # doctest: +SKIP
+    """
+
+    def __init__(self, path=None, overwrite=False, progress=True, max_conn=5,
+                 downloader=None, initial_wait=5, max_wait=60, backoff=2,
+                 max_failures=10, export_url=JSOC_EXPORT_URL,
+                 base_url=BASE_DL_URL):
+        if path is None:
+            path = config.get('downloads', 'download_dir')
+        self.path = os.path.expanduser(path)
+        self.overwrite = overwrite
+        self.progress = progress
+        if downloader is None:
+            downloader = Downloader(max_conn=max_conn, max_total=max_conn)
+        self.downloader = downloader
+        self.initial_wait = initial_wait
+        self.max_wait = max_wait
+        self.backoff = backoff
+        self.max_failures = max_failures
+        self.export_url = export_url
+        self.base_url = base_url
+
+    def _request_status(self, request_id):
+        payload = {'op': 'exp_status', 'requestid': request_id}
+        return requests.get(self.export_url, params=payload)
+
+    def start(self, requestIDs, results=None):
+        """
+        Start polling ``requestIDs`` in the background.
+
+        Parameters
+        ----------
+        requestIDs : list or string
+            One or many requestID strings
+
+        results: Results instance
+            A Results manager to use.
+
+        Returns
+        -------
+        res: Results
+            Finishes once every request has been downloaded or has failed.
+            Failed requests are recorded in its ``errors`` attribute.
+        """
+        if not isiterable(requestIDs) or isinstance(requestIDs, six.string_types):
+            requestIDs = [requestIDs]
+
+        if results is None:
+            results = Results(lambda x: None,
+                              done=lambda maps: [v['path'] for v in maps.values()])
+
+        if not requestIDs:
+            # Make Results think it has finished.
+            results.require([])
+            results.poke()
+            return results
+
+        # Every request holds the Results object open until its files have
+        # been queued, so that a request finishing early cannot complete it.
+        # The placeholder is released with poke, so it puts nothing into the
+        # queue of the results.
+        pending = {}
+        for request_id in requestIDs:
+            results.require([])
+            pending[request_id] = (self.initial_wait, 0)
+
+        thread = threading.Thread(target=self._poll, args=(pending, results))
+        thread.daemon = True
+        thread.start()
+        return results
+
+    def _poll(self, pending, results):
+        start = time.time()
+        next_poll = dict((request_id, start + wait)
+                         for request_id, (wait, failures) in pending.items())
+        while pending:
+            now = time.time()
+            for request_id in [rid for rid in pending if next_poll[rid] <= now]:
+                wait, failures = pending[request_id]
+                try:
+                    json_response = self._request_status(request_id).json()
+                    status = int(json_response['status'])
+                except Exception as e:
+                    status, json_response = None, {'error': str(e)}
+
+                if status == 0:
+                    del pending[request_id]
+                    try:
+                        self._download_request(json_response, results)
+                    except Exception as e:
+                        # Recording the error also releases the request.
+                        message = "Request {0} could not be downloaded: {1!r}"
+                        results.add_error(Exception(message.format(request_id, e)))
+                    else:
+                        results.poke()
+                elif status is None and failures + 1 >= self.max_failures:
+                    del pending[request_id]
+                    message = ("The status of request {0} could not be fetched "
+                               "{1} times in a row: {2}")
+                    message = message.format(request_id, failures + 1,
+                                             json_response['error'])
+                    if self.progress:
+                        print(message)
+                    results.add_error(Exception(message))
+                elif status in (None, 1, 2, 6):
+                    # Still staging, queued, not yet in the export queue or
+                    # the status could not be fetched this time.
+                    next_poll[request_id] = now + wait
+                    pending[request_id] = (
+                        min(wait * self.backoff, self.max_wait),
+                        failures + 1 if status is None else 0)
+                else:
+                    del pending[request_id]
+                    message = "Request {0} returned status: {1} with error: {2}"
+                    message = message.format(request_id, status,
+                                             json_response.get('error'))
+                    if self.progress:
+                        print(message)
+                    results.add_error(Exception(message))
+            if pending:
+                time.sleep(max(0, min(next_poll[rid] for rid in pending) - time.time()))
+
+    def _download_request(self, json_response, results):
+        """
+        Queue the files of the staged request described by the
+        ``jsoc_fetch`` response for download. Files which are already on
+        disk are submitted to ``results`` right away.
+        """
+        urls = []
+        for ar in json_response['data']:
+            filename = os.path.join(self.path, ar['filename'])
+            if self.overwrite or not os.path.isfile(filename):
+                url_dir = self.base_url + json_response['dir'] + '/'
+                urls.append(urllib.parse.urljoin(url_dir, ar['filename']))
+            else:
+                # Add the file on disk to the output
+                results.require([ar['filename']])({'path': filename})
+
+        if self.progress:
+            print_message = "Request {0} is ready, {1} URLs queued for download."
+            print(print_message.format(json_response.get('requestid'), len(urls)))
+
+        callbacks = [results.require([url]) for url in urls]
+        for url, callback in zip(urls, callbacks):
+            self.downloader.download(url, callback=callback,
+                                     errback=results.add_error, path=self.path)
+
+
 class JSOCClient(object):
     """
     This is a Client to the JSOC Data Export service.
@@ -310,10 +514,10 @@ class JSOCClient(object):
         return allstatus
 
     def get(self, jsoc_response, path=None, overwrite=False, progress=True,
-            max_conn=5, downloader=None,sleep=10):
+            max_conn=5, downloader=None, sleep=10, max_sleep=60):
         """
-        Make the request for the data in jsoc_response and wait for it to be
-        staged and then download the data.
+        Make the request for the data in jsoc_response and download the files
+        of each staged request while the others are still being staged.
 
         Parameters
         ----------
@@ -336,39 +540,30 @@ class JSOCClient(object):
             A Custom downloader to use
 
         sleep : int
-            The number of seconds to wait between calls to JSOC to check the status
-            of the request.
+            The number of seconds to wait before the first call to JSOC to
+            check the status of a request.
+
+        max_sleep : int
+            The interval between two status checks of the same request doubles
+            after every check until it reaches this number of seconds.
 
         Returns
         -------
         results : a :class:`sunpy.net.vso.Results` instance
-            A Results object
+            A Results object, which is returned immediately and completes
+            once all files have been downloaded.
         """
 
         # Make staging request to JSOC
         requestIDs = self.request_data(jsoc_response)
         # Add them to the response for good measure
         jsoc_response.requestIDs = requestIDs
-        time.sleep(sleep/2.)
-
-        r = Results(lambda x: None, done=lambda maps: [v['path'] for v in maps.values()])
-
-        while requestIDs:
-            for i, request_id in enumerate(requestIDs):
-                u = self._request_status(request_id)
 
-                if progress:
-                    self.check_request(request_id)
-
-                if u.status_code == 200 and u.json()['status'] == '0':
-                    rID = requestIDs.pop(i)
-                    r = self.get_request(rID, path=path, overwrite=overwrite,
-                                 progress=progress, results=r)
-
-                else:
-                    time.sleep(sleep)
-
-        return r
+        manager = JSOCExportManager(path=path, overwrite=overwrite,
+                                    progress=progress, max_conn=max_conn,
+                                    downloader=downloader, initial_wait=sleep,
+                                    max_wait=max(sleep, max_sleep))
+        return manager.start(requestIDs)
 
     def get_request(self, requestIDs, path=None, overwrite=False, progress=True,
                     max_conn=5, downloader=None, results=None):
@@ -407,57 +602,30 @@ class JSOCClient(object):
         """
 
         # Convert IDs to a list if not already
-
         if not isiterable(requestIDs) or isinstance(requestIDs, six.string_types):
             requestIDs = [requestIDs]
 
-        if path is None:
-            path = config.get('downloads', 'download_dir')
-        path = os.path.expanduser(path)
-
-        if downloader is None:
-            downloader = Downloader(max_conn=max_conn, max_total=max_conn)
+        manager = JSOCExportManager(path=path, overwrite=overwrite,
+                                    progress=progress, max_conn=max_conn,
+                                    downloader=downloader)
 
         # A Results object tracks the number of downloads requested and the
         # number that have been completed.
         if results is None:
-            results = Results(lambda _: downloader.stop())
+            results = Results(lambda _: manager.downloader.stop())
 
-        urls = []
+        # Hold the Results object open until the files of all requests have
+        # been queued, which also completes it if there are none.
+        results.require([])
         for request_id in requestIDs:
             u = self._request_status(request_id)
 
-            if u.status_code == 200 and u.json()['status'] == '0':
-                for ar in u.json()['data']:
-                    is_file = os.path.isfile(os.path.join(path, ar['filename']))
-                    if overwrite or not is_file:
-                        url_dir = BASE_DL_URL + u.json()['dir'] + '/'
-                        urls.append(urllib.parse.urljoin(url_dir, ar['filename']))
-
-                    else:
-                        print_message = "Skipping download of file {} as it " \
-                                        "has already been downloaded"
-                        print(print_message.format(ar['filename']))
-                        # Add the file on disk to the output
-                        results.map_.update({ar['filename']:{'path':os.path.join(path, ar['filename'])}})
-
-                if progress:
-                    print_message = "{0} URLs found for download. Totalling {1}MB"
-                    print(print_message.format(len(urls), u.json()['size']))
-
+            if u.status_code == 200 and int(u.json()['status']) == 0:
+                manager._download_request(u.json(), results)
             else:
                 if progress:
                     self.check_request(request_id)
-
-        if urls:
-            for url in urls:
-                downloader.download(url, callback=results.require([url]),
-                                    errback=lambda x: print(x), path=path)
-
-        else:
-            # Make Results think it has finished.
-            results.require([])
-            results.poke()
+        results.poke()
 
         return results
 
@@ -5,18 +5,23 @@ Created on Wed Mar 26 20:17:06 2014
 @author: stuart
 """
 import os
+import json
+import time
 import tempfile
 import datetime
+import threading
+import collections
 import astropy.table
 import astropy.time
 import astropy.units as u
 import pytest
 
 from sunpy.time import parse_time
-from sunpy.net.jsoc import JSOCClient, JSOCResponse
+from sunpy.net.jsoc import JSOCClient, JSOCResponse, JSOCExportManager
 from sunpy.net.download import Results
 import sunpy.net.jsoc.attrs as attrs
 import sunpy.net.vso.attrs as vso_attrs
+from sunpy.extern.six.moves import BaseHTTPServer, urllib
 
 client = JSOCClient()
 
@@ -284,3 +289,187 @@ def test_results_filenames():
 def test_invalid_query():
     with pytest.raises(ValueError):
         client.query(attrs.Time('2012/1/1T01:00:00', '2012/1/1T01:00:45'))
+
+
+class MockJSOCHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Serves the exp_status operation of jsoc_fetch and the exported files.
+
+    The server attribute ``ready_after`` maps request IDs to the number of
+    status checks after which the request is reported as staged, a value of
+    `None` makes the request fail. Before that, the status in ``waiting``
+    (1 by default) is reported, or an invalid response if it is `None`. The
+    staged requests in ``no_data`` are reported without their files."""
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body, content_type='application/json'):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        parsed = urllib.parse.urlparse(self.path)
+        if parsed.path == '/cgi-bin/ajax/jsoc_fetch':
+            query = urllib.parse.parse_qs(parsed.query)
+            request_id = query['requestid'][0]
+            server.polls[request_id] += 1
+            ready_after = server.ready_after[request_id]
+            if ready_after is None:
+                response = {'status': 4, 'requestid': request_id,
+                            'error': 'export failed'}
+            elif server.polls[request_id] >= ready_after:
+                server.log.append(('ready', request_id))
+                response = {'status': 0, 'requestid': request_id,
+                            'dir': '/SUM/' + request_id, 'size': 1,
+                            'data': [{'filename': '{0}_{1}.fits'.format(request_id, i)}
+                                     for i in range(2)]}
+                if request_id in server.no_data:
+                    del response['data']
+            elif server.waiting.get(request_id, 1) is None:
+                self._send(b'<html>Service unavailable</html>', 'text/html')
+                return
+            else:
+                response = {'status': server.waiting.get(request_id, 1),
+                            'requestid': request_id, 'wait': 1}
+            self._send(json.dumps(response).encode('utf-8'))
+        else:
+            server.log.append(('file', parsed.path))
+            self._send(b'fits', 'application/octet-stream')
+
+
+@pytest.fixture
+def jsoc_server():
+    server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), MockJSOCHandler)
+    server.polls = collections.Counter()
+    server.log = []
+    server.waiting = {}
+    server.no_data = set()
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_manager(server, path):
+    base_url = 'http://127.0.0.1:{0}'.format(server.server_address[1])
+    return JSOCExportManager(path=path, progress=False, initial_wait=0.01,
+                             max_wait=0.05, backoff=2,
+                             export_url=base_url + '/cgi-bin/ajax/jsoc_fetch',
+                             base_url=base_url)
+
+
+def test_export_manager_overlaps_staging(jsoc_server, tmpdir):
+    jsoc_server.ready_after = {'JSOC_A': 1, 'JSOC_B': 5}
+    manager = make_manager(jsoc_server, str(tmpdir))
+    files = manager.start(['JSOC_A', 'JSOC_B']).wait(progress=False)
+
+    assert sorted(os.path.basename(f) for f in files) == [
+        'JSOC_A_0.fits', 'JSOC_A_1.fits', 'JSOC_B_0.fits', 'JSOC_B_1.fits']
+    assert all(os.path.exists(f) for f in files)
+    assert jsoc_server.polls == {'JSOC_A': 1, 'JSOC_B': 5}
+    # The files of the first request were fetched before the second request
+    # had been staged.
+    log = jsoc_server.log
+    assert log.index(('file', '/SUM/JSOC_A/JSOC_A_0.fits')) < log.index(('ready', 'JSOC_B'))
+
+
+def test_export_manager_failed_request(jsoc_server, tmpdir):
+    jsoc_server.ready_after = {'JSOC_A': 2, 'JSOC_B': None}
+    manager = make_manager(jsoc_server, str(tmpdir))
+    results = manager.start(['JSOC_A', 'JSOC_B'])
+    files = results.wait(progress=False)
+    assert len(files) == 2
+    assert len(results.errors) == 1
+    assert 'JSOC_B' in str(results.errors[0])
+
+
+def test_export_manager_retries_queued_and_invalid(jsoc_server, tmpdir):
+    jsoc_server.ready_after = {'JSOC_A': 3, 'JSOC_B': 3}
+    jsoc_server.waiting = {'JSOC_A': 2, 'JSOC_B': None}
+    manager = make_manager(jsoc_server, str(tmpdir))
+    results = manager.start(['JSOC_A', 'JSOC_B'])
+    files = results.wait(progress=False)
+    assert len(files) == 4
+    assert results.errors == []
+    assert jsoc_server.polls == {'JSOC_A': 3, 'JSOC_B': 3}
+
+
+def test_export_manager_invalid_export(jsoc_server, tmpdir):
+    jsoc_server.ready_after = {'JSOC_A': 1, 'JSOC_B': 1}
+    jsoc_server.no_data = {'JSOC_B'}
+    manager = make_manager(jsoc_server, str(tmpdir))
+    results = manager.start(['JSOC_A', 'JSOC_B'])
+    # finishes although the files of JSOC_B cannot be queued
+    assert results.evt.wait(5)
+    files = results.wait(progress=False)
+    assert len(files) == 2
+    assert len(results.errors) == 1
+    assert 'JSOC_B' in str(results.errors[0])
+
+
+def test_export_manager_initial_wait(jsoc_server, tmpdir):
+    jsoc_server.ready_after = {'JSOC_A': 1}
+    manager = make_manager(jsoc_server, str(tmpdir))
+    manager.initial_wait = 0.5
+    begin = time.time()
+    manager.start(['JSOC_A']).wait(progress=False)
+    assert time.time() - begin >= 0.5
+
+
+def test_export_manager_no_requests(tmpdir):
+    manager = JSOCExportManager(path=str(tmpdir), progress=False)
+    assert manager.start([]).wait(progress=False) == []
+
+
+def test_export_manager_gives_up_unreachable(jsoc_server, tmpdir):
+    jsoc_server.ready_after = {'JSOC_A': 1, 'JSOC_B': 100}
+    jsoc_server.waiting = {'JSOC_B': None}
+    manager = make_manager(jsoc_server, str(tmpdir))
+    manager.max_failures = 3
+    results = manager.start(['JSOC_A', 'JSOC_B'])
+    assert results.evt.wait(5)
+    assert len(results.wait(progress=False)) == 2
+    assert len(results.errors) == 1
+    assert 'JSOC_B' in str(results.errors[0])
+    assert jsoc_server.polls['JSOC_B'] == 3
+
+
+def drain(results):
+    items = []
+    while True:
+        item = results.queue.get(timeout=5)
+        if item is None:
+            return items
+        items.append(item)
+
+
+def test_export_manager_queue(jsoc_server, tmpdir):
+    jsoc_server.ready_after = {'JSOC_A': 1, 'JSOC_B': 2}
+    # a file which has been downloaded before
+    tmpdir.join('JSOC_A_0.fits').write('fits')
+    manager = make_manager(jsoc_server, str(tmpdir))
+    results = manager.start(['JSOC_A', 'JSOC_B'])
+    items = drain(results)
+    assert len(items) == 4
+    assert all(keys for keys, value in items)
+    assert (['JSOC_A_0.fits'], {'path': str(tmpdir.join('JSOC_A_0.fits'))}) in items
+    assert ('file', '/SUM/JSOC_A/JSOC_A_0.fits') not in jsoc_server.log
+
+
+def test_get_request_files_on_disk(jsoc_server, tmpdir, monkeypatch):
+    jsoc_server.ready_after = {'JSOC_A': 1}
+    for i in range(2):
+        tmpdir.join('JSOC_A_{0}.fits'.format(i)).write('fits')
+    manager = make_manager(jsoc_server, str(tmpdir))
+    monkeypatch.setattr(client, '_request_status', manager._request_status)
+    results = client.get_request('JSOC_A', path=str(tmpdir), progress=False)
+    items = drain(results)
+    assert sorted(keys[0] for keys, value in items) == [
+        'JSOC_A_0.fits', 'JSOC_A_1.fits']
+    assert not [entry for entry in jsoc_server.log if entry[0] == 'file']
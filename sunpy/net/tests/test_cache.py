@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+import os
+
+import pytest
+import astropy.units as u
+
+from sunpy.net.cache import DownloadCache, _parse_size
+
+
+def write_file(directory, name, size):
+    path = os.path.join(str(directory), name)
+    with open(path, 'wb') as fd:
+        fd.write(b'x' * size)
+    return path
+
+
+@pytest.fixture
+def cache(tmpdir):
+    return DownloadCache(str(tmpdir.join('index.json')))
+
+
+def test_parse_size():
+    assert _parse_size(None) is None
+    assert _parse_size(0) is None
+    assert _parse_size(100) == 100
+    assert _parse_size('100') == 100
+    assert _parse_size('2 kB') == 2000
+    assert _parse_size(1 * u.MB) == 1000000
+
+
+def test_add_get(cache, tmpdir):
+    path = write_file(tmpdir, 'a.fits', 10)
+    assert cache.get('http://a') is None
+    cache.add('http://a', path, etag='"abc"')
+    assert cache.get('http://a') == path
+    assert cache.get('http://a', verify=True) == path
+    assert 'http://a' in cache
+    assert len(cache) == 1
+    assert cache.size == 10
+
+
+def test_persistence(cache, tmpdir):
+    path = write_file(tmpdir, 'a.fits', 10)
+    cache.add('http://a', path)
+    other = DownloadCache(cache.index_path)
+    assert other.get('http://a') == path
+
+
+def test_invalid_entries(cache, tmpdir):
+    path = write_file(tmpdir, 'a.fits', 10)
+    cache.add('http://a', path)
+    # A changed size invalidates the entry.
+    write_file(tmpdir, 'a.fits', 5)
+    assert cache.get('http://a') is None
+    assert len(cache) == 0
+
+    path = write_file(tmpdir, 'b.fits', 10)
+    cache.add('http://b', path)
+    # The checksum is only compared on request.
+    with open(path, 'wb') as fd:
+        fd.write(b'y' * 10)
+    assert cache.get('http://b') == path
+    assert cache.get('http://b', verify=True) is None
+
+    path = write_file(tmpdir, 'c.fits', 10)
+    cache.add('http://c', path)
+    os.remove(path)
+    assert cache.get('http://c') is None
+
+
+def test_lru_eviction(tmpdir):
+    cache = DownloadCache(str(tmpdir.join('index.json')), max_size=25)
+    paths = [write_file(tmpdir, name, 10) for name in 'abc']
+    cache.add('http://a', paths[0])
+    cache.add('http://b', paths[1])
+    # Touch a so that b is the least recently used entry.
+    cache.get('http://a')
+    cache.add('http://c', paths[2])
+    assert cache.get('http://b') is None
+    assert not os.path.exists(paths[1])
+    assert cache.get('http://a') == paths[0]
+    assert cache.get('http://c') == paths[2]
+    assert cache.size == 20
+
+
+def test_oversized_file_is_kept(tmpdir):
+    cache = DownloadCache(str(tmpdir.join('index.json')), max_size=5)
+    path = write_file(tmpdir, 'a.fits', 10)
+    cache.add('http://a', path)
+    assert cache.get('http://a') == path
+
+
+def test_remove_and_clear(cache, tmpdir):
+    a = write_file(tmpdir, 'a.fits', 10)
+    b = write_file(tmpdir, 'b.fits', 10)
+    cache.add('http://a', a)
+    cache.add('http://b', b)
+    cache.remove('http://a')
+    assert os.path.exists(a)
+    assert cache.get('http://a') is None
+    cache.clear(delete=True)
+    assert len(cache) == 0
+    assert not os.path.exists(b)
+
+
+def test_get_directory(cache, tmpdir):
+    path = write_file(tmpdir, 'a.fits', 10)
+    cache.add('http://a', path)
+    assert cache.get('http://a', directory=str(tmpdir)) == path
+    assert cache.get('http://a', directory=str(tmpdir.join('other'))) is None
+    # a copy in another directory stays in the index
+    assert cache.get('http://a') == path
+
+
+def test_etag(cache, tmpdir):
+    cache.add('http://a', write_file(tmpdir, 'a.fits', 10), etag='"abc"')
+    assert cache.etag('http://a') == '"abc"'
+    assert cache.etag('http://b') is None
+
+
+def test_journal(cache, tmpdir):
+    a = write_file(tmpdir, 'a.fits', 10)
+    b = write_file(tmpdir, 'b.fits', 20)
+    cache.add('http://a', a)
+    cache.add('http://b', b)
+    cache.remove('http://a')
+    # every change appends a line instead of rewriting the index
+    with open(cache.index_path) as fd:
+        assert len(fd.readlines()) == 3
+    other = DownloadCache(cache.index_path)
+    assert len(other) == 1
+    assert other.size == 20
+    assert other.get('http://b') == b
+
+
+def test_journal_compaction(cache, tmpdir):
+    path = write_file(tmpdir, 'a.fits', 10)
+    cache.add('http://a', path)
+    for _ in range(2 * DownloadCache._slack):
+        cache.get('http://a')
+    with open(cache.index_path) as fd:
+        assert len(fd.readlines()) <= DownloadCache._slack + 3
+    assert DownloadCache(cache.index_path).get('http://a') == path
+
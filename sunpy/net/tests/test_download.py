@@ -7,14 +7,19 @@ from __future__ import absolute_import
 
 import pytest
 
+import io
 import os
+import time
+import hashlib
 import tempfile
 import threading
+import collections
 
 from functools import partial
 
 import sunpy
 
+from sunpy.net import download
 from sunpy.net.download import Downloader, default_name
 
 
@@ -160,3 +165,195 @@ def test_download_dir():
     assert not timeout.fired
     assert not errback.fired
     assert os.path.exists(os.path.join(tmpdir, 'jquery.min.js'))
+
+
+class FakeSocket(io.BytesIO):
+    headers = {'ETag': '"tag"'}
+
+
+def test_connection_limits(monkeypatch, tmpdir):
+    lock = threading.Lock()
+    active = collections.Counter()
+    peak = collections.Counter()
+
+    def fake_urlopen(url):
+        server = url.split('/')[2]
+        with lock:
+            active[server] += 1
+            active['total'] += 1
+            peak[server] = max(peak[server], active[server])
+            peak['total'] = max(peak['total'], active['total'])
+        time.sleep(0.01)
+        with lock:
+            active[server] -= 1
+            active['total'] -= 1
+        return FakeSocket(b'x' * 100)
+
+    monkeypatch.setattr(download.urllib.request, 'urlopen', fake_urlopen)
+
+    done = threading.Event()
+    results = []
+
+    def callback(result):
+        results.append(result)
+        if len(results) == 30:
+            done.set()
+
+    dw = Downloader(max_conn=2, max_total=3)
+    for i in range(30):
+        url = 'http://server{0}.org/file{1}.fits'.format(i % 3, i)
+        dw.download(url, str(tmpdir), callback, lambda e: done.set())
+    assert done.wait(10)
+
+    assert len(results) == 30
+    assert peak['total'] <= 3
+    assert all(peak['server{0}.org'.format(i)] <= 2 for i in range(3))
+    assert dw.conns == 0
+    assert dw.queued == 0
+    assert all(r['size'] == 100 and r['etag'] == '"tag"' for r in results)
+    assert all(os.path.getsize(r['path']) == 100 for r in results)
+    assert len(dw.transfers) == 30
+    assert dw.throughput() > 0
+
+
+def test_failed_download_frees_connection(monkeypatch, tmpdir):
+    def fake_urlopen(url):
+        if 'bad' in url:
+            raise IOError(url)
+        return FakeSocket(b'x')
+
+    monkeypatch.setattr(download.urllib.request, 'urlopen', fake_urlopen)
+
+    done = threading.Event()
+    items = []
+
+    def handler(item):
+        items.append(item)
+        if len(items) == 3:
+            done.set()
+
+    dw = Downloader(max_conn=1, max_total=1)
+    dw.download('http://server.org/bad', str(tmpdir), handler, handler)
+    dw.download('http://server.org/good1', str(tmpdir), handler, handler)
+    dw.download('http://server.org/good2', str(tmpdir), handler, handler)
+    assert done.wait(10)
+    assert isinstance(items[0], IOError)
+    assert [os.path.basename(item['path']) for item in items[1:]] == ['good1', 'good2']
+
+
+def test_servers_take_turns(monkeypatch, tmpdir):
+    release = threading.Event()
+    opened = []
+
+    def fake_urlopen(url):
+        opened.append(url)
+        if url.endswith('a1'):
+            assert release.wait(10)
+        return FakeSocket(b'x')
+
+    monkeypatch.setattr(download.urllib.request, 'urlopen', fake_urlopen)
+    done = threading.Event()
+    results = []
+
+    def callback(result):
+        results.append(result)
+        if len(results) == 4:
+            done.set()
+
+    dw = Downloader(max_conn=1, max_total=1)
+    for url in ['http://a.org/a1', 'http://a.org/a2', 'http://a.org/a3',
+                'http://b.org/b1']:
+        dw.download(url, str(tmpdir), callback)
+    release.set()
+    assert done.wait(10)
+    assert opened == ['http://a.org/a1', 'http://b.org/b1',
+                      'http://a.org/a2', 'http://a.org/a3']
+
+
+def test_callbacks_run_without_mutex(monkeypatch, tmpdir):
+    monkeypatch.setattr(download.urllib.request, 'urlopen',
+                        lambda url: FakeSocket(b'x'))
+    done = threading.Event()
+    held = []
+
+    def callback(result):
+        # the mutex can be taken by another thread while the callback runs
+        acquired = []
+
+        def acquire():
+            acquired.append(dw.mutex.acquire(False))
+            if acquired[0]:
+                dw.mutex.release()
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        thread.join()
+        held.append(not acquired[0])
+        done.set()
+
+    dw = Downloader()
+    dw.download('http://server.org/file', str(tmpdir), callback)
+    assert done.wait(10)
+    assert held == [False]
+
+
+class BrokenSocket(FakeSocket):
+    def read(self, size=-1):
+        data = super(BrokenSocket, self).read(size)
+        if not data:
+            raise IOError('connection reset')
+        return data
+
+
+def test_failed_download_removes_part_file(monkeypatch, tmpdir):
+    monkeypatch.setattr(download.urllib.request, 'urlopen',
+                        lambda url: BrokenSocket(b'x' * 100))
+    done = threading.Event()
+    errors = []
+
+    def errback(e):
+        errors.append(e)
+        done.set()
+
+    dw = Downloader()
+    dw.download('http://server.org/file.fits', str(tmpdir), None, errback)
+    assert done.wait(10)
+    assert isinstance(errors[0], IOError)
+    assert tmpdir.listdir() == []
+
+
+def test_download_checksum_and_headers(monkeypatch, tmpdir):
+    requests = []
+
+    def fake_urlopen(request):
+        requests.append(request)
+        return FakeSocket(b'x' * 100)
+
+    monkeypatch.setattr(download.urllib.request, 'urlopen', fake_urlopen)
+    done = threading.Event()
+    results = []
+
+    def callback(result):
+        results.append(result)
+        done.set()
+
+    dw = Downloader()
+    dw.download('http://server.org/file.fits', str(tmpdir), callback,
+                headers={'If-None-Match': '"tag"'})
+    assert done.wait(10)
+    assert requests[0].get_header('If-none-match') == '"tag"'
+    assert results[0]['sha256'] == hashlib.sha256(b'x' * 100).hexdigest()
+
+
+def test_results_queue():
+    results = download.Results(lambda _: None, 1)
+    submit = results.require(['a', 'b'])
+    results.require(['c'])
+    submit({'path': 'ab.fits'})
+    error = IOError('c')
+    results.add_error(error)
+    assert not results.evt.is_set()
+    results.poke()
+    assert list(iter(results.queue.get, None)) == [
+        (['a', 'b'], {'path': 'ab.fits'}), (None, error)]
+    assert results.evt.is_set()
@@ -87,3 +87,89 @@ def test_err_dummyattr_create():
 def test_err_dummyattr_apply():
     with pytest.raises(TypeError):
         hek.attrs.walker.apply(attr.DummyAttr(), {})
+
+
+class PagedHEKClient(hek.HEKClient):
+    """HEKClient serving canned result pages instead of querying the HEK."""
+    def __init__(self, npages, per_page=3):
+        super(PagedHEKClient, self).__init__()
+        self.npages = npages
+        self.per_page = per_page
+        self.requested = []
+
+    def _fetch_page(self, data, page):
+        self.requested.append(page)
+        if page > self.npages:
+            return {'result': [], 'overmax': False}
+        records = [{'event_type': data['event_type'],
+                    'id': (page - 1) * self.per_page + i,
+                    'kb_archivid': 'ivo://helio-informatics.org/{0}'.format(
+                        (page - 1) * self.per_page + i)}
+                   for i in range(self.per_page)]
+        return {'result': records, 'overmax': page < self.npages}
+
+
+@pytest.mark.parametrize('prefetch', [0, 1, 4])
+def test_query_iter_pages(prefetch):
+    client = PagedHEKClient(5)
+    results = list(client.query_iter(hek.attrs.FL, prefetch=prefetch))
+    assert [r['id'] for r in results] == list(range(15))
+    assert all(isinstance(r, hek.hek.Response) for r in results)
+    assert client.query(hek.attrs.FL, prefetch=prefetch) == results
+
+
+@pytest.mark.parametrize('prefetch', [0, 4])
+def test_query_iter_single_page(prefetch):
+    client = PagedHEKClient(1)
+    results = list(client.query_iter(hek.attrs.FL, prefetch=prefetch))
+    assert len(results) == 3
+    # no requests for pages past the only one
+    assert client.requested == [1]
+
+
+def test_query_iter_is_lazy():
+    client = PagedHEKClient(5)
+    it = client.query_iter(hek.attrs.FL)
+    assert client.requested == []
+    next(it)
+    assert client.requested == [1]
+
+
+def test_query_iter_merges_or():
+    client = PagedHEKClient(2)
+    query = (hek.attrs.Time((2011, 1, 1), (2011, 1, 2)) |
+             hek.attrs.Time((2011, 1, 3), (2011, 1, 4)))
+    # Both sub-queries return the same records, which are only yielded once.
+    results = list(client.query_iter(query, hek.attrs.FL))
+    assert [r['id'] for r in results] == list(range(6))
+    assert client.requested == [1, 2, 1, 2]
+    assert client.query(query, hek.attrs.FL) == results
+
+
+def test_query_iter_merges_or_by_event_id():
+    class ChangingClient(PagedHEKClient):
+        def _fetch_page(self, data, page):
+            result = super(ChangingClient, self)._fetch_page(data, page)
+            for record in result['result']:
+                record['query'] = len(self.requested)
+            return result
+
+    query = (hek.attrs.Time((2011, 1, 1), (2011, 1, 2)) |
+             hek.attrs.Time((2011, 1, 3), (2011, 1, 4)))
+    results = list(ChangingClient(1).query_iter(query, hek.attrs.FL))
+    assert [r['id'] for r in results] == list(range(3))
+    merged = ChangingClient(1).query(query, hek.attrs.FL)
+    assert merged == results
+
+
+def test_query_iter_prefetch_error():
+    class FailingClient(PagedHEKClient):
+        def _fetch_page(self, data, page):
+            if page == 2:
+                raise IOError('page 2')
+            return super(FailingClient, self)._fetch_page(data, page)
+
+    it = FailingClient(3).query_iter(hek.attrs.FL, prefetch=2)
+    assert len([next(it) for _ in range(3)]) == 3
+    with pytest.raises(IOError):
+        next(it)
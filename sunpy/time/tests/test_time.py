@@ -22,6 +22,15 @@ def test_parse_time_24_2():
     assert parse_time("2010-10-10T24:00:00.000000") == datetime(2010, 10, 11)
 
 
+def test_parse_time_24_with_minutes():
+    # no format of TIME_FORMAT_LIST matches, so the given format is tried
+    assert parse_time('2010-10-10T24:30:00',
+                      _time_string_parse_format='%Y-%m-%dT24:%M:%S') == \
+        datetime(2010, 10, 10, 0, 30)
+    with pytest.raises(ValueError):
+        parse_time('2010-10-10T24:30:00')
+
+
 def test_parse_time_trailing_zeros():
     # see issue #289 at https://github.com/sunpy/sunpy/issues/289
     assert parse_time('2010-10-10T00:00:00.00000000') == datetime(2010, 10, 10)
@@ -156,3 +165,47 @@ def test_time_string_parse_format():
         parse_time('01/06/2012')
     with pytest.raises(ValueError):
         parse_time('01/06/2012', time_string_parse_format='%d/%m/%m')
+
+
+def test_parse_time_last_format():
+    # alternating formats must not be mixed up by trying the last one first
+    assert parse_time('2007/05/04 21:08') == datetime(2007, 5, 4, 21, 8)
+    assert parse_time('2007-05-04') == datetime(2007, 5, 4)
+    assert parse_time('2007/05/04 21:08') == datetime(2007, 5, 4, 21, 8)
+    assert time.time._last_format == '%Y/%m/%d %H:%M'
+
+
+def test_parse_times():
+    strings = ['2007-05-04T21:08:12.000', '2007-05-04T21:08:12.5']
+    parsed = time.parse_times(strings)
+    assert parsed.dtype == np.dtype('datetime64[us]')
+    assert list(parsed.astype(datetime)) == [
+        datetime(2007, 5, 4, 21, 8, 12), datetime(2007, 5, 4, 21, 8, 12, 500000)]
+    assert time.parse_times(np.array([[b'2012:124:21:08:12']])).shape == (1, 1)
+    assert len(time.parse_times([])) == 0
+
+
+def test_parse_year_months():
+    parsed = time.parse_year_months(['1969', '2016', '2016'], ['12', '01', '12'])
+    assert parsed.dtype == np.dtype('datetime64[M]')
+    assert list(parsed.astype('datetime64[D]').astype(datetime)) == [
+        datetime(1969, 12, 1).date(), datetime(2016, 1, 1).date(),
+        datetime(2016, 12, 1).date()]
+    assert list(time.parse_year_months([2016], [2])) == [np.datetime64('2016-02')]
+
+
+@pytest.mark.parametrize('values', [
+    ['2010-10-10T24:00:00', '2010-10-10T12:00:00'],
+    ['2010-10-11', '2010/10/10 12:00'],
+    [datetime(2010, 10, 11), '2010-10-10 12:00:00'],
+    np.array(['2010-10-11', '2010-10-10T12'], dtype='datetime64'),
+])
+def test_parse_times_falls_back(values):
+    assert list(time.parse_times(values).astype(datetime)) == [
+        datetime(2010, 10, 11), datetime(2010, 10, 10, 12)]
+
+
+def test_parse_times_format():
+    parsed = time.parse_times(['01/06/2012', '02/06/2012'], '%d/%m/%Y')
+    assert list(parsed.astype(datetime)) == [datetime(2012, 6, 1),
+                                             datetime(2012, 6, 2)]
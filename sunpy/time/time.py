@@ -9,7 +9,8 @@ from sunpy.extern import six
 
 import astropy.time
 
-__all__ = ['find_time', 'extract_time', 'parse_time', 'is_time',
+__all__ = ['find_time', 'extract_time', 'parse_time', 'parse_times',
+           'parse_year_months', 'is_time',
            'day_of_year', 'break_time', 'get_day', 'is_time_in_given_format']
 
 # Mapping of time format codes to regular expressions.
@@ -54,6 +55,26 @@ TIME_FORMAT_LIST = [
 ]
 
 
+# The regular expressions of the time formats, compiled when first used.
+_COMPILED_REGEX = {}
+
+# The format of the last string parse_time parsed, which is tried first the
+# next time because consecutive calls usually parse times of the same kind.
+_last_format = None
+
+
+def _format_regex(format):
+    """Return the compiled regular expression matching the given format."""
+    try:
+        return _COMPILED_REGEX[format]
+    except KeyError:
+        pattern = format
+        for key, value in six.iteritems(REGEX):
+            pattern = pattern.replace(key, value)
+        regex = _COMPILED_REGEX[format] = re.compile(pattern)
+        return regex
+
+
 def _group_or_none(match, group, fun):
     try:
         ret = match.group(group)
@@ -71,9 +92,7 @@ def _regex_parse_time(inp, format):
     # Parser for finding out the minute value so we can adjust the string
     # from 24:00:00 to 00:00:00 the next day because strptime does not
     # understand the former.
-    for key, value in six.iteritems(REGEX):
-        format = format.replace(key, value)
-    match = re.match(format, inp)
+    match = _format_regex(format).match(inp)
     if match is None:
         return None, None
     try:
@@ -94,10 +113,7 @@ def _regex_parse_time(inp, format):
 def find_time(string, format):
     """ Return iterator of occurrences of date formatted with format
     in string. Currently supported format codes: """
-    re_format = format
-    for key, value in six.iteritems(REGEX):
-        re_format = re_format.replace(key, value)
-    matches = re.finditer(re_format, string)
+    matches = _format_regex(format).finditer(string)
     for match in matches:
         try:
             matchstr = string[slice(*match.span())]
@@ -202,18 +218,12 @@ def parse_time(time_string, time_format='', **kwargs):
         # number of zeros. This solves issue #289
         if '.' in time_string:
             time_string = time_string.rstrip("0").rstrip(".")
-        for time_format in TIME_FORMAT_LIST:
-            try:
-                try:
-                    ts, time_delta = _regex_parse_time(time_string,
-                                                       time_format)
-                except TypeError:
-                    break
-                if ts is None:
-                    continue
-                return datetime.strptime(ts, time_format) + time_delta
-            except ValueError:
-                pass
+        try:
+            time_format, dt = _find_format(time_string)
+        except TypeError:
+            time_format = None
+        if time_format is not None:
+            return dt
 
         time_string_parse_format = kwargs.pop('_time_string_parse_format', None)
         if time_string_parse_format is not None:
@@ -229,6 +239,124 @@ def parse_time(time_string, time_format='', **kwargs):
         raise ValueError("{tstr!s} is not a valid time string!".format(tstr=time_string))
 
 
+def _parse_with_format(time_string, time_format):
+    """Parse the string with the given format of `TIME_FORMAT_LIST` and
+    return the datetime or None if it does not match. A `TypeError` is
+    raised if the time string is not a string."""
+    try:
+        # e.g. an hour of 24 with nonzero minutes raises a ValueError
+        ts, time_delta = _regex_parse_time(time_string, time_format)
+        if ts is None:
+            return None
+        return datetime.strptime(ts, time_format) + time_delta
+    except ValueError:
+        return None
+
+
+def _find_format(time_string):
+    """Return the first format of `TIME_FORMAT_LIST` which matches the time
+    string and the parsed datetime, or ``(None, None)``. The format which
+    matched last time is tried first."""
+    global _last_format
+    last_format = _last_format
+    if last_format is not None:
+        dt = _parse_with_format(time_string, last_format)
+        if dt is not None:
+            return last_format, dt
+    for time_format in TIME_FORMAT_LIST:
+        if time_format == last_format:
+            continue
+        dt = _parse_with_format(time_string, time_format)
+        if dt is not None:
+            _last_format = time_format
+            return time_format, dt
+    return None, None
+
+
+def parse_times(time_strings, time_format=None):
+    """
+    Parse an array of times at once.
+
+    The format of the first time string is determined like in `parse_time`
+    and all strings are then converted by `pandas.to_datetime` with that
+    format in a single vectorized call. If the strings do not all share the
+    format, or the values are not strings, every value is parsed with
+    `parse_time` instead.
+
+    Parameters
+    ----------
+    time_strings : array_like
+        The times to parse, usually strings in one of the formats of
+        ``TIME_FORMAT_LIST``, but anything `parse_time` understands is
+        accepted.
+    time_format : str, optional
+        The `~datetime.datetime.strptime` format of all strings. By default
+        it is detected from the first string.
+
+    Returns
+    -------
+    out : `numpy.ndarray`
+        The times as ``datetime64[us]`` values in an array of the same shape
+        as the input.
+
+    Examples
+    --------
+    >>> import sunpy.time
+    >>> times = sunpy.time.parse_times(['2012/08/01', '2012/08/02'])
+    >>> times.dtype
+    dtype('<M8[us]')
+    >>> times[1]
+    numpy.datetime64('2012-08-02T00:00:00.000000')
+    """
+    values = np.asarray(time_strings)
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[us]')
+    flat = values.ravel()
+    if values.dtype.kind == 'S':
+        flat = np.char.decode(flat, 'ascii')
+    if flat.size and flat.dtype.kind == 'U':
+        if time_format is None:
+            time_format, _ = _find_format(flat[0])
+        if time_format is not None:
+            try:
+                parsed = pandas.to_datetime(flat, format=time_format)
+            except (ValueError, TypeError):
+                # e.g. different formats or hours of 24, see parse_time
+                pass
+            else:
+                return np.asarray(parsed, dtype='datetime64[us]').reshape(
+                    values.shape)
+    return np.array([parse_time(value) for value in flat],
+                    dtype='datetime64[us]').reshape(values.shape)
+
+
+def parse_year_months(years, months):
+    """
+    Return the first days of the months given as arrays of years and months.
+
+    Parameters
+    ----------
+    years, months : array_like
+        The years and the months (1 to 12), as integers or strings like
+        ``'2016'`` and ``'01'``, e.g. the columns of a table of monthly values.
+
+    Returns
+    -------
+    out : `numpy.ndarray`
+        The months as ``datetime64[M]`` values.
+
+    Examples
+    --------
+    >>> import sunpy.time
+    >>> sunpy.time.parse_year_months(['2016', '2016'], ['01', '12'])
+    array(['2016-01', '2016-12'], dtype='datetime64[M]')
+    """
+    # months since 1970-01 map directly onto datetime64[M]
+    months = ((np.asarray(years).astype(np.int64) - 1970) * 12 +
+              np.asarray(months).astype(np.int64) - 1)
+    return months.astype('datetime64[M]')
+
+
 def is_time(time_string, time_format=''):
     """
     Returns true if the input is a valid date/time representation
@@ -7,6 +7,7 @@ from __future__ import absolute_import
 from sunpy.timeseries.metadata import TimeSeriesMetaData
 from sunpy.timeseries.timeseries_factory import TimeSeries
 from sunpy.timeseries.timeseriesbase import GenericTimeSeries
+from sunpy.timeseries.streaming import StreamingTimeSeries
 from sunpy.timeseries.sources.eve import EVESpWxTimeSeries
 from sunpy.timeseries.sources.goes import XRSTimeSeries
 from sunpy.timeseries.sources.noaa import NOAAIndicesTimeSeries, NOAAPredictIndicesTimeSeries
@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+"""
+A persistent cache of parsed time series files.
+
+Parsing the files of some sources, e.g. the text files of EVE and NOAA, takes
+much longer than reading the resulting arrays back. The cache keeps the data,
+metadata and units of every `~sunpy.timeseries.GenericTimeSeries` read from a
+file in a directory of its own: the time index and the columns are stored as
+``.npy`` files which are memory-mapped when the entry is loaded, the metadata
+and units are pickled. Entries are keyed by the absolute path, size and
+modification time of the file and by the ``source`` it was read with, so a
+modified file is parsed again. An entry is also ignored if the
+``_parser_version`` of its source class changed since it was written. The
+least recently used entries are deleted once the total size of the cache
+exceeds a limit. The order in which the entries were used is kept in memory
+and written to the index together with the next change of the cache, by
+`TimeSeriesCache.flush` or when the interpreter exits.
+
+Several processes may share a cache directory. Before an index is written,
+the entries which other processes added to the index on disk are merged into
+it, and entry directories which are missing from every index, e.g. because
+two processes wrote their index at the same time, count towards the size
+limit and are deleted first.
+"""
+from __future__ import absolute_import, division, print_function
+
+import os
+import re
+import json
+import atexit
+import shutil
+import hashlib
+import weakref
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import sunpy
+from sunpy.extern.six.moves import cPickle as pickle
+from sunpy.util.util import _parse_size, _replace
+
+__all__ = ['TimeSeriesCache', 'get_default_cache']
+
+# Bump when the layout of the cached entries changes.
+_FORMAT_VERSION = 1
+
+_default_cache = None
+
+# The names of the entry directories, the hex digests made by _file_key.
+_KEY_PATTERN = re.compile('^[0-9a-f]{64}$')
+
+# The caches whose order of use is written to their index on exit.
+_open_caches = weakref.WeakSet()
+
+
+def _file_key(path, source):
+    """Return the key of the cache entry of the file at ``path`` read with
+    ``source``."""
+    stat = os.stat(path)
+    key = json.dumps([_FORMAT_VERSION, path, stat.st_size,
+                      repr(stat.st_mtime), source and source.lower()])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def _directory_size(path):
+    return sum(os.path.getsize(os.path.join(path, name))
+               for name in os.listdir(path))
+
+
+class TimeSeriesCache(object):
+    """
+    Cache of parsed time series keyed by the file they were read from.
+
+    Parameters
+    ----------
+    cache_dir : `str`
+        Directory the entries and the JSON index of the cache are stored in.
+        It is created on the first insertion.
+    max_size : `int`, `str` or `~astropy.units.Quantity`, optional
+        Upper limit for the summed size of all entries, either in bytes or as
+        a string like ``'1 GB'``. If adding an entry exceeds this limit, the
+        least recently used entries are deleted. By default the cache is
+        unbounded.
+
+    Examples
+    --------
+    >>> import sunpy.timeseries
+    >>> from sunpy.timeseries.cache import TimeSeriesCache
+    >>> cache = TimeSeriesCache('/tmp/ts_cache', max_size='1 GB')  # doctest: +SKIP
+    >>> ts = sunpy.timeseries.TimeSeries('eve.txt', source='EVE', cache=cache)  # doctest: +SKIP
+    """
+
+    def __init__(self, cache_dir, max_size=None):
+        self.cache_dir = cache_dir
+        self.max_size = _parse_size(max_size)
+        self._lock = threading.RLock()
+        self._entries = self._load()
+        # Whether the order of the entries changed since the index was saved.
+        self._dirty = False
+        _open_caches.add(self)
+
+    @property
+    def index_path(self):
+        return os.path.join(self.cache_dir, 'index.json')
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            return OrderedDict()
+        try:
+            with open(self.index_path) as fd:
+                return json.load(fd, object_pairs_hook=OrderedDict)
+        except ValueError:
+            # A corrupt index is not fatal, the files are simply parsed again.
+            return OrderedDict()
+
+    def _merge(self):
+        """Adopt the entries which other processes added to the index on disk
+        as the least recently used ones and drop those they deleted."""
+        def exists(key):
+            return os.path.isdir(os.path.join(self.cache_dir, key))
+        entries = OrderedDict(
+            (key, entry) for key, entry in self._load().items()
+            if key not in self._entries and exists(key))
+        entries.update((key, entry) for key, entry in self._entries.items()
+                       if exists(key))
+        self._entries = entries
+
+    def _orphans(self):
+        """Return the keys of the entry directories which are not in the
+        index."""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return [name for name in os.listdir(self.cache_dir)
+                if _KEY_PATTERN.match(name) and name not in self._entries and
+                os.path.isdir(os.path.join(self.cache_dir, name))]
+
+    def _save(self):
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        self._merge()
+        # Processes sharing the cache must not write to the same file.
+        tmp = '{0}.{1}.part'.format(self.index_path, os.getpid())
+        with open(tmp, 'w') as fd:
+            json.dump(self._entries, fd)
+        _replace(tmp, self.index_path)
+        self._dirty = False
+
+    def flush(self):
+        """Write the order in which the entries were used to the index."""
+        with self._lock:
+            # Without the directory there are no entries to keep track of.
+            if self._dirty and os.path.isdir(self.cache_dir):
+                self._save()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        """The summed size in bytes of all entries."""
+        with self._lock:
+            return sum(entry['size'] for entry in self._entries.values())
+
+    def get(self, path, source=None):
+        """
+        Return the time series parsed from the file at ``path`` or `None` if
+        there is no valid entry for it.
+
+        Parameters
+        ----------
+        path : `str`
+            The file the time series was read from.
+        source : `str`, optional
+            The ``source`` keyword the file was read with.
+        """
+        path = os.path.abspath(path)
+        key = _file_key(path, source)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            try:
+                timeseries = self._read(key)
+            except (IOError, OSError, ValueError, EOFError,
+                    pickle.UnpicklingError):
+                timeseries = None
+            if timeseries is None:
+                self._delete_entry(key)
+                self._save()
+                return None
+            # Re-inserting moves the entry to the most recently used end. The
+            # new order is saved with the next change or by flush.
+            self._entries[key] = entry
+            self._dirty = True
+            return timeseries
+
+    def add(self, path, timeseries, source=None):
+        """
+        Store ``timeseries`` as the result of reading the file at ``path``.
+
+        Parameters
+        ----------
+        path : `str`
+            The file the time series was read from.
+        timeseries : `~sunpy.timeseries.GenericTimeSeries`
+            The time series parsed from the file.
+        source : `str`, optional
+            The ``source`` keyword the file was read with.
+        """
+        path = os.path.abspath(path)
+        key = _file_key(path, source)
+        with self._lock:
+            self._merge()
+            # Entries of previous versions of the same file are useless now.
+            for old in [k for k, entry in self._entries.items()
+                        if entry['path'] == path and k != key]:
+                self._entries.pop(old)
+                self._delete_entry(old)
+            self._write(key, timeseries)
+            self._entries.pop(key, None)
+            self._entries[key] = {
+                'path': path,
+                'size': _directory_size(os.path.join(self.cache_dir, key))}
+            self._evict(keep=key)
+            self._save()
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._merge()
+            for key in list(self._entries) + self._orphans():
+                self._entries.pop(key, None)
+                self._delete_entry(key)
+            self._save()
+
+    def _write(self, key, timeseries):
+        data = timeseries.data
+        tmp = os.path.join(self.cache_dir, key + '.part')
+        if os.path.exists(tmp):
+            shutil.rmtree(tmp)
+        os.makedirs(tmp)
+        index = data.index.values.astype('datetime64[ns]')
+        np.save(os.path.join(tmp, 'index.npy'), index)
+        dtypes = set(data.dtypes)
+        homogeneous = len(dtypes) == 1 and dtypes.pop() != np.object_
+        if homogeneous:
+            # One (column, row) array, which becomes a single pandas block
+            # without copying when it is loaded.
+            np.save(os.path.join(tmp, 'values.npy'),
+                    np.ascontiguousarray(data.values.T))
+        else:
+            for i, column in enumerate(data.columns):
+                np.save(os.path.join(tmp, 'column{0}.npy'.format(i)),
+                        data[column].values)
+        state = {'cls': type(timeseries),
+                 'version': type(timeseries)._parser_version,
+                 'index_name': data.index.name,
+                 'columns': list(data.columns),
+                 'homogeneous': homogeneous,
+                 'meta': timeseries.meta,
+                 'units': timeseries.units}
+        with open(os.path.join(tmp, 'state.pickle'), 'wb') as fd:
+            pickle.dump(state, fd, pickle.HIGHEST_PROTOCOL)
+        target = os.path.join(self.cache_dir, key)
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.rename(tmp, target)
+
+    def _read(self, key):
+        directory = os.path.join(self.cache_dir, key)
+        with open(os.path.join(directory, 'state.pickle'), 'rb') as fd:
+            state = pickle.load(fd)
+        cls = state['cls']
+        if state['version'] != cls._parser_version:
+            return None
+        # Copy-on-write maps, so the time series can be modified in memory.
+        index = pd.DatetimeIndex(
+            np.load(os.path.join(directory, 'index.npy'), mmap_mode='c'),
+            name=state['index_name'])
+        if state['homogeneous']:
+            values = np.load(os.path.join(directory, 'values.npy'),
+                             mmap_mode='c')
+            data = pd.DataFrame(values.T, index=index,
+                                columns=state['columns'], copy=False)
+        else:
+            columns = OrderedDict()
+            for i, column in enumerate(state['columns']):
+                filename = os.path.join(directory, 'column{0}.npy'.format(i))
+                try:
+                    columns[column] = np.load(filename, mmap_mode='c')
+                except ValueError:
+                    # Arrays of Python objects can not be memory-mapped.
+                    columns[column] = np.load(filename, allow_pickle=True)
+            data = pd.DataFrame(columns, index=index,
+                                columns=state['columns'])
+        return cls(data, state['meta'], state['units'])
+
+    def _evict(self, keep=None):
+        if self.max_size is None:
+            return
+        total = sum(entry['size'] for entry in self._entries.values())
+        # Directories missing from the index are deleted before any entry.
+        orphans = [(key, _directory_size(os.path.join(self.cache_dir, key)))
+                   for key in self._orphans()]
+        total += sum(size for key, size in orphans)
+        for key, size in orphans:
+            if total <= self.max_size:
+                return
+            total -= size
+            self._delete_entry(key)
+        for key in list(self._entries):
+            if total <= self.max_size:
+                break
+            if key == keep:
+                continue
+            entry = self._entries.pop(key)
+            total -= entry['size']
+            self._delete_entry(key)
+
+    def _delete_entry(self, key):
+        shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+
+
+@atexit.register
+def _flush_open_caches():
+    for cache in list(_open_caches):
+        cache.flush()
+
+
+def get_default_cache():
+    """
+    Return the `TimeSeriesCache` configured in the ``[timeseries]`` section
+    of the sunpyrc file. Its entries live in the ``timeseries_cache``
+    directory below the download directory.
+    """
+    global _default_cache
+    cache_dir = os.path.join(sunpy.config.get('downloads', 'download_dir'),
+                             'timeseries_cache')
+    if _default_cache is None or _default_cache.cache_dir != cache_dir:
+        max_size = None
+        if sunpy.config.has_option('timeseries', 'cache_size'):
+            max_size = sunpy.config.get('timeseries', 'cache_size')
+        _default_cache = TimeSeriesCache(cache_dir, max_size=max_size)
+    return _default_cache
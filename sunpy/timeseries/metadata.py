@@ -6,13 +6,133 @@ __email__ = "stuart@mumford.me.uk"
 from sunpy.util.metadata import MetaDict
 import itertools
 import copy
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime
 
 import warnings
 import inspect
 
 from sunpy.time import TimeRange, parse_time
 
-class TimeSeriesMetaData:
+
+class _MetaDataList(list):
+    """
+    The list of metadata entries of a `TimeSeriesMetaData`, which counts its
+    modifications so that the lookup index knows when it is out of date.
+    """
+    version = 0
+
+
+def _counting(name):
+    method = getattr(list, name)
+
+    def counted(self, *args, **kwargs):
+        self.version += 1
+        return method(self, *args, **kwargs)
+    counted.__name__ = name
+    return counted
+
+for _name in ['append', 'extend', 'insert', 'pop', 'remove', 'reverse', 'sort',
+              '__setitem__', '__delitem__', '__iadd__', '__imul__',
+              '__setslice__', '__delslice__']:
+    if hasattr(list, _name):
+        setattr(_MetaDataList, _name, _counting(_name))
+
+
+class _MetaDataIndex(object):
+    """
+    Lookup index over the entries of a `TimeSeriesMetaData`.
+
+    The start times are kept sorted together with the end times. A tree
+    holding the latest end time of every range of these entries (a max
+    segment tree) is built on the first time lookup after a change. The
+    entries containing a time start before it and do not end earlier, so the
+    lookup only descends into the subtrees which end after the time and takes
+    O(log n) steps per entry found, however long the other TimeRanges are.
+    The map of column names to entry indices is built on first use.
+    """
+
+    def __init__(self, metadata):
+        self.version = metadata.version
+        starts = [entry[0].start for entry in metadata]
+        ends = [entry[0].end for entry in metadata]
+        # Positions of the entries ordered by start time, None if the list
+        # itself is ordered (as append keeps it).
+        self.order = sorted(range(len(starts)), key=starts.__getitem__)
+        if self.order == list(range(len(starts))):
+            self.order = None
+            self.starts = starts
+            self.ends = ends
+        else:
+            self.starts = [starts[i] for i in self.order]
+            self.ends = [ends[i] for i in self.order]
+        self._tree = None
+        self._columns = None
+
+    @property
+    def is_ordered(self):
+        return self.order is None
+
+    @property
+    def columns(self):
+        return self._columns
+
+    def build_columns(self, metadata):
+        self._columns = defaultdict(list)
+        for i, entry in enumerate(metadata):
+            for colname in entry[1]:
+                self._columns[colname].append(i)
+        return self._columns
+
+    def insert(self, pos, entry, version):
+        """Update the index for ``entry`` inserted into the ordered list at
+        ``pos``."""
+        self.starts.insert(pos, entry[0].start)
+        self.ends.insert(pos, entry[0].end)
+        self._tree = None
+        self._columns = None
+        self.version = version
+
+    def _build_tree(self):
+        # The leaves are the end times, padded to a power of two; every inner
+        # node holds the latest end time of its two children.
+        size = 1
+        while size < len(self.ends):
+            size *= 2
+        tree = [datetime.min] * (2 * size)
+        tree[size:size + len(self.ends)] = self.ends
+        for node in range(size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self._tree = tree
+
+    def overlapping(self, metadata, dt):
+        """Return the sorted indices of the entries whose TimeRange contains
+        ``dt``."""
+        hi = bisect_right(self.starts, dt)
+        if self._tree is None:
+            self._build_tree()
+        tree = self._tree
+        size = len(tree) // 2
+        found = []
+        # Depth-first, left before right, so the positions come out sorted.
+        stack = [(1, 0, size)]
+        while stack:
+            node, left, right = stack.pop()
+            if left >= hi or tree[node] < dt:
+                continue
+            if node >= size:
+                found.append(left)
+                continue
+            middle = (left + right) // 2
+            stack.append((2 * node + 1, middle, right))
+            stack.append((2 * node, left, middle))
+        if self.order is not None:
+            found = sorted(self.order[i] for i in found)
+        return found
+
+
+class TimeSeriesMetaData(object):
     """
     An object used to store metadata for TimeSeries objects that enables multiple
     TimeSeries metadata to be concatenated in an organised fashion.
@@ -40,6 +160,7 @@ class TimeSeriesMetaData:
     """
 
     def __init__(self, meta=None, timerange=None, colnames=None, **kwargs):
+        self._index = None
         self.metadata = []
         # Parse in arguments
         if not isinstance(meta, type(None)):
@@ -62,6 +183,35 @@ class TimeSeriesMetaData:
             else:
                 raise ValueError("You cannot create a TimeSeriesMetaData object without specifying a TimeRange")
 
+    @property
+    def metadata(self):
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, metadata):
+        self._metadata = _MetaDataList(metadata)
+        self._index = None
+
+    def _get_index(self):
+        """Return the lookup index, rebuilding it if the entries changed."""
+        if self._index is None or self._index.version != self._metadata.version:
+            self._index = _MetaDataIndex(self._metadata)
+        return self._index
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_index'] = None
+        return state
+
+    def __setstate__(self, state):
+        # Objects pickled before the lookup index existed store the plain list
+        # of entries under 'metadata'.
+        metadata = state.pop('metadata', None)
+        self.__dict__.update(state)
+        if metadata is not None:
+            self.metadata = metadata
+        self._index = None
+
     def __eq__(self, other):
         """
         Check two TimeSeriesMetaData objects are the same, they have the same
@@ -128,9 +278,13 @@ class TimeSeriesMetaData:
         # Check the types are correct.
         pos = 0
         if isinstance(timerange, TimeRange):
-            for i, meta in enumerate(self.metadata):
-                if timerange.start > meta[0].start:
-                    pos = i + 1
+            index = self._get_index()
+            if index.is_ordered:
+                pos = bisect_left(index.starts, timerange.start)
+            else:
+                for i, meta in enumerate(self.metadata):
+                    if timerange.start > meta[0].start:
+                        pos = i + 1
         else:
             raise ValueError(
                 'Incorrect datatime or data for append to TimeSeriesMetaData.')
@@ -148,6 +302,8 @@ class TimeSeriesMetaData:
         # Insert into the given position
         if not duplicate:
             self.metadata.insert(pos, new_metadata)
+            if index.is_ordered:
+                index.insert(pos, new_metadata, self.metadata.version)
 
     def find_indices(self, time=None, colname=None, **kwargs):
         """
@@ -173,26 +329,21 @@ class TimeSeriesMetaData:
         list : `list`
             A list of integers that contain all matching metadata.
         """
-        # Parameters
-        dt = time
-        if not dt:
-            dt = False
-        elif isinstance(dt, str):
-            dt = parse_time(dt)
+        index = self._get_index()
 
         # Find all results with suitable timerange.
-        results_indices = []
-        for i, meta in enumerate(self.metadata):
-            if dt in meta[0] or not(dt):
-                results_indices.append(i)
-
-        # Filter out only those with the correct column.
-        results = []
-        for i in results_indices:
-            if (colname in self.metadata[i][1]) or (not colname):
-                results.append(i)
+        if time:
+            results = index.overlapping(self.metadata, parse_time(time))
+        elif colname:
+            columns = index.columns or index.build_columns(self.metadata)
+            results = columns.get(colname, [])
+        else:
+            results = range(len(self.metadata))
 
-        return results
+        # Filter out only those with the correct column. The column lists of
+        # the entries may have been changed in place since the index was built.
+        return [i for i in results
+                if (not colname) or (colname in self.metadata[i][1])]
 
     def find(self, time=None, colname=None, **kwargs):
         """
@@ -288,25 +439,45 @@ class TimeSeriesMetaData:
         # Return a TimeSeriesMetaData object
         return TimeSeriesMetaData(meta=metadata)
 
-    def concatenate(self, tsmetadata2, **kwargs):
+    def concatenate(self, others, **kwargs):
         """
-        Combine the metadata from a TimeSeriesMetaData object with the current
-        TimeSeriesMetaData and return as a new TimeSeriesMetaData object.
+        Combine the metadata from one or more TimeSeriesMetaData objects with
+        the current TimeSeriesMetaData and return as a new TimeSeriesMetaData
+        object.
+
+        The entries are ordered by start time as if they had been added with
+        `append` one after the other, but the list is built only once.
 
         Parameters
         ----------
-        tsmetadata2 : `~sunpy.timeseries.TimeSeriesMetaData`
-            The second TimeSeriesMetaData object.
+        others : `~sunpy.timeseries.TimeSeriesMetaData` or `list`
+            The second TimeSeriesMetaData object or a list of them.
         """
-        # Create a copy of the metadata
-        meta = TimeSeriesMetaData(copy.copy(self.metadata))
+        if isinstance(others, TimeSeriesMetaData):
+            others = [others]
 
-        # Append each metadata entry from the second TimeSeriesMetaData object
-        # to the original TimeSeriesMetaData object.
-        for entry in tsmetadata2.metadata:
-            meta.append(entry[0], entry[1], entry[2])
-
-        return meta
+        # Like append, an entry is dropped if the first entry with the same
+        # start time has the same TimeRange and colnames.
+        first = {}
+        for entry in self.metadata:
+            first.setdefault(entry[0].start, entry)
+        new_entries = []
+        for tsmetadata in others:
+            for timerange, columns, metadata in tsmetadata.metadata:
+                new_entry = (timerange, columns, MetaDict(metadata))
+                old_entry = first.get(timerange.start)
+                if (old_entry is not None and old_entry[0] == timerange and
+                        old_entry[1] == columns):
+                    continue
+                first[timerange.start] = new_entry
+                new_entries.append(new_entry)
+
+        # append puts new entries in front of those with the same start time.
+        keys = [(entry[0].start, 1, i) for i, entry in enumerate(self.metadata)]
+        keys += [(entry[0].start, 0, -i) for i, entry in enumerate(new_entries)]
+        entries = self.metadata + new_entries
+        order = sorted(range(len(entries)), key=keys.__getitem__)
+        return TimeSeriesMetaData([entries[i] for i in order])
 
     def update(self, dictionary, time=None, colname=None, row=None, overwrite=False, **kwargs):
         """
@@ -334,19 +505,25 @@ class TimeSeriesMetaData:
 
         # Now update each matching entries
         for i in indices:
+            # The MetaDict may be shared with the TimeSeriesMetaData of other
+            # (e.g. truncated) time series, so change a copy of it.
+            timerange, colnames, metadict = self.metadata[i]
+            metadict = copy.copy(metadict)
+
             # Seperate keys for new and current pairs
             old_keys = set(dictionary.keys())
-            old_keys.intersection_update(set(self.metadata[i][2].keys()))
+            old_keys.intersection_update(set(metadict.keys()))
             new_keys = set(dictionary.keys())
             new_keys.difference_update(old_keys)
 
             # Old keys only overwritten if allowed
-            for key in (self.metadata[i][2].keys()):
+            for key in (metadict.keys()):
                 if key in old_keys and overwrite:
-                    self.metadata[i][2][key] = dictionary[key]
+                    metadict[key] = dictionary[key]
             for key in dictionary:
                 if key in new_keys:
-                    self.metadata[i][2][key] = dictionary[key]
+                    metadict[key] = dictionary[key]
+            self.metadata[i] = (timerange, colnames, metadict)
 
     def _truncate(self, timerange):
         """Removes metadata entries outside of the new (truncated) TimeRange.
@@ -445,14 +622,16 @@ class TimeSeriesMetaData:
         if isinstance(colnames, str):
             colnames = [ colnames ]
 
-        # Create a new list with all metadata entries without colnames
+        # Create a new list with all metadata entries without colnames. The
+        # lists of colnames may be shared with other TimeSeriesMetaData
+        # objects, so they are replaced rather than changed.
         reduced = []
         for metatuple in self.metadata:
-            # Check each colname
-            for colname in colnames:
-                if colname in metatuple[1]:
-                    # Removed from the list.
-                    metatuple[1].remove(colname)
+            if any(colname in metatuple[1] for colname in colnames):
+                metatuple = (metatuple[0],
+                             [colname for colname in metatuple[1]
+                              if colname not in colnames],
+                             metatuple[2])
             # Add the column if it still has some columns listed
             if len(metatuple[1]) > 0:
                 reduced.append(metatuple)
@@ -8,6 +8,7 @@ import numpy
 from datetime import datetime
 from collections import OrderedDict
 import matplotlib.pyplot as plt
+from pandas import DatetimeIndex
 from pandas.io.parsers import read_csv
 from os.path import basename
 
@@ -103,7 +104,7 @@ class EVESpWxTimeSeries(GenericTimeSeries):
         if column is None:
             self.plot(**kwargs)
         else:
-            data = self.data[column]
+            data = self._plot_data()[column]
             if "title" not in kwargs:
                 kwargs['title'] = 'EVE ' + column.replace('_', ' ')
             data.plot(**kwargs)
@@ -174,10 +175,13 @@ class EVESpWxTimeSeries(GenericTimeSeries):
         month = int(date_parts[2])
         day = int(date_parts[3])
 
-        # function to parse date column (HHMM)
-        parser = lambda x: datetime(year, month, day, int(x[0:2]), int(x[2:4]))
-
-        data = read_csv(fp, sep="\s*", names=fields, index_col=0, date_parser=parser, header=None, engine='python')
+        data = read_csv(fp, delim_whitespace=True, names=fields, index_col=0,
+                        header=None)
+        # the index column holds the time of day as HHMM, e.g. 1530 for 15:30
+        hhmm = data.index.values.astype(numpy.int64)
+        minutes = (hhmm // 100 * 60 + hhmm % 100).astype('timedelta64[m]')
+        date = numpy.datetime64(datetime(year, month, day), 'D')
+        data.index = DatetimeIndex(date + minutes, name=data.index.name)
         if is_missing_data :   #If missing data specified in header
             data[data == float(missing_data_val)] = numpy.nan
 
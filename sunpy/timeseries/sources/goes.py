@@ -84,11 +84,12 @@ class XRSTimeSeries(GenericTimeSeries):
         figure = plt.figure()
         axes = plt.gca()
 
-        dates = matplotlib.dates.date2num(parse_time(self.data.index))
+        data = self._plot_data(axes)
+        dates = matplotlib.dates.date2num(parse_time(data.index))
 
-        axes.plot_date(dates, self.data['xrsa'], '-',
+        axes.plot_date(dates, data['xrsa'], '-',
                      label='0.5--4.0 $\AA$', color='blue', lw=2)
-        axes.plot_date(dates, self.data['xrsb'], '-',
+        axes.plot_date(dates, data['xrsb'], '-',
                      label='1.0--8.0 $\AA$', color='red', lw=2)
 
         axes.set_yscale("log")
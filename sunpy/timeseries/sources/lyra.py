@@ -104,7 +104,8 @@ class LYRATimeSeries(GenericTimeSeries):
         plt.subplots_adjust(left=0.17,top=0.94,right=0.94,bottom=0.15)
         axes = plt.gca()
 
-        axes = self.data.plot(ax=axes, subplots=True, sharex=True, **kwargs)
+        data = self._plot_data(axes)
+        axes = data.plot(ax=axes, subplots=True, sharex=True, **kwargs)
 
         for i, name in enumerate(self.data.columns):
             if names < 3:
@@ -3,11 +3,11 @@
 from __future__ import absolute_import
 
 from collections import OrderedDict
-import datetime
 from matplotlib import pyplot as plt
 from pandas.io.parsers import read_csv
 import numpy as np
 
+from sunpy.time import parse_year_months
 from sunpy.timeseries.timeseriesbase import GenericTimeSeries
 from sunpy.util.metadata import MetaDict
 
@@ -127,8 +127,7 @@ class NOAAIndicesTimeSeries(GenericTimeSeries):
             fields = ('yyyy', 'mm', 'sunspot SWO', 'sunspot RI', 'sunspot ratio', 'sunspot SWO smooth', 'sunspot RI smooth', 'radio flux', 'radio flux smooth', 'geomagnetic ap', 'geomagnetic smooth')
             data = read_csv(fp, delim_whitespace=True, names = fields, comment='#', dtype={'yyyy':np.str, 'mm':np.str})
             data = data.dropna(how='any')
-            timeindex = [datetime.datetime.strptime(x + y, '%Y%m') for x,y in zip(data['yyyy'], data['mm'])]
-            data['time']=timeindex
+            data['time'] = parse_year_months(data['yyyy'], data['mm'])
             data = data.set_index('time')
             data = data.drop('mm',1)
             data = data.drop('yyyy',1)
@@ -144,8 +143,7 @@ class NOAAIndicesTimeSeries(GenericTimeSeries):
             fields = ('yyyy', 'mm', 'sunspot SWO', 'sunspot RI', 'sunspot ratio', 'sunspot SWO smooth', 'sunspot RI smooth', 'radio flux', 'radio flux smooth', 'geomagnetic ap', 'geomagnetic smooth')
             data = read_csv(fp, delim_whitespace=True, names = fields, comment='#', dtype={'yyyy':np.str, 'mm':np.str})
             data = data.dropna(how='any')
-            timeindex = [datetime.datetime.strptime(x + y, '%Y%m') for x,y in zip(data['yyyy'], data['mm'])]
-            data['time']=timeindex
+            data['time'] = parse_year_months(data['yyyy'], data['mm'])
             data = data.set_index('time')
             data = data.drop('mm',1)
             data = data.drop('yyyy',1)
@@ -261,8 +259,7 @@ class NOAAPredictIndicesTimeSeries(GenericTimeSeries):
             fields = ('yyyy', 'mm', 'sunspot', 'sunspot low', 'sunspot high', 'radio flux', 'radio flux low', 'radio flux high')
             data = read_csv(filepath, delim_whitespace=True, names = fields, comment='#', skiprows=2, dtype={'yyyy':np.str, 'mm':np.str})
             data = data.dropna(how='any')
-            timeindex = [datetime.datetime.strptime(x + y, '%Y%m') for x,y in zip(data['yyyy'], data['mm'])]
-            data['time']=timeindex
+            data['time'] = parse_year_months(data['yyyy'], data['mm'])
             data = data.set_index('time')
             data = data.drop('mm',1)
             data = data.drop('yyyy',1)
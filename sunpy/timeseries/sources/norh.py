@@ -84,7 +84,8 @@ class NoRHTimeSeries(GenericTimeSeries):
         axes = plt.gca()
         #data_lab=self.meta['OBS-FREQ'][0:2] + ' ' + self.meta['OBS-FREQ'][2:5]
         data_lab=str(self.meta.get('OBS-FREQ').values()).replace('[','').replace(']','').replace('\'','')
-        axes.plot(self.data.index,self.data,label=data_lab)
+        data = self._plot_data(axes)
+        axes.plot(data.index, data, label=data_lab)
         axes.set_yscale("log")
         axes.set_ylim(1e-4,1)
         axes.set_title('Nobeyama Radioheliograph')
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+An append-only time series of fixed capacity for real-time data.
+
+Building a new `~sunpy.timeseries.GenericTimeSeries` for every update of a
+near-real-time feed and concatenating it with the previous one copies all the
+data each time. A `StreamingTimeSeries` instead keeps the most recent rows in
+preallocated numpy arrays: appending a row writes it behind the last one, and
+the data and time series it hands out are views of those arrays.
+
+The arrays hold twice the capacity, so the rows always lie next to each other
+and any window of them is a view rather than a copy. Once the arrays are full,
+the newest ``capacity`` rows are copied to the front of new arrays, which
+makes appending O(1) amortised. As rows are never written to again after they
+were appended, views stay valid (and unchanged) however many rows are appended
+later.
+"""
+from __future__ import absolute_import, division, print_function
+
+import copy
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import astropy.units as u
+
+from sunpy.extern import six
+from sunpy.time import TimeRange, parse_time
+from sunpy.timeseries.metadata import TimeSeriesMetaData
+from sunpy.timeseries.timeseriesbase import GenericTimeSeries
+from sunpy.util.metadata import MetaDict
+
+__all__ = ['StreamingTimeSeries']
+
+
+def _to_ns(time):
+    """Return ``time`` as nanoseconds since the epoch."""
+    if isinstance(time, six.string_types):
+        time = parse_time(time)
+    return pd.Timestamp(time).value
+
+
+class StreamingTimeSeries(object):
+    """
+    Fixed-capacity, append-only time series backed by numpy arrays.
+
+    Rows have to be appended in chronological order. Once ``capacity`` rows
+    are stored, appending a row drops the oldest one.
+
+    Parameters
+    ----------
+    capacity : `int`
+        The maximum number of rows kept.
+    columns : `list` of `str`
+        The names of the columns.
+    units : `dict`, optional
+        The unit of each column. Columns without a unit are dimensionless.
+    meta : `dict` or `~sunpy.util.metadata.MetaDict`, optional
+        The header of the data, used for the metadata of the time series
+        returned by `to_timeseries`.
+    dtype : `~numpy.dtype`, optional
+        The type of the values of all columns, `float` by default.
+    timeseries_class : `type`, optional
+        The `~sunpy.timeseries.GenericTimeSeries` subclass returned by
+        `to_timeseries`, e.g. `~sunpy.timeseries.XRSTimeSeries` to use its
+        ``peek``.
+
+    Examples
+    --------
+    >>> import astropy.units as u
+    >>> from sunpy.timeseries import StreamingTimeSeries
+    >>> stream = StreamingTimeSeries(1440, ['xrsa', 'xrsb'],
+    ...                              units={'xrsa': u.W / u.m**2,
+    ...                                     'xrsb': u.W / u.m**2})
+    >>> stream.append('2017-09-06 12:00', [1.1e-6, 4.3e-5])
+    >>> stream.append('2017-09-06 12:01', [1.0e-6, 4.1e-5])
+    >>> len(stream)
+    2
+    >>> ts = stream.to_timeseries()
+    """
+
+    def __init__(self, capacity, columns, units=None, meta=None,
+                 dtype=np.float64, timeseries_class=GenericTimeSeries):
+        capacity = int(capacity)
+        if capacity < 1:
+            raise ValueError("The capacity must be at least one row.")
+        self._capacity = capacity
+        self._columns = list(columns)
+        units = units or {}
+        self.units = OrderedDict(
+            (column, units.get(column, u.dimensionless_unscaled))
+            for column in self._columns)
+        self.meta = MetaDict(meta or {})
+        self.timeseries_class = timeseries_class
+        self._times = np.empty(2 * capacity, dtype=np.int64)
+        self._values = np.empty((2 * capacity, len(self._columns)), dtype=dtype)
+        self._start = 0
+        self._end = 0
+
+    @classmethod
+    def from_timeseries(cls, timeseries, capacity=None):
+        """
+        Return a stream holding the rows, units and header of ``timeseries``.
+
+        Parameters
+        ----------
+        timeseries : `~sunpy.timeseries.GenericTimeSeries`
+            The time series to start from. Its data is copied.
+        capacity : `int`, optional
+            The maximum number of rows kept, by default the number of rows of
+            ``timeseries``.
+        """
+        data = timeseries.data
+        if capacity is None:
+            capacity = max(len(data), 1)
+        meta = MetaDict()
+        for entry in timeseries.meta.metas:
+            meta.update(entry)
+        dtype = np.result_type(*data.dtypes) if len(data.columns) else np.float64
+        stream = cls(capacity, data.columns, units=timeseries.units, meta=meta,
+                     dtype=dtype, timeseries_class=type(timeseries))
+        stream.extend(timeseries)
+        return stream
+
+    @property
+    def capacity(self):
+        """The maximum number of rows kept."""
+        return self._capacity
+
+    @property
+    def columns(self):
+        """Returns a list of all the names of the columns in the data."""
+        return list(self._columns)
+
+    def __len__(self):
+        return self._end - self._start
+
+    def _make_room(self, rows):
+        """Make sure ``rows`` more rows fit behind the last one. Keeps at most
+        ``capacity - rows`` of the newest rows in new arrays if they do not."""
+        if self._end + rows <= len(self._times):
+            return
+        keep = min(len(self), self._capacity - rows)
+        times = np.empty_like(self._times)
+        values = np.empty_like(self._values)
+        times[:keep] = self._times[self._end - keep:self._end]
+        values[:keep] = self._values[self._end - keep:self._end]
+        # The old arrays are left alone, so views of them stay valid.
+        self._times, self._values = times, values
+        self._start, self._end = 0, keep
+
+    def _check_order(self, first):
+        if len(self) and first < self._times[self._end - 1]:
+            raise ValueError("Rows have to be appended in chronological "
+                             "order.")
+
+    def append(self, time, values):
+        """
+        Append one row.
+
+        Parameters
+        ----------
+        time : `str`, `~datetime.datetime` or `~pandas.Timestamp`
+            The time of the row. It must not be before the last row.
+        values : sequence or `dict`
+            The values in the order of `columns`, or keyed by column name.
+        """
+        time = _to_ns(time)
+        self._check_order(time)
+        if isinstance(values, (dict, pd.Series)):
+            values = [values[column] for column in self._columns]
+        self._make_room(1)
+        self._times[self._end] = time
+        self._values[self._end] = values
+        self._end += 1
+        if len(self) > self._capacity:
+            self._start += 1
+
+    def extend(self, times, values=None):
+        """
+        Append many rows at once.
+
+        Parameters
+        ----------
+        times : array-like, `~pandas.DataFrame` or `~sunpy.timeseries.GenericTimeSeries`
+            The times of the rows in chronological order, or a data frame or
+            time series with (at least) the columns of this stream.
+        values : array-like, optional
+            Array of shape ``(rows, columns)`` with the values in the order
+            of `columns`. Must be given if ``times`` are times.
+        """
+        if isinstance(times, GenericTimeSeries):
+            times = times.data
+        if isinstance(times, pd.DataFrame):
+            values = times[self._columns].values
+            times = times.index
+        times = pd.DatetimeIndex(times).asi8
+        if not len(times):
+            return
+        values = np.asarray(values, dtype=self._values.dtype)
+        values = values.reshape(len(times), len(self._columns))
+        if np.any(times[1:] < times[:-1]):
+            raise ValueError("Rows have to be appended in chronological "
+                             "order.")
+        self._check_order(times[0])
+        # Rows which would be dropped right away are not copied.
+        times = times[-self._capacity:]
+        values = values[-self._capacity:]
+        rows = len(times)
+        self._make_room(rows)
+        self._times[self._end:self._end + rows] = times
+        self._values[self._end:self._end + rows] = values
+        self._end += rows
+        self._start = max(self._start, self._end - self._capacity)
+
+    def _bounds(self, start, end):
+        """Return the positions of the first and behind the last row between
+        ``start`` and ``end``."""
+        times = self._times[self._start:self._end]
+        first, last = 0, len(times)
+        if start is not None:
+            first = np.searchsorted(times, _to_ns(start), side='left')
+        if end is not None:
+            last = np.searchsorted(times, _to_ns(end), side='right')
+        return self._start + first, self._start + max(first, last)
+
+    @property
+    def index(self):
+        """The times of all rows as a view."""
+        return pd.DatetimeIndex(
+            self._times[self._start:self._end].view('datetime64[ns]'))
+
+    @property
+    def data(self):
+        """All rows as a `~pandas.DataFrame` sharing the memory of the
+        stream."""
+        return self.window()
+
+    @property
+    def time_range(self):
+        """Returns the start and end times of the stream as a
+        `~sunpy.time.TimeRange` object"""
+        index = self.index
+        return TimeRange(index[0], index[-1])
+
+    def window(self, start=None, end=None):
+        """
+        Return the rows between ``start`` and ``end``, both included, as a
+        `~pandas.DataFrame` sharing the memory of the stream.
+
+        The data frame does not change when rows are appended later. Do not
+        modify it in place, copy it instead.
+
+        Parameters
+        ----------
+        start, end : `str`, `~datetime.datetime` or `None`
+            The first and the last time of the window. `None` means the first
+            or the last row of the stream.
+        """
+        first, last = self._bounds(start, end)
+        index = pd.DatetimeIndex(
+            self._times[first:last].view('datetime64[ns]'))
+        return pd.DataFrame(self._values[first:last], index=index,
+                            columns=self._columns, copy=False)
+
+    def to_timeseries(self, start=None, end=None):
+        """
+        Return the rows between ``start`` and ``end`` as a time series of
+        ``timeseries_class`` whose data is a `window` of the stream.
+
+        Parameters
+        ----------
+        start, end : `str`, `~datetime.datetime` or `None`
+            The first and the last time of the window. `None` means the first
+            or the last row of the stream.
+        """
+        data = self.window(start, end)
+        if len(data):
+            timerange = TimeRange(data.index[0], data.index[-1])
+        else:
+            timerange = None
+        meta = TimeSeriesMetaData(copy.copy(self.meta), timerange,
+                                  self.columns)
+        return self.timeseries_class(data, meta, copy.copy(self.units))
+
+    def __repr__(self):
+        return '<{0} {1}/{2} rows, columns {3}>'.format(
+            type(self).__name__, len(self), self._capacity, self._columns)
@@ -0,0 +1,175 @@
+from __future__ import absolute_import
+
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import sunpy.data.test
+import sunpy.timeseries
+from sunpy.timeseries.cache import TimeSeriesCache
+from sunpy.timeseries.sources.eve import EVESpWxTimeSeries
+
+filepath = sunpy.data.test.rootdir
+eve_filepath = os.path.join(filepath, 'EVE_L0CS_DIODES_1m_truncated.txt')
+goes_filepath = os.path.join(filepath, 'go1520120601.fits.gz')
+noaa_ind_filepath = os.path.join(filepath, 'RecentIndices_truncated.txt')
+
+
+@pytest.fixture
+def cache(tmpdir):
+    return TimeSeriesCache(str(tmpdir.join('cache')))
+
+
+@pytest.fixture
+def eve_copy(tmpdir):
+    path = str(tmpdir.join('eve.txt'))
+    shutil.copy(eve_filepath, path)
+    return path
+
+
+@pytest.mark.parametrize('path, source', [
+    (eve_filepath, 'EVE'),
+    (goes_filepath, None),
+    (noaa_ind_filepath, 'NOAAIndices')])
+def test_roundtrip(cache, path, source):
+    parsed = sunpy.timeseries.TimeSeries(path, source=source)
+    first = sunpy.timeseries.TimeSeries(path, source=source, cache=cache)
+    assert len(cache) == 1
+    second = sunpy.timeseries.TimeSeries(path, source=source, cache=cache)
+    assert len(cache) == 1
+    assert type(second) is type(parsed)
+    assert first == parsed
+    assert second == parsed
+    assert second.units == parsed.units
+
+
+def test_cached_is_not_parsed(cache, eve_copy, monkeypatch):
+    sunpy.timeseries.TimeSeries(eve_copy, source='EVE', cache=cache)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('file parsed again')
+    monkeypatch.setattr(EVESpWxTimeSeries, '_parse_file', fail)
+    ts = sunpy.timeseries.TimeSeries(eve_copy, source='EVE', cache=cache)
+    assert isinstance(ts, EVESpWxTimeSeries)
+    # the cached data can be modified in memory
+    ts.data['CMLat'] = 0
+    assert (ts.data['CMLat'] == 0).all()
+    cached = sunpy.timeseries.TimeSeries(eve_copy, source='EVE', cache=cache)
+    assert not (cached.data['CMLat'] == 0).all()
+
+
+def test_modified_file(cache, eve_copy):
+    sunpy.timeseries.TimeSeries(eve_copy, source='EVE', cache=cache)
+    with open(eve_copy, 'a') as fd:
+        fd.write('2359  2.18e-07  1.84e-10  4.98e-04  3.16e-04  4.82e-04  '
+                 '2.64e-04  5.83e-04  6.68e-04  4.97e+01 -1.00e+00  4.03e+01  '
+                 '3.26e-01  2.15e-01  2.64e-01  1.96e-01 -1.13e+01 -2.70e+01  '
+                 '5.89e+02  1.01e-07\n')
+    os.utime(eve_copy, (0, 0))
+    assert cache.get(eve_copy, 'EVE') is None
+    ts = sunpy.timeseries.TimeSeries(eve_copy, source='EVE', cache=cache)
+    assert len(ts.data) == 11
+    # the entry of the previous version of the file was replaced
+    assert len(cache) == 1
+
+
+def test_parser_version(cache, eve_copy, monkeypatch):
+    sunpy.timeseries.TimeSeries(eve_copy, source='EVE', cache=cache)
+    assert cache.get(eve_copy, 'EVE') is not None
+    monkeypatch.setattr(EVESpWxTimeSeries, '_parser_version', 2)
+    assert cache.get(eve_copy, 'EVE') is None
+    assert len(cache) == 0
+
+
+def test_source_is_part_of_key(cache):
+    sunpy.timeseries.TimeSeries(goes_filepath, cache=cache)
+    assert cache.get(goes_filepath) is not None
+    assert cache.get(goes_filepath, 'XRS') is None
+
+
+def test_persistence(cache):
+    sunpy.timeseries.TimeSeries(eve_filepath, source='EVE', cache=cache)
+    reopened = TimeSeriesCache(cache.cache_dir)
+    assert len(reopened) == 1
+    assert reopened.get(eve_filepath, 'EVE') is not None
+
+
+def test_evict_least_recently_used(cache):
+    sunpy.timeseries.TimeSeries(eve_filepath, source='EVE', cache=cache)
+    sunpy.timeseries.TimeSeries(goes_filepath, cache=cache)
+    cache.get(eve_filepath, 'EVE')
+    cache.max_size = cache.size - 1
+    sunpy.timeseries.TimeSeries(noaa_ind_filepath, source='NOAAIndices',
+                                cache=cache)
+    assert cache.get(goes_filepath) is None
+    assert cache.get(noaa_ind_filepath, 'NOAAIndices') is not None
+    assert cache.size <= cache.max_size
+
+
+def test_order_is_persisted(cache):
+    sunpy.timeseries.TimeSeries(eve_filepath, source='EVE', cache=cache)
+    sunpy.timeseries.TimeSeries(goes_filepath, cache=cache)
+    cache.get(eve_filepath, 'EVE')
+    # a hit does not rewrite the index, flush does
+    assert list(TimeSeriesCache(cache.cache_dir)._entries) != list(cache._entries)
+    cache.flush()
+    reopened = TimeSeriesCache(cache.cache_dir)
+    reopened.max_size = reopened.size - 1
+    sunpy.timeseries.TimeSeries(noaa_ind_filepath, source='NOAAIndices',
+                                cache=reopened)
+    assert reopened.get(goes_filepath) is None
+    assert reopened.get(eve_filepath, 'EVE') is not None
+
+
+def test_shared_between_processes(cache):
+    other = TimeSeriesCache(cache.cache_dir)
+    sunpy.timeseries.TimeSeries(eve_filepath, source='EVE', cache=cache)
+    sunpy.timeseries.TimeSeries(goes_filepath, cache=other)
+    # the second cache did not overwrite the entry of the first one
+    reopened = TimeSeriesCache(cache.cache_dir)
+    assert len(reopened) == 2
+    assert reopened.get(eve_filepath, 'EVE') is not None
+    assert other.get(eve_filepath, 'EVE') is not None
+
+
+def test_entries_missing_from_index_are_evicted(cache):
+    sunpy.timeseries.TimeSeries(eve_filepath, source='EVE', cache=cache)
+    orphan, = cache._entries
+    # the index lost the entry, e.g. to a concurrent write
+    with open(cache.index_path, 'w') as fd:
+        fd.write('{}')
+    other = TimeSeriesCache(cache.cache_dir)
+    goes = sunpy.timeseries.TimeSeries(goes_filepath, cache=other)
+    assert other._orphans() == [orphan]
+    other.max_size = other.size
+    other.add(goes_filepath, goes)
+    assert not os.path.exists(os.path.join(cache.cache_dir, orphan))
+    assert other.get(goes_filepath) is not None
+
+
+def test_object_columns(cache, eve_copy):
+    data = pd.DataFrame({'flux': [1., 2.], 'flag': ['a', 'b']},
+                        index=pd.DatetimeIndex(['2012-01-01', '2012-01-02']))
+    ts = sunpy.timeseries.GenericTimeSeries(data)
+    cache.add(eve_copy, ts)
+    cached = cache.get(eve_copy)
+    assert list(cached.data['flag']) == ['a', 'b']
+    assert list(cached.data['flux']) == [1., 2.]
+
+
+def test_clear(cache):
+    sunpy.timeseries.TimeSeries(eve_filepath, source='EVE', cache=cache)
+    cache.clear()
+    assert len(cache) == 0
+    assert os.listdir(cache.cache_dir) == ['index.json']
+
+
+def test_workers(cache, eve_copy):
+    sunpy.timeseries.TimeSeries(eve_copy, source='EVE', cache=cache)
+    ts_list = sunpy.timeseries.TimeSeries([eve_copy, eve_filepath],
+                                          source='EVE', cache=cache, workers=2)
+    assert len(cache) == 2
+    assert ts_list[0] == sunpy.timeseries.TimeSeries(eve_copy, source='EVE')
+    assert cache.get(eve_filepath, 'EVE') == ts_list[1]
@@ -0,0 +1,99 @@
+"""
+Checks that the vectorised parsers of the text file sources give the frames
+the previous, row by row parsers gave.
+"""
+from __future__ import absolute_import
+
+import os
+import glob
+import datetime
+
+import numpy as np
+import pytest
+from pandas import DatetimeIndex
+from pandas.io.parsers import read_csv
+from pandas.util.testing import assert_frame_equal
+
+from sunpy.data.test import get_test_filepath, rootdir
+from sunpy.timeseries.sources.eve import EVESpWxTimeSeries
+from sunpy.timeseries.sources.noaa import (NOAAIndicesTimeSeries,
+                                           NOAAPredictIndicesTimeSeries)
+
+eve_level_0cs_filepaths = (
+    [get_test_filepath("EVE_L0CS_DIODES_1m_truncated.txt"),
+     get_test_filepath("LATEST_EVE_L0CS_DIODES_1m.txt")] +
+    sorted(glob.glob(os.path.join(rootdir, "eve", "*.txt"))))
+noaa_ind_filepath = get_test_filepath('RecentIndices_truncated.txt')
+noaa_pre_filepath = get_test_filepath('predicted-sunspot-radio-flux_truncated.txt')
+
+
+def parse_level_0cs_previous(filepath):
+    """The Level 0CS parser before the index was computed from the HHMM
+    column, which called `datetime.datetime` for every row."""
+    with open(filepath) as fp:
+        header = []
+        line = fp.readline()
+        while line.startswith(';'):
+            header.append(line)
+            line = fp.readline()
+        start = header.index('; Column descriptions:\n') + 1
+        stop = header.index('; Format:\n')
+        fields = [hline.split(':')[0].replace(';', ' ').strip()
+                  for hline in header[start:stop]]
+        date_parts = line.split(' ')
+        year, month, day = (int(date_parts[0]), int(date_parts[2]),
+                            int(date_parts[3]))
+        parser = lambda x: datetime.datetime(year, month, day,
+                                             int(x[0:2]), int(x[2:4]))
+        data = read_csv(fp, sep="\s*", names=fields, index_col=0,
+                        date_parser=parser, header=None, engine='python')
+    for hline in header:
+        if '; Missing data:' in hline:
+            data[data == float(hline.split(':')[1].strip())] = np.nan
+    return data
+
+
+def parse_noaa_previous(fp, fields, skiprows=0):
+    """The NOAA parsers before the index was computed as datetime64[M],
+    which called `datetime.datetime.strptime` for every row."""
+    data = read_csv(fp, delim_whitespace=True, names=fields,
+                    comment='#', skiprows=skiprows,
+                    dtype={'yyyy': np.str, 'mm': np.str})
+    data = data.dropna(how='any')
+    timeindex = [datetime.datetime.strptime(x + y, '%Y%m')
+                 for x, y in zip(data['yyyy'], data['mm'])]
+    data['time'] = timeindex
+    data = data.set_index('time')
+    return data.drop(['yyyy', 'mm'], 1)
+
+
+@pytest.mark.parametrize('filepath', eve_level_0cs_filepaths)
+def test_eve_level_0cs_parsing_unchanged(filepath):
+    expected = parse_level_0cs_previous(filepath)
+    assert isinstance(expected.index, DatetimeIndex)
+    data = EVESpWxTimeSeries._parse_file(filepath)[0]
+    assert_frame_equal(data, expected)
+
+
+def test_noaa_indices_parsing_unchanged():
+    fields = ('yyyy', 'mm', 'sunspot SWO', 'sunspot RI', 'sunspot ratio',
+              'sunspot SWO smooth', 'sunspot RI smooth', 'radio flux',
+              'radio flux smooth', 'geomagnetic ap', 'geomagnetic smooth')
+    with open(noaa_ind_filepath) as fp:
+        # the parsers read up to and including the first line of data
+        line = fp.readline()
+        while line.startswith((":", "#")):
+            line = fp.readline()
+        expected = parse_noaa_previous(fp, fields)
+    assert len(expected) > 0
+    data = NOAAIndicesTimeSeries._parse_file(noaa_ind_filepath)[0]
+    assert_frame_equal(data, expected)
+
+
+def test_noaa_predict_indices_parsing_unchanged():
+    fields = ('yyyy', 'mm', 'sunspot', 'sunspot low', 'sunspot high',
+              'radio flux', 'radio flux low', 'radio flux high')
+    expected = parse_noaa_previous(noaa_pre_filepath, fields, 2)
+    assert len(expected) > 0
+    data = NOAAPredictIndicesTimeSeries._parse_file(noaa_pre_filepath)[0]
+    assert_frame_equal(data, expected)
@@ -0,0 +1,115 @@
+from __future__ import absolute_import
+
+import os
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+import astropy.units as u
+from pandas.util.testing import assert_frame_equal
+
+import sunpy.data.test
+import sunpy.timeseries
+from sunpy.timeseries import StreamingTimeSeries, XRSTimeSeries
+
+goes_filepath = os.path.join(sunpy.data.test.rootdir, 'go1520120601.fits.gz')
+base = datetime.datetime(2017, 9, 6)
+
+
+def minutes(first, last):
+    return [base + datetime.timedelta(minutes=i) for i in range(first, last)]
+
+
+@pytest.fixture
+def stream():
+    return StreamingTimeSeries(5, ['a', 'b'], units={'a': u.W},
+                               meta={'telescop': 'test'})
+
+
+def test_append(stream):
+    for i, time in enumerate(minutes(0, 3)):
+        stream.append(time, [i, -i])
+    stream.append('2017-09-06 00:03', {'b': -3, 'a': 3})
+    assert len(stream) == 4
+    assert list(stream.index) == minutes(0, 4)
+    assert list(stream.data['a']) == [0, 1, 2, 3]
+    assert list(stream.data['b']) == [0, -1, -2, -3]
+
+
+def test_capacity(stream):
+    for i, time in enumerate(minutes(0, 23)):
+        stream.append(time, [i, -i])
+        assert len(stream) == min(i + 1, 5)
+    assert list(stream.index) == minutes(18, 23)
+    assert list(stream.data['a']) == [18, 19, 20, 21, 22]
+
+
+def test_extend(stream):
+    stream.extend(minutes(0, 3), [[0, 0], [1, -1], [2, -2]])
+    stream.extend(minutes(3, 10), np.array([range(3, 10), range(-3, -10, -1)]).T)
+    assert list(stream.index) == minutes(5, 10)
+    assert list(stream.data['b']) == [-5, -6, -7, -8, -9]
+    frame = pd.DataFrame({'b': [-10, -11], 'a': [10, 11]},
+                         index=minutes(10, 12), columns=['b', 'a'])
+    stream.extend(frame)
+    assert list(stream.index) == minutes(7, 12)
+    assert list(stream.data['a']) == [7, 8, 9, 10, 11]
+
+
+def test_extend_empty(stream):
+    stream.extend([])
+    assert len(stream) == 0
+    stream.append(base, [1, -1])
+    stream.extend([], [])
+    stream.extend(pd.DataFrame(columns=['a', 'b'], index=pd.DatetimeIndex([])))
+    assert list(stream.index) == [base]
+
+
+def test_chronological_order(stream):
+    stream.append(base, [0, 0])
+    with pytest.raises(ValueError):
+        stream.append(base - datetime.timedelta(seconds=1), [0, 0])
+    with pytest.raises(ValueError):
+        stream.extend(minutes(2, 4)[::-1], [[0, 0]] * 2)
+
+
+def test_views_do_not_change(stream):
+    stream.extend(minutes(0, 4), [[i, -i] for i in range(4)])
+    data = stream.data
+    assert np.shares_memory(data.values, stream._values)
+    expected = data.copy()
+    for i, time in enumerate(minutes(4, 30)):
+        stream.append(time, [i, -i])
+    assert_frame_equal(data, expected)
+
+
+def test_window(stream):
+    stream.extend(minutes(0, 5), [[i, -i] for i in range(5)])
+    window = stream.window(base + datetime.timedelta(minutes=1),
+                           '2017-09-06 00:03')
+    assert list(window.index) == minutes(1, 4)
+    assert len(stream.window('2017-09-07')) == 0
+    assert list(stream.window(end=base).index) == [base]
+
+
+def test_to_timeseries(stream):
+    stream.extend(minutes(0, 5), [[i, -i] for i in range(5)])
+    ts = stream.to_timeseries(start='2017-09-06 00:02')
+    assert isinstance(ts, sunpy.timeseries.GenericTimeSeries)
+    assert list(ts.index) == minutes(2, 5)
+    assert ts.units == {'a': u.W, 'b': u.dimensionless_unscaled}
+    assert ts.meta.get('telescop').values() == ['test']
+    assert ts.meta.time_range.start == minutes(2, 3)[0]
+    assert ts.quantity('a').unit == u.W
+
+
+def test_from_timeseries():
+    goes = sunpy.timeseries.TimeSeries(goes_filepath)
+    stream = StreamingTimeSeries.from_timeseries(goes, capacity=100)
+    assert len(stream) == 100
+    assert stream.columns == goes.columns
+    ts = stream.to_timeseries()
+    assert isinstance(ts, XRSTimeSeries)
+    assert_frame_equal(ts.data, goes.data.iloc[-100:])
+    assert ts.units == goes.units
@@ -83,6 +83,42 @@ class TestTimeSeries(object):
         ts_from_glob = sunpy.timeseries.TimeSeries(os.path.join(filepath, "eve", "*"), source='EVE', concatenate=True)
         assert isinstance(ts_from_glob, sunpy.timeseries.sources.eve.EVESpWxTimeSeries)
 
+    def test_factory_workers(self):
+        # Test parsing multiple files in worker processes
+        ts_list = sunpy.timeseries.TimeSeries(sorted(a_list_of_many), source='EVE')
+        ts_parallel = sunpy.timeseries.TimeSeries(sorted(a_list_of_many), source='EVE', workers=2)
+        assert len(ts_parallel) == len(ts_list)
+        for ts, parallel in zip(ts_list, ts_parallel):
+            assert type(parallel) is type(ts)
+            assert parallel == ts
+        ts_concat = sunpy.timeseries.TimeSeries(os.path.join(filepath, "eve", "*"), source='EVE', concatenate=True, workers=2)
+        assert ts_concat == ts_list[0].concatenate(ts_list[1:])
+
+    def test_factory_workers_implicit(self):
+        # Files read by sunpy.io are also parsed by the worker processes
+        ts_list = sunpy.timeseries.TimeSeries([goes_filepath, fermi_gbm_filepath], workers=2)
+        assert isinstance(ts_list[0], sunpy.timeseries.sources.goes.XRSTimeSeries)
+        assert isinstance(ts_list[1], sunpy.timeseries.sources.fermi_gbm.GBMSummaryTimeSeries)
+        ts_goes = sunpy.timeseries.TimeSeries(goes_filepath, workers=2)
+        assert isinstance(ts_goes, sunpy.timeseries.sources.goes.XRSTimeSeries)
+
+    def test_factory_workers_concatenate_parts(self, tmpdir):
+        # With concatenate, only the parts of each time series are gathered
+        from sunpy.timeseries.cache import TimeSeriesCache
+        paths = sorted(a_list_of_many)
+        cache = TimeSeriesCache(str(tmpdir))
+        for cached in (None, cache, cache):
+            parts = sunpy.timeseries.TimeSeries._read_parallel(
+                paths, 2, cached, source='EVE', concatenate=True)
+            assert len(parts) == len(paths)
+            for cls, data, meta, units in parts:
+                assert cls is sunpy.timeseries.sources.eve.EVESpWxTimeSeries
+        assert len(cache) == len(paths)
+        ts_list = sunpy.timeseries.TimeSeries(paths, source='EVE')
+        ts_concat = sunpy.timeseries.TimeSeries(paths, source='EVE', concatenate=True, workers=2, cache=cache)
+        assert isinstance(ts_concat, sunpy.timeseries.sources.eve.EVESpWxTimeSeries)
+        assert ts_concat == ts_list[0].concatenate(ts_list[1:])
+
 #==============================================================================
 # Individual Implicit Source Tests
 #==============================================================================
@@ -15,6 +15,7 @@ import warnings
 import copy
 
 import numpy as np
+import matplotlib.pyplot as plt
 import astropy.units as u
 from pandas.util.testing import assert_frame_equal
 from pandas import DataFrame
@@ -266,6 +267,25 @@ def test_truncation_dates(eve_test_ts, truncation_dates_test_ts):
     assert truncation_dates_test_ts.time_range == truncation_dates_test_ts.meta.time_range == eve_test_ts.time_range.split(
         3)[1]
 
+
+def test_truncation_shares_data_and_metadata(eve_test_ts):
+    truncated = eve_test_ts.truncate(eve_test_ts.time_range.split(3)[1])
+    assert np.shares_memory(truncated.data.values, eve_test_ts.data.values)
+    assert truncated.meta.metadata[0][2] is eve_test_ts.meta.metadata[0][2]
+    # Updating the metadata of the truncated series leaves the original alone
+    truncated.meta.update({'new_key': 'value'})
+    assert 'new_key' in truncated.meta.metadata[0][2]
+    assert 'new_key' not in eve_test_ts.meta.metadata[0][2]
+
+
+def test_truncation_unsorted(eve_test_ts):
+    unsorted = eve_test_ts.__class__(eve_test_ts.data.iloc[::-1],
+                                     eve_test_ts.meta, eve_test_ts.units)
+    tr = eve_test_ts.time_range.split(3)[1]
+    assert_frame_equal(unsorted.truncate(tr).data, eve_test_ts.truncate(tr).data)
+    assert_frame_equal(unsorted.extract('CMLon').data,
+                       eve_test_ts.extract('CMLon').data)
+
 #==============================================================================
 # Test Basic Single-Timeseries Truncation Operations
 #==============================================================================
@@ -434,6 +454,14 @@ def test_extraction(eve_test_ts, extraction_test_ts):
     extracted_df = extracted_df.sort_index()
     assert_frame_equal(extraction_test_ts.data, extracted_df)
 
+
+def test_extraction_leaves_original(eve_test_ts, extraction_test_ts):
+    # Removing the other columns from the metadata of the extracted series
+    # must not change the metadata of the original
+    assert extraction_test_ts.meta.columns == ['CMLon']
+    assert eve_test_ts.meta.columns == sorted(eve_test_ts.columns)
+    assert np.shares_memory(extraction_test_ts.data.values, eve_test_ts.data.values)
+
 #==============================================================================
 # Test Concatenation Operations
 #==============================================================================
@@ -460,6 +488,33 @@ def test_concatenation_of_slices(eve_test_ts, concatenated_slices_test_ts):
     # ToDo: Will TSMD.concatenate() want to re-merge the metadata entries back into one?
 
 
+def test_concatenation_of_list(eve_test_ts):
+    # Split into overlapping slices given in reverse order
+    slices = [eve_test_ts.data.iloc[i:i + 4] for i in range(0, 10, 3)][::-1]
+    series = [sunpy.timeseries.TimeSeries(data, eve_test_ts.meta.metas[0],
+                                          eve_test_ts.units)
+              for data in slices]
+    concatenated = series[0].concatenate(series[1:])
+    # duplicate times are dropped and the data is sorted
+    assert_frame_equal(concatenated.data, eve_test_ts.data)
+    assert len(concatenated.meta.metadata) == len(slices)
+    folded = series[0]
+    for ts in series[1:]:
+        folded = folded.concatenate(ts)
+    assert concatenated == folded
+    # nothing to add
+    assert series[0].concatenate([]) is series[0]
+
+
+def test_concatenation_keeps_first_values(eve_test_ts):
+    changed = copy.deepcopy(eve_test_ts)
+    changed.data['CMLat'] = 1000.
+    concatenated = eve_test_ts.concatenate(changed)
+    assert_frame_equal(concatenated.data, eve_test_ts.data)
+    concatenated = changed.concatenate(eve_test_ts)
+    assert (concatenated.data['CMLat'] == 1000.).all()
+
+
 @pytest.fixture
 def concatenation_different_data_test_ts(eve_test_ts, fermi_gbm_test_ts):
     # Take two different data sources and concatenate
@@ -528,6 +583,64 @@ def test_generic_construction_concatenation():
     assert ts_concat.columns == ['intensity', 'intensity2']
     assert len(ts_concat.meta.metadata) == 2
 
+#==============================================================================
+# Test Resampling
+#==============================================================================
+
+
+@pytest.fixture
+def resample_ts():
+    dates = pd.date_range('2016-10-01 00:00:07', periods=5000, freq='s')
+    intensity = np.sin(np.linspace(0, 10 * np.pi, len(dates)))
+    intensity[::7] = np.nan
+    intensity[600:900] = np.nan
+    data = DataFrame({'intensity': intensity,
+                      'counts': np.arange(len(dates)) % 9,
+                      'flag': ['x'] * len(dates)},
+                     index=dates, columns=['intensity', 'counts', 'flag'])
+    # leave a gap of a few empty bins
+    data = data.drop(data.index[2000:2500])
+    units = OrderedDict([('intensity', u.W / u.m**2), ('counts', u.ct),
+                         ('flag', u.dimensionless_unscaled)])
+    return sunpy.timeseries.TimeSeries(data, MetaDict({'key': 'value'}), units)
+
+
+@pytest.mark.parametrize('how', ['mean', 'min', 'max', 'sum', 'count'])
+@pytest.mark.parametrize('rule', ['1min', '7min', '90s'])
+def test_resample(resample_ts, rule, how):
+    expected = getattr(resample_ts.data[['intensity', 'counts']].resample(rule), how)()
+    resampled = resample_ts.resample(rule, how)
+    assert isinstance(resampled, type(resample_ts))
+    assert resampled.columns == ['intensity', 'counts']
+    assert resampled.data.index.equals(expected.index)
+    assert_frame_equal(resampled.data, expected.astype(resampled.data.dtypes),
+                       check_dtype=False)
+    # aggregating a few rows at a time gives the same result
+    assert_frame_equal(resample_ts.resample(rule, how, chunksize=37).data,
+                       resampled.data)
+
+
+def test_resample_units_and_meta(resample_ts):
+    resampled = resample_ts.resample(60 * u.s)
+    assert resampled.units == OrderedDict([('intensity', u.W / u.m**2),
+                                           ('counts', u.ct)])
+    assert resampled.meta.columns == ['counts', 'intensity']
+    assert resampled.meta.time_range.end == resampled.data.index[-1]
+    counted = resample_ts.resample(datetime.timedelta(minutes=1), 'count')
+    assert counted.units['intensity'] == u.dimensionless_unscaled
+    assert counted.data['counts'].sum() == len(resample_ts.data)
+
+
+def test_resample_calendar_rule(resample_ts):
+    resampled = resample_ts.resample('D', 'max')
+    assert len(resampled.data) == 1
+    assert resampled.data['counts'][0] == 8
+
+
+def test_resample_invalid(resample_ts):
+    with pytest.raises(ValueError):
+        resample_ts.resample('1min', 'median')
+
 #==============================================================================
 # Test Data Manipulation
 #==============================================================================
@@ -611,6 +724,37 @@ def test_ts_to_array(generic_ts):
     assert isinstance(arr, np.ndarray)
     assert len(arr) == len(generic_ts.data)
 
+
+def test_plot_downsampled():
+    dates = pd.date_range('2016-10-01', periods=10 ** 5, freq='s')
+    intensity = np.sin(np.linspace(0, 20 * np.pi, len(dates)))
+    intensity[12345] = 10
+    intensity[500:600] = np.nan
+    data = DataFrame({'intensity': intensity, 'other': -intensity},
+                     index=dates)
+    ts = sunpy.timeseries.TimeSeries(data, MetaDict({'key': 'value'}))
+    figure = plt.figure()
+    axes = figure.gca()
+    width = int(axes.get_window_extent().width)
+    plotted = ts._plot_data(axes)
+    # at most the minimum and maximum of both columns per pixel column
+    assert len(plotted) <= 4 * width + 2
+    assert plotted.index.is_monotonic_increasing
+    assert plotted.index[0] == dates[0] and plotted.index[-1] == dates[-1]
+    assert plotted['intensity'].max() == 10
+    assert plotted['other'].min() == -10
+    assert plotted['intensity'].min() == ts.data['intensity'].min()
+    assert ts._plot_data(axes, downsample=False) is ts.data
+    ts.plot(axes)
+    assert len(axes.lines[0].get_xdata()) == len(plotted)
+    plt.close(figure)
+
+
+def test_plot_not_downsampled(generic_ts):
+    figure = plt.figure()
+    assert generic_ts._plot_data(figure.gca()) is generic_ts.data
+    plt.close(figure)
+
 #==============================================================================
 # Test Basic Working Peek
 #==============================================================================
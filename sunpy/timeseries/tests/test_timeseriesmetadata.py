@@ -8,6 +8,8 @@ Created on Wed Jul 20 10:24:06 2016
 from __future__ import print_function, division
 
 import copy
+import pickle
+import datetime
 
 from sunpy.timeseries import TimeSeriesMetaData
 from sunpy.time import TimeRange
@@ -155,6 +157,19 @@ def test_concatenate(basic_ascending_append_md, basic_4_md, complex_append_md):
     assert concatenated == complex_append_md
 
 
+def test_concatenate_list(basic_1_md, basic_2_md, basic_3_md, basic_4_md):
+    # Concatenating a list matches concatenating one after the other
+    folded = basic_1_md
+    for other in [basic_4_md, basic_3_md, basic_1_md, basic_2_md, basic_4_md]:
+        folded = folded.concatenate(other)
+    concatenated = basic_1_md.concatenate(
+        [basic_4_md, basic_3_md, basic_1_md, basic_2_md, basic_4_md])
+    assert concatenated == folded
+    assert len(concatenated.metadata) == 4
+    # the original is unchanged
+    assert len(basic_1_md.metadata) == 1
+
+
 #==============================================================================
 # Test TimeSeriesMetaData Truncation
 #==============================================================================
@@ -263,6 +278,69 @@ def test_find_both_filters(basic_2_md, basic_4_md, complex_append_md):
     assert complex_append_md.find(time='2010-01-02 20:59:57.468999', colname='column2') == basic_2_md
     assert complex_append_md.find(time='2010-01-02 20:59:57.468999', colname='md4_column1') == basic_4_md
 
+def test_find_after_direct_changes(basic_1_md, basic_2_md, basic_4_md, complex_append_md):
+    # The lookup index follows changes made to the list of entries directly
+    md = copy.deepcopy(complex_append_md)
+    assert md.find_indices(time='2010-01-02 20:59:57.468999') == [1, 2]
+    del md.metadata[1]
+    assert md.find(time='2010-01-02 20:59:57.468999') == basic_2_md
+    md.metadata[0] = (md.metadata[0][0], ['renamed'], md.metadata[0][2])
+    assert md.find_indices(colname='column1') == [1, 2]
+    assert md.find_indices(colname='renamed') == [0]
+    md.metadata = [basic_4_md.metadata[0], basic_1_md.metadata[0]]
+    assert md.find(time='2010-01-02 20:59:57.468999') == basic_4_md
+    assert md.find_indices(time='2010-01-01 21:00:00') == [0, 1]
+
+def test_find_unordered(basic_1_md, basic_2_md, basic_3_md):
+    md = TimeSeriesMetaData([basic_3_md.metadata[0], basic_1_md.metadata[0],
+                             basic_2_md.metadata[0]])
+    assert md.find(time='2010-01-02 13:59:57.468999') == basic_2_md
+    assert md.find_indices(time='2010-01-02 13:59:56') == [1]
+
+def test_find_many_entries():
+    start = TimeRange('2010-01-01 00:00', '2010-01-01 01:00').start
+    hour = datetime.timedelta(hours=1)
+    md = TimeSeriesMetaData(MetaDict(), TimeRange(start, hour), ['column'])
+    for i in range(1, 1000):
+        md.append(TimeRange(start + i * hour, hour),
+                  ['column', 'odd' if i % 2 else 'even'], MetaDict())
+    # a long entry which overlaps many others
+    md.append(TimeRange('2010-01-03 00:30', '2010-01-05 00:30'), ['long'], MetaDict())
+    assert md.find_indices(time='2010-01-02 00:30') == [24]
+    assert md.find_indices(time='2010-01-03 01:00') == [48, 49, 50]
+    assert md.find_indices(time='2010-01-04 12:30', colname='even') == [85]
+    assert md.find_indices(colname='long') == [49]
+    assert len(md.find_indices(colname='odd')) == 500
+
+def test_find_with_long_entry():
+    start = TimeRange('2010-01-01 00:00', '2010-01-01 01:00').start
+    day = datetime.timedelta(days=1)
+    # a year-long header among many daily ones
+    md = TimeSeriesMetaData(MetaDict(), TimeRange(start, 365 * day), ['year'])
+    for i in range(2000):
+        md.append(TimeRange(start + i * day, day), ['daily'], MetaDict())
+    # the first daily entry starts with it and is inserted before it
+    assert md.find_indices(time='2010-06-01 12:00') == [1, 152]
+    assert md.find_indices(time='2014-01-01 12:00') == [1462]
+
+    class CountingList(list):
+        reads = 0
+
+        def __getitem__(self, item):
+            CountingList.reads += 1
+            return list.__getitem__(self, item)
+
+    index = md._get_index()
+    index._tree = CountingList(index._tree)
+    assert md.find_indices(time='2014-01-01 12:00') == [1462]
+    # the lookup does not visit the entries the year-long one overlaps
+    assert CountingList.reads < 100
+
+def test_pickle(complex_append_md):
+    md = pickle.loads(pickle.dumps(complex_append_md))
+    assert md == complex_append_md
+    assert md.find_indices(time='2010-01-02 20:59:57.468999') == [1, 2]
+
 
 #==============================================================================
 # Test TimeSeriesMetaData get and update methods
@@ -4,6 +4,8 @@ import warnings
 import os
 import glob
 from collections import OrderedDict
+from functools import partial
+from multiprocessing import Pool
 import copy
 
 import numpy as np
@@ -15,7 +17,9 @@ from astropy.time import Time
 import astropy.units as u
 
 import sunpy
-from sunpy.timeseries.timeseriesbase import GenericTimeSeries, TIMESERIES_CLASSES
+from sunpy.timeseries.timeseriesbase import (GenericTimeSeries, TIMESERIES_CLASSES,
+                                             _parts, _concatenate_parts)
+from sunpy.timeseries.cache import get_default_cache
 from sunpy.util.metadata import MetaDict
 from sunpy.time import parse_time
 
@@ -56,7 +60,18 @@ class TimeSeriesFactory(BasicRegistrationFactory):
 
     concatenate : `bool`, optional, default:False
         If set, combine any resulting list of TimeSeries objects into a single
-        TimeSeries, using successive concatenate methods.
+        TimeSeries. Only the data, metadata and units of each file are kept
+        until the TimeSeries is built from all of them.
+
+    cache : `bool` or `~sunpy.timeseries.cache.TimeSeriesCache`, optional, default:False
+        If set, files are parsed only once and read back from a cache of
+        parsed time series afterwards. `True` uses the cache returned by
+        `sunpy.timeseries.cache.get_default_cache`.
+
+    workers : `int`, optional
+        If greater than 1, files are parsed concurrently by a pool of that
+        many processes. The time series are returned in the order of the
+        files.
 
     Examples
     --------
@@ -104,6 +119,10 @@ class TimeSeriesFactory(BasicRegistrationFactory):
 
     >>> my_timeseries = sunpy.timeseries.TimeSeries(['file1.fits', 'file2.fits', 'file3.fits', 'directory1/'])   # doctest: +SKIP
 
+    * Many files parsed by four processes at once
+
+    >>> my_timeseries = sunpy.timeseries.TimeSeries('eve/*', source='EVE', concatenate=True, workers=4)   # doctest: +SKIP
+
     * Any mixture of the above not in a list
 
     >>> my_timeseries = sunpy.timeseries.TimeSeries((data, header), data2, header2, 'file1.fits', url, 'eit_*.fits')   # doctest: +SKIP
@@ -130,7 +149,13 @@ class TimeSeriesFactory(BasicRegistrationFactory):
             List of (data, header) pairs if ``parsed`` is ``True`` or ``fname``
             if ``False``
         """
-        if 'source' not in kwargs.keys() or not kwargs['source']:
+        # Files which go through the cache or are parsed by worker processes
+        # are parsed later on by __call__.
+        cache = kwargs.pop('cache', None)
+        workers = kwargs.pop('workers', None)
+        if ((cache is None or cache is False) and
+                (workers is None or workers <= 1) and
+                ('source' not in kwargs.keys() or not kwargs['source'])):
             try:
                 pairs = read_file(fname, **kwargs)
 
@@ -389,6 +414,12 @@ class TimeSeriesFactory(BasicRegistrationFactory):
         silence_errors : `bool`, optional
             If set, ignore data-header pairs which cause an exception.
 
+        cache : `bool` or `~sunpy.timeseries.cache.TimeSeriesCache`, optional
+            If set, read files through a cache of parsed time series.
+
+        workers : `int`, optional
+            If greater than 1, parse files in a pool of that many processes.
+
         Notes
         -----
         Extra keyword arguments are passed through to `sunpy.io.read_file` such
@@ -401,19 +432,42 @@ class TimeSeriesFactory(BasicRegistrationFactory):
         (data_header_unit_tuples, data_header_pairs,
          already_timeseries, filepaths) = self._parse_args(*args, **kwargs)
 
+        cache = kwargs.pop('cache', None)
+        if cache is True:
+            cache = get_default_cache()
+        elif cache is False:
+            cache = None
+        workers = kwargs.pop('workers', None)
+        concatenate = kwargs.get('concatenate', False)
+
+        # With concatenate, only the class, data, metadata and units of each
+        # time series are kept and one time series is built from them at the
+        # end.
         new_timeseries = list()
 
+        def collect(timeseries):
+            new_timeseries.append(
+                _parts(timeseries) if concatenate else timeseries)
+
+        if workers is not None and workers > 1:
+            new_timeseries += self._read_parallel(filepaths, workers, cache,
+                                                  silence_errors, **kwargs)
+            filepaths = []
+
         # The filepaths for unreadable files
         for filepath in filepaths:
             try:
-                new_ts = self._check_registered_widgets(filepath=filepath, **kwargs)
+                if cache is not None:
+                    new_ts = self._read_cached(filepath, cache, **kwargs)
+                else:
+                    new_ts = self._check_registered_widgets(filepath=filepath, **kwargs)
             except (NoMatchError, MultipleMatchError, ValidationFunctionError):
                 if not silence_errors:
                     raise
             except:
                 raise
 
-            new_timeseries.append(new_ts)
+            collect(new_ts)
 
         # data_header_pairs is a list of HDUs as read by sunpy.io
         # For each set of HDus find the matching class and read the
@@ -467,19 +521,15 @@ class TimeSeriesFactory(BasicRegistrationFactory):
             except:
                 raise
 
-            new_timeseries.append(new_ts)
+            collect(new_ts)
 
-        new_timeseries += already_timeseries
+        for timeseries in already_timeseries:
+            collect(timeseries)
 
         # Concatenate the timeseries into one if specified.
-        concatenate = kwargs.get('concatenate', False)
         if concatenate:
-            # Merge all these timeseries into one.
-            full_timeseries = new_timeseries.pop(0)
-            for timeseries in new_timeseries:
-                full_timeseries = full_timeseries.concatenate(timeseries)
-
-            new_timeseries = [full_timeseries]
+            # Merge all these timeseries into one in a single step.
+            new_timeseries = [_concatenate_parts(new_timeseries)]
 
         # Sanitize any units OrderedDict details
         for timeseries in new_timeseries:
@@ -490,6 +540,61 @@ class TimeSeriesFactory(BasicRegistrationFactory):
             return new_timeseries[0]
         return new_timeseries
 
+    def _read_cached(self, filepath, cache, **kwargs):
+        """
+        Return the TimeSeries stored in ``cache`` for the file or parse the
+        file and add the result to the cache.
+        """
+        source = kwargs.get('source', None)
+        timeseries = cache.get(filepath, source)
+        if timeseries is None:
+            timeseries = self(filepath, **kwargs)
+            cache.add(filepath, timeseries, source)
+        return timeseries
+
+    def _read_parallel(self, filepaths, workers, cache=None,
+                       silence_errors=False, **kwargs):
+        """
+        Parse ``filepaths`` in a pool of ``workers`` processes and return the
+        time series in the order of the files. With ``concatenate``, the
+        workers send back and this returns only the class, data, metadata and
+        units of each time series. Files found in ``cache`` are not parsed
+        again and the parsed ones are added to it.
+        """
+        source = kwargs.get('source', None)
+        concatenate = kwargs.get('concatenate', False)
+        results = [None] * len(filepaths)
+        if cache is not None:
+            results = [cache.get(filepath, source) for filepath in filepaths]
+            if concatenate:
+                results = [None if result is None else _parts(result)
+                           for result in results]
+        todo = [i for i, result in enumerate(results) if result is None]
+        if todo:
+            read = partial(_read_timeseries, silence_errors=silence_errors,
+                           **kwargs)
+            paths = [filepaths[i] for i in todo]
+            workers = min(workers, len(paths))
+            pool = Pool(workers) if workers > 1 else None
+            try:
+                if pool is None:
+                    parsed = map(read, paths)
+                else:
+                    chunksize = max(1, min(64, len(paths) // (4 * workers)))
+                    parsed = pool.imap(read, paths, chunksize)
+                for i, result in zip(todo, parsed):
+                    results[i] = result
+                    if cache is not None and result is not None:
+                        if concatenate:
+                            cls, data, meta, units = result
+                            result = cls(data, meta, units)
+                        cache.add(filepaths[i], result, source)
+            finally:
+                if pool is not None:
+                    pool.terminate()
+                    pool.join()
+        return [result for result in results if result is not None]
+
     def _get_matching_widget(self, **kwargs):
         candidate_widget_types = list()
 
@@ -533,6 +638,22 @@ class TimeSeriesFactory(BasicRegistrationFactory):
         # Now return a TimeSeries from the given file.
         return WidgetType(data, meta, units, **kwargs)
 
+def _read_timeseries(filepath, silence_errors=False, **kwargs):
+    """Return the time series read from ``filepath``, or `None` if no source
+    matches it and ``silence_errors`` is set. With ``concatenate``, only its
+    class, data, metadata and units are returned. This is a module level
+    function so that it can be run in a worker process."""
+    try:
+        timeseries = TimeSeries(filepath, **kwargs)
+    except (NoMatchError, MultipleMatchError, ValidationFunctionError):
+        if not silence_errors:
+            raise
+        return None
+    if kwargs.get('concatenate', False):
+        return _parts(timeseries)
+    return timeseries
+
+
 def _is_url(arg):
     try:
         urlopen(arg)
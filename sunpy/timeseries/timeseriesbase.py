@@ -10,10 +10,14 @@ __email__ = "stuart@mumford.me.uk"
 import warnings
 from abc import ABCMeta
 from collections import OrderedDict
+from datetime import datetime
 import copy
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick
 
 from sunpy import config
 from sunpy.time import TimeRange
@@ -63,6 +67,129 @@ class GenericTimeSeriesMeta(ABCMeta):
         return cls
 
 
+def _minmax_rows(data, buckets):
+    """
+    Return the positions of the rows of ``data`` needed to draw it on an axes
+    ``buckets`` pixels wide: the first and the last row, and the rows holding
+    the minimum and the maximum of every numeric column within each of
+    ``buckets`` equally long time intervals. NaN values are ignored unless an
+    interval has nothing else. The index of ``data`` must be sorted.
+    """
+    times = data.index.asi8
+    span = float(times[-1] - times[0]) or 1.
+    bucket = np.minimum(((times - times[0]) / span * buckets).astype(np.int64),
+                        buckets - 1)
+    # The intervals are contiguous as the index is sorted.
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    lengths = np.diff(np.r_[starts, len(times)])
+    rows = [np.array([0, len(times) - 1])]
+    for column in data.select_dtypes(include=[np.number]).columns:
+        values = data[column].values.astype(np.float64)
+        nan = np.isnan(values)
+        for reduce_, fill in ((np.minimum, np.inf), (np.maximum, -np.inf)):
+            filled = np.where(nan, fill, values)
+            extreme = np.repeat(reduce_.reduceat(filled, starts), lengths)
+            matches = np.flatnonzero(filled == extreme)
+            # The first match at or after the start of each interval.
+            rows.append(matches[np.searchsorted(matches, starts)])
+    return np.unique(np.concatenate(rows))
+
+
+# The aggregations supported by `GenericTimeSeries.resample`.
+_RESAMPLE_METHODS = ('mean', 'min', 'max', 'sum', 'count')
+
+
+def _resample_column(values, edges, how, chunksize):
+    """
+    Aggregate ``values`` into bins, ``edges`` being the position of the first
+    row of each bin. The rows are processed ``chunksize`` at a time, bins
+    split between two chunks are combined, so only one chunk of ``values``
+    has to be in memory at once.
+    """
+    nbins = len(edges)
+    count = np.zeros(nbins, dtype=np.int64)
+    if how in ('mean', 'sum'):
+        result, fill, combine = np.zeros(nbins), 0., np.add
+    elif how == 'min':
+        result, fill, combine = np.full(nbins, np.inf), np.inf, np.minimum
+    else:
+        result, fill, combine = np.full(nbins, -np.inf), -np.inf, np.maximum
+    for first in range(0, len(values), chunksize):
+        last = min(first + chunksize, len(values))
+        # The bins overlapping the chunk and the positions in the chunk they
+        # start at, leaving out the empty ones.
+        lo = np.searchsorted(edges, first, side='right') - 1
+        hi = np.searchsorted(edges, last, side='left')
+        starts = np.maximum(edges[lo:hi], first) - first
+        ends = np.r_[starts[1:], last - first]
+        ids = np.arange(lo, hi)[ends > starts]
+        starts = starts[ends > starts]
+        chunk_values = np.asarray(values[first:last], dtype=np.float64)
+        valid = ~np.isnan(chunk_values)
+        if valid.all():
+            count[ids] += np.diff(np.r_[starts, last - first])
+        else:
+            count[ids] += np.add.reduceat(valid, starts, dtype=np.int64)
+            chunk_values = np.where(valid, chunk_values, fill)
+        if how != 'count':
+            result[ids] = combine(result[ids],
+                                  combine.reduceat(chunk_values, starts))
+    if how == 'count':
+        return count
+    empty = count == 0
+    if how == 'mean':
+        result[~empty] /= count[~empty]
+    result[empty] = np.nan
+    return result
+
+
+def _parts(timeseries):
+    """Return the class, data, metadata and units of a time series."""
+    return (type(timeseries), timeseries.data, timeseries.meta,
+            timeseries.units)
+
+
+def _concatenate_parts(parts, **kwargs):
+    """
+    Build one time series from the ``(class, data, meta, units)`` tuples of
+    several time series the way `GenericTimeSeries.concatenate` does. The
+    first tuple takes the place of the time series the others are added to.
+    """
+    first_cls, first_data, first_meta = parts[0][:3]
+    if len(parts) == 1:
+        return first_cls(first_data, first_meta, parts[0][3])
+
+    # Concatenate the metadata and data
+    meta = first_meta.concatenate([part[2] for part in parts[1:]])
+    frames = [part[1] for part in parts]
+    data = pd.concat(frames, **kwargs)
+    if not data.index.is_monotonic_increasing:
+        # A stable sort keeps rows of earlier series first for equal times.
+        data = data.sort_index(kind='mergesort')
+    if data.index.has_duplicates:
+        if all(frame.columns.equals(first_data.columns) for frame in frames):
+            data = data[~data.index.duplicated(keep='first')]
+        else:
+            data = data.groupby(level=0, sort=False).first()
+
+    # Add all the new units to the dictionary.
+    units = OrderedDict()
+    for part in parts:
+        units.update(part[3])
+
+    # If sources match then build similar TimeSeries.
+    if all(part[0] == first_cls for part in parts):
+        object = first_cls(data, meta, units)
+    else:
+        # Build generic time series if the sources don't match.
+        object = GenericTimeSeries(data, meta, units)
+
+    # Sanatise metadata and units
+    object._sanitize_metadata()
+    object._sanitize_units()
+    return object
+
+
 @six.add_metaclass(GenericTimeSeriesMeta)
 class GenericTimeSeries:
     """
@@ -110,6 +237,11 @@ class GenericTimeSeries:
     # Class attribute used to specify the source class of the TimeSeries.
     _source = None
 
+    # Version of the parser of the source class. Increase it whenever the
+    # parsed data, metadata or units change to invalidate cached results, see
+    # `sunpy.timeseries.cache`.
+    _parser_version = 1
+
     def __init__(self, data, meta=None, units=None, **kwargs):
         self.data = data
         tr = TimeRange(self.data.index.min(), self.data.index.max())
@@ -239,9 +371,22 @@ class GenericTimeSeries:
         """
         return GenericTimeSeries(self.data.sort_index(**kwargs), TimeSeriesMetaData(copy.copy(self.meta.metadata)), copy.copy(self.units))
 
+    def _sorted_data(self):
+        """Return the data in chronological order. pandas caches whether an
+        index is monotonic, so data which is already sorted is not sorted
+        again."""
+        if self.data.index.is_monotonic_increasing:
+            return self.data
+        return self.data.sort_index()
+
     def truncate(self, a, b=None, int=None):
         """Returns a truncated version of the TimeSeries object.
 
+        The data of the new time series is a view of the data of this one
+        where possible, and the metadata entries are shared until they are
+        changed with `~sunpy.timeseries.TimeSeriesMetaData.update`. Copy the
+        data before modifying it in place.
+
         Parameters
         ----------
         a : `sunpy.time.TimeRange`, `str` or `int`
@@ -275,18 +420,26 @@ class GenericTimeSeries:
             end   = b
 
         # If an interval integer was given then use in truncation.
-        truncated_data = self.data.sort_index()[start:end:int]
+        data = self._sorted_data()
+        if (isinstance(start, (datetime, type(None))) and
+                isinstance(end, (datetime, type(None)))):
+            # Find the positions by binary search, slicing by position gives
+            # a view of the data.
+            index = data.index
+            first = 0 if start is None else index.searchsorted(start, side='left')
+            last = len(index) if end is None else index.searchsorted(end, side='right')
+            truncated_data = data.iloc[first:last:int]
+        else:
+            truncated_data = data[start:end:int]
 
-        # Truncate the metadata
-        # Check there is data still
+        # Check there is data still, the metadata is truncated when it is
+        # sanitised below.
         truncated_meta = TimeSeriesMetaData([])
         if len(truncated_data) > 0:
-            tr = TimeRange(truncated_data.index.min(), truncated_data.index.max())
-            truncated_meta = TimeSeriesMetaData(copy.deepcopy(self.meta.metadata))
-            truncated_meta._truncate(tr)
+            truncated_meta = TimeSeriesMetaData(self.meta.metadata)
 
         # Build similar TimeSeries object and sanatise metadata and units.
-        object = self.__class__(truncated_data.sort_index(), truncated_meta, copy.copy(self.units))
+        object = self.__class__(truncated_data, truncated_meta, copy.copy(self.units))
         object._sanitize_metadata()
         object._sanitize_units()
         return object
@@ -294,6 +447,9 @@ class GenericTimeSeries:
     def extract(self, column_name):
         """Returns a new time series with the chosen column.
 
+        Like for `truncate`, the data is a view of the data of this time
+        series where possible.
+
         Parameters
         ----------
         column_name : `str`
@@ -312,69 +468,144 @@ class GenericTimeSeries:
             return GenericTimeSeries(self.data[column_name], TimeSeriesMetaData(self.meta.metadata.copy()))
         """
         # Extract column and remove empty rows
-        data = self.data[[column_name]].dropna()
+        data = self._sorted_data()
+        position = data.columns.get_loc(column_name)
+        if isinstance(position, six.integer_types):
+            # A slice of columns is a view, a list of columns a copy.
+            data = data.iloc[:, position:position + 1]
+        else:
+            data = data[[column_name]]
+        if data.isnull().values.any():
+            data = data.dropna()
 
         # Build generic TimeSeries object and sanatise metadata and units.
-        object = GenericTimeSeries(data.sort_index(), TimeSeriesMetaData(copy.copy(self.meta.metadata)), copy.copy(self.units))
+        object = GenericTimeSeries(data, TimeSeriesMetaData(self.meta.metadata), copy.copy(self.units))
         object._sanitize_metadata()
         object._sanitize_units()
         return object
 
     def concatenate(self, otherts, **kwargs):
-        """Concatenate with another TimeSeries. This function will check and
-        remove any duplicate times. It will keep the column values from the
-        original time series to which the new time series is being added.
+        """Concatenate with one or more other TimeSeries. This function will
+        check and remove any duplicate times. It will keep the column values
+        from the original time series to which the new time series are being
+        added, and for duplicate times of series with different columns it
+        fills the missing values of the first row from the later rows.
+
+        The data of all time series is concatenated, sorted and checked for
+        duplicate times only once, so concatenating a list of time series is
+        much faster than concatenating them one at a time.
 
         Parameters
         ----------
-        otherts : `~sunpy.timeseries.TimeSeries`
-            Another time series.
+        otherts : `~sunpy.timeseries.TimeSeries` or `list`
+            Another time series or a list of time series.
 
         same_source : `bool` Optional
             Set to true to check if the sources of the time series match.
 
+        Other keyword arguments are passed to `pandas.concat`.
+
         Returns
         -------
         newts : `~sunpy.timeseries.TimeSeries`
             A new time series.
-
-        Debate: decide if we want to be able to concatenate multiple time series
-        at once.
         """
+        if isinstance(otherts, GenericTimeSeries):
+            otherts = [otherts]
 
         # check to see if nothing needs to be done
-        if self == otherts:
+        otherts = [ts for ts in otherts if ts is not self and ts != self]
+        if not otherts:
             return self
 
         # Check the sources match if specified.
-        same_source = kwargs.get('same_source', False)
-        if same_source and not (isinstance(otherts, self.__class__)):
+        same_source = kwargs.pop('same_source', False)
+        if same_source and not all(isinstance(ts, self.__class__)
+                                   for ts in otherts):
             raise TypeError("TimeSeries classes must match if specified.")
 
-        # Concatenate the metadata and data
-        meta = self.meta.concatenate(otherts.meta)
-        data = pd.concat([self.data.copy(), otherts.data], **kwargs)
+        return _concatenate_parts([_parts(ts) for ts in [self] + otherts],
+                                  **kwargs)
 
-        # Add all the new units to the dictionary.
-        units = OrderedDict()
-        units.update(self.units)
-        units.update(otherts.units)
+    def resample(self, rule, how='mean', chunksize=2 ** 20):
+        """
+        Returns a new time series with the values aggregated into bins of
+        equal duration.
 
-        # If sources match then build similar TimeSeries.
-        if self.__class__ == otherts.__class__:
-            object = self.__class__(data.sort_index(), meta, units)
-        else:
-            # Build generic time series if the sources don't match.
-            object = GenericTimeSeries(data.sort_index(), meta, units)
+        Like `pandas.DataFrame.resample`, the bins include their start time,
+        are labelled with it and are aligned to midnight of the first day.
+        NaN values are ignored, bins without values are NaN (or 0 for
+        ``'count'``). The units of the columns are kept, except for
+        ``'count'`` which is dimensionless, and the metadata is truncated to
+        the new time range. Columns which are not numeric are dropped.
+
+        Parameters
+        ----------
+        rule : `str`, `~datetime.timedelta` or `~astropy.units.Quantity`
+            The duration of the bins, e.g. ``'1min'`` or ``60 * u.s``.
+            Calendar rules such as ``'M'`` are handed to pandas.
+
+        how : `str`, optional
+            The aggregation of the values of each bin, one of ``'mean'``,
+            ``'min'``, ``'max'``, ``'sum'`` or ``'count'``.
 
-        # Sanatise metadata and units
+        chunksize : `int`, optional
+            The number of rows aggregated at once. Only that many rows of
+            each column have to be in memory, e.g. for data memory-mapped by
+            `~sunpy.timeseries.cache.TimeSeriesCache`.
+
+        Returns
+        -------
+        newts : `~sunpy.timeseries.TimeSeries`
+            A new time series with one row per bin.
+        """
+        if how not in _RESAMPLE_METHODS:
+            raise ValueError("how must be one of {0}, not {1!r}.".format(
+                ', '.join(_RESAMPLE_METHODS), how))
+        if isinstance(rule, u.Quantity):
+            rule = pd.Timedelta(int(round(rule.to(u.ns).value)), unit='ns')
+        offset = to_offset(rule)
+
+        data = self._sorted_data()
+        columns = [column for column in data.columns
+                   if np.issubdtype(data[column].dtype, np.number)]
+        if isinstance(offset, Tick) and len(data) > 0:
+            times = data.index.asi8
+            step = offset.nanos
+            # Bins are aligned to midnight like in pandas, the first one holds
+            # the first row.
+            day = pd.Timedelta(days=1).value
+            origin = times[0] - times[0] % day
+            origin += (times[0] - origin) // step * step
+            labels = origin + np.arange((times[-1] - origin) // step + 1) * step
+            # Binary search for the first row of each bin instead of dividing
+            # every time.
+            edges = np.searchsorted(times, labels)
+            index = pd.DatetimeIndex(labels, name=data.index.name)
+            resampled = pd.DataFrame(OrderedDict(
+                (column, _resample_column(data[column].values, edges, how,
+                                          chunksize))
+                for column in columns), index=index, columns=columns)
+        else:
+            resampled = getattr(data[columns].resample(offset), how)()
+
+        units = OrderedDict((column, self.units[column])
+                            for column in columns if column in self.units)
+        if how == 'count':
+            units = OrderedDict((column, u.dimensionless_unscaled)
+                                for column in columns)
+
+        meta = TimeSeriesMetaData([])
+        if len(resampled) > 0:
+            meta = TimeSeriesMetaData(self.meta.metadata)
+        object = self.__class__(resampled, meta, units)
         object._sanitize_metadata()
         object._sanitize_units()
         return object
 
 # #### Plotting Methods #### #
 
-    def plot(self, axes=None, **plot_args):
+    def plot(self, axes=None, downsample=True, **plot_args):
         """Plot a plot of the time series
 
         Parameters
@@ -383,6 +614,12 @@ class GenericTimeSeries:
             If provided the image will be plotted on the given axes. Otherwise
             the current axes will be used.
 
+        downsample : `bool`
+            If `True` and the time series has many more rows than the axes
+            is wide in pixels, only the rows holding the minimum or the
+            maximum of a column within each pixel column are plotted. The
+            plot looks the same, peaks included, but is drawn much faster.
+
         **plot_args : `dict`
             Any additional plot arguments that should be used
             when plotting.
@@ -397,10 +634,24 @@ class GenericTimeSeries:
         if axes is None:
             axes = plt.gca()
 
-        axes = self.data.plot(ax=axes, **plot_args)
+        axes = self._plot_data(axes, downsample).plot(ax=axes, **plot_args)
 
         return axes
 
+    def _plot_data(self, axes=None, downsample=True):
+        """Return the data to plot on ``axes``, reduced to the rows holding
+        the extremes of each column per pixel column of the axes if
+        ``downsample`` is `True`."""
+        if not downsample or not isinstance(self.data.index, pd.DatetimeIndex):
+            return self.data
+        if axes is None:
+            axes = plt.gca()
+        buckets = max(int(axes.get_window_extent().width), 1)
+        if len(self.data) <= 4 * buckets:
+            return self.data
+        data = self._sorted_data()
+        return data.iloc[_minmax_rows(data, buckets)]
+
     def peek(self, **kwargs):
         """Displays the time series in a new figure.
 
@@ -3,6 +3,9 @@ from __future__ import absolute_import, division, print_function
 import os
 import datetime
 import re
+import threading
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 
 from bs4 import BeautifulSoup
 from sunpy.extern import six
@@ -20,6 +23,31 @@ TIME_CONVERSIONS = {'%Y': '\d{4}', '%y': '\d{2}',
                     '%M': '\d{2}',
                     '%S': '\d{2}', '%e': '\d{3}', '%f': '\d{6}'}
 
+TIME_ORDER = ['%Y', '%y', '%b', '%B', '%m', '%d', '%j',
+              '%H', '%I', '%M', '%S', '%e', '%f']
+
+# Listings of directories which only hold data from the past are not expected
+# to change, so they are shared between all Scraper instances. The least
+# recently used listings are dropped once there are too many.
+_LISTING_CACHE = OrderedDict()
+_LISTING_CACHE_SIZE = 1024
+_listing_lock = threading.Lock()
+
+# Number of directories fetched concurrently by `Scraper.filelist`.
+MAX_WORKERS = 8
+
+
+def _url_to_list(txt):
+    """Split a url into blocks separated by '/', '.' or '_'."""
+    return re.sub(r'\.|_', '/', txt).split('/')
+
+
+def _pattern_to_regex(pattern):
+    """Replace the datetime formats in a pattern by regular expressions."""
+    for k, v in six.iteritems(TIME_CONVERSIONS):
+        pattern = pattern.replace(k, v)
+    return pattern
+
 
 class Scraper(object):
     """
@@ -66,6 +94,11 @@ class Scraper(object):
             now = datetime.datetime.now()
             milliseconds_ = int(now.microsecond / 1000.)
             self.now = now.strftime(self.pattern[0:milliseconds.start()] + str(milliseconds_) + self.pattern[milliseconds.end():])
+        # The regular expressions needed to match and parse urls only depend
+        # on the pattern, so they are built once here.
+        self._url_regex = re.compile(_pattern_to_regex(self.pattern))
+        self._extension = self.pattern.split('.')[-1]
+        self._date_extractors = {}
 
     def matches(self, filepath, date):
         return date.strftime(self.pattern) == filepath
@@ -90,73 +123,85 @@ class Scraper(object):
             range given. Notice that these directories may not exist
             in the archive.
         """
+        return [directory for _, directory in self._range_dates(timerange)]
+
+    def _range_dates(self, timerange):
+        """Like `range`, but return pairs of the date each directory was
+        generated from (`None` if the pattern has no date in it) and the
+        directory."""
         #find directory structure - without file names
         directorypattern = os.path.dirname(self.pattern) + '/'
         #TODO what if there's not slashes?
         rangedelta = timerange.dt
         timestep = self._smallerPattern(directorypattern)
         if timestep is None:
-            return [directorypattern]
+            return [(None, directorypattern)]
         else:
             # Number of elements in the time range (including end)
             n_steps = rangedelta.total_seconds()/timestep.total_seconds()
             TotalTimeElements = int(round(n_steps)) + 1
-            directories = [(timerange.start + n * timestep).strftime(directorypattern)
-                        for n in range(TotalTimeElements)] #todo if date <= endate
-            return directories
+            dates = [timerange.start + n * timestep
+                     for n in range(TotalTimeElements)] #todo if date <= endate
+            return [(date, date.strftime(directorypattern)) for date in dates]
 
     def _URL_followsPattern(self, url):
         """Check whether the url provided follows the pattern"""
-        pattern = self.pattern
-        for k,v in six.iteritems(TIME_CONVERSIONS):
-            pattern = pattern.replace(k, v)
-        matches = re.match(pattern, url)
+        matches = self._url_regex.match(url)
         if matches:
             return matches.end() == matches.endpos == len(self.now)
         return False
 
-    def _extractDateURL(self, url):
-        """Extracts the date from a particular url following the pattern"""
+    def _date_extractor(self, nblocks):
+        """
+        Build the information needed to extract the date from a url which
+        splits into ``nblocks`` blocks: the indices of the blocks holding
+        date information, and the list of datetime formats with the compiled
+        regular expression matching each of them.
+        """
         # url_to_list substitutes '.' and '_' for '/' to then create
         # a list of all the blocks in times - assuming they are all
         # separated with either '.', '_' or '/'
-        url_to_list = lambda txt: re.sub(r'\.|_', '/', txt).split('/')
-        pattern_list = url_to_list(self.pattern)
-        url_list = url_to_list(url)
-        time_order = ['%Y', '%y', '%b', '%B', '%m', '%d', '%j',
-                      '%H', '%I', '%M', '%S', '%e', '%f']
-        final_date = []
+        pattern_list = _url_to_list(self.pattern)[:nblocks]
+        time_order = list(TIME_ORDER)
+        indices = []
         final_pattern = []
         # Find in directory and filename
-        for pattern_elem, url_elem in zip(pattern_list, url_list):
+        for i, pattern_elem in enumerate(pattern_list):
             time_formats = [x for x in time_order if x in pattern_elem]
             if len(time_formats) > 0:
-                final_date.append(url_elem)
+                indices.append(i)
                 final_pattern.append(pattern_elem)
                 for time_bit in time_formats:
                     time_order.remove(time_bit)
         # Find and remove repeated elements eg: %Y in ['%Y', '%Y%m%d']
-        #   Make all as single strings
-        date_together = ''.join(final_date)
         pattern_together = ''.join(final_pattern)
-        re_together = pattern_together
-        for k, v in six.iteritems(TIME_CONVERSIONS):
-            re_together = re_together.replace(k, v)
-
-        #   Create new empty lists
-        final_date = list()
-        final_pattern = list()
+        re_together = _pattern_to_regex(pattern_together)
         re_together = re_together.replace('[A-Z]', '\\[A-Z]')
-        for p,r in zip(pattern_together.split('%')[1:], re_together.split('\\')[1:]):
+        parts = []
+        for p, r in zip(pattern_together.split('%')[1:], re_together.split('\\')[1:]):
             if p == 'e':
                 continue
             regexp = '\\{}'.format(r) if not r.startswith('[') else r
-            pattern = '%{}'.format(p)
-            date_part = re.search(regexp, date_together)
+            parts.append(('%{}'.format(p), re.compile(regexp)))
+        return indices, parts
+
+    def _extractDateURL(self, url):
+        """Extracts the date from a particular url following the pattern"""
+        url_list = _url_to_list(url)
+        nblocks = len(url_list)
+        if nblocks not in self._date_extractors:
+            self._date_extractors[nblocks] = self._date_extractor(nblocks)
+        indices, parts = self._date_extractors[nblocks]
+
+        date_together = ''.join(url_list[i] for i in indices)
+        final_date = list()
+        final_pattern = list()
+        for pattern, regexp in parts:
+            date_part = regexp.search(date_together)
             date_together = date_together[:date_part.start()] + \
                             date_together[date_part.end():]
             if pattern not in final_pattern:
-                final_pattern.append('%{}'.format(p))
+                final_pattern.append(pattern)
                 final_date.append(date_part.group())
         return datetime.datetime.strptime(' '.join(final_date),
                                           ' '.join(final_pattern))
@@ -186,28 +231,68 @@ class Scraper(object):
         >>> print(solmon.filelist(timerange))
         ['http://solarmonitor.org/data/2015/01/01/fits/swap/swap_00174_fd_20150101_025423.fts.gz']
         """
-        directories = self.range(timerange)
+        directories = self._range_dates(timerange)
+        # Directories which ended more than a day ago are not expected to
+        # receive new files.
+        last_immutable = datetime.datetime.utcnow() - datetime.timedelta(days=1)
+        timestep = self._smallerPattern(os.path.dirname(self.pattern) + '/')
+        args = [(directory, date is not None and date + timestep < last_immutable)
+                for date, directory in directories]
+
+        pool = ThreadPool(max(1, min(MAX_WORKERS, len(args))))
+        try:
+            listings = pool.map(lambda arg: self._list_directory(*arg), args)
+        finally:
+            pool.close()
+            pool.join()
+
         filesurls = []
-        for directory in directories:
-            try:
-                opn = urlopen(directory)
-                try:
-                    soup = BeautifulSoup(opn, "lxml")
-                    for link in soup.find_all("a"):
-                        href = link.get("href")
-                        if href.endswith(self.pattern.split('.')[-1]):
-                            fullpath = directory + href
-                            if self._URL_followsPattern(fullpath):
-                                datehref = self._extractDateURL(fullpath)
-                                if (datehref >= timerange.start and
-                                    datehref <= timerange.end):
-                                    filesurls.append(fullpath)
-                finally:
-                    opn.close()
-            except:
-                pass
+        for (directory, _), hrefs in zip(args, listings):
+            for href in hrefs:
+                if href.endswith(self._extension):
+                    fullpath = directory + href
+                    if self._URL_followsPattern(fullpath):
+                        try:
+                            datehref = self._extractDateURL(fullpath)
+                        except (AttributeError, IndexError, ValueError):
+                            # the URL holds no valid date, e.g. a month 13
+                            continue
+                        if (datehref >= timerange.start and
+                            datehref <= timerange.end):
+                            filesurls.append(fullpath)
         return filesurls
 
+    def _list_directory(self, directory, immutable=False):
+        """
+        Return the targets of all links in the directory listing at the url
+        ``directory``, or an empty list if it cannot be read. Listings of
+        ``immutable`` directories are cached.
+        """
+        if immutable:
+            with _listing_lock:
+                if directory in _LISTING_CACHE:
+                    # re-inserting moves the listing to the most recently
+                    # used end
+                    hrefs = _LISTING_CACHE.pop(directory)
+                    _LISTING_CACHE[directory] = hrefs
+                    return hrefs
+        try:
+            opn = urlopen(directory)
+            try:
+                soup = BeautifulSoup(opn, "lxml")
+                hrefs = [link.get("href") for link in soup.find_all("a")]
+            finally:
+                opn.close()
+        except:
+            return []
+        hrefs = [href for href in hrefs if href is not None]
+        if immutable:
+            with _listing_lock:
+                _LISTING_CACHE[directory] = hrefs
+                while len(_LISTING_CACHE) > _LISTING_CACHE_SIZE:
+                    _LISTING_CACHE.popitem(last=False)
+        return hrefs
+
     def _smallerPattern(self, directoryPattern):
         """Obtain the smaller time step for the given pattern"""
         try:
@@ -1,11 +1,14 @@
 from __future__ import absolute_import, division, print_function
 
+import io
 import pytest
 import datetime
 import os
+from collections import OrderedDict
 
 import sunpy.data.test
 from sunpy.time import TimeRange
+from sunpy.util import scraper
 from sunpy.util.scraper import Scraper
 
 PATTERN_EXAMPLES = [
@@ -151,3 +154,83 @@ def testFilesRange_sameDirectory_months_remote():
     enddate = datetime.datetime(2007, 9, 10)
     timerange = TimeRange(startdate, enddate)
     assert len(s.filelist(timerange)) == 2
+
+
+def test_filelist_and_listing_cache(monkeypatch):
+    opened = []
+
+    def fake_urlopen(url):
+        opened.append(url)
+        day = url.split('/')[-2]
+        links = ''.join('<a href="fd_201004{0}_{1:02d}0000.fts">f</a>'.format(day, hour)
+                        for hour in range(0, 24, 6))
+        return io.BytesIO('<html><body><a>no href</a>{0}</body></html>'.format(links).encode())
+
+    monkeypatch.setattr(scraper, 'urlopen', fake_urlopen)
+    monkeypatch.setattr(scraper, '_LISTING_CACHE', OrderedDict())
+    s = Scraper('http://example.com/%Y/%m/%d/fd_%Y%m%d_%H%M%S.fts')
+    timerange = TimeRange('2010/04/01 03:00', '2010/04/03 12:00')
+    files = s.filelist(timerange)
+    assert files == ['http://example.com/2010/04/{0:02d}/fd_201004{0:02d}_{1:02d}0000.fts'.format(d, h)
+                     for d, h in [(1, 6), (1, 12), (1, 18), (2, 0), (2, 6), (2, 12),
+                                  (2, 18), (3, 0), (3, 6), (3, 12)]]
+    assert sorted(opened) == ['http://example.com/2010/04/0{0}/'.format(d) for d in (1, 2, 3)]
+
+    # Directories in the past are only listed once.
+    assert Scraper(s.pattern).filelist(timerange) == files
+    assert len(opened) == 3
+
+
+def test_listing_cache_skips_recent_directories(monkeypatch):
+    opened = []
+
+    def fake_urlopen(url):
+        opened.append(url)
+        return io.BytesIO(b'<html></html>')
+
+    monkeypatch.setattr(scraper, 'urlopen', fake_urlopen)
+    monkeypatch.setattr(scraper, '_LISTING_CACHE', OrderedDict())
+    s = Scraper('http://example.com/%Y/%m/%d/fd_%Y%m%d_%H%M%S.fts')
+    now = datetime.datetime.utcnow()
+    timerange = TimeRange(now - datetime.timedelta(hours=1), now)
+    s.filelist(timerange)
+    s.filelist(timerange)
+    assert len(opened) == 2
+
+
+def test_filelist_unreadable_directory(monkeypatch):
+    def fake_urlopen(url):
+        raise IOError(url)
+
+    monkeypatch.setattr(scraper, 'urlopen', fake_urlopen)
+    s = Scraper('http://example.com/%Y/%m/%d/fd_%Y%m%d_%H%M%S.fts')
+    assert s.filelist(TimeRange('2010/04/01', '2010/04/02')) == []
+
+
+def test_filelist_skips_invalid_dates(monkeypatch):
+    def fake_urlopen(url):
+        return io.BytesIO(b'<html><a href="fd_20100401_990000.fts">bad</a>'
+                          b'<a href="fd_20100401_060000.fts">good</a></html>')
+
+    monkeypatch.setattr(scraper, 'urlopen', fake_urlopen)
+    monkeypatch.setattr(scraper, '_LISTING_CACHE', OrderedDict())
+    s = Scraper('http://example.com/%Y/%m/%d/fd_%Y%m%d_%H%M%S.fts')
+    assert s.filelist(TimeRange('2010/04/01', '2010/04/01 12:00')) == [
+        'http://example.com/2010/04/01/fd_20100401_060000.fts']
+
+
+def test_listing_cache_lru(monkeypatch):
+    opened = []
+
+    def fake_urlopen(url):
+        opened.append(url)
+        return io.BytesIO(b'<html></html>')
+
+    monkeypatch.setattr(scraper, 'urlopen', fake_urlopen)
+    monkeypatch.setattr(scraper, '_LISTING_CACHE', OrderedDict())
+    monkeypatch.setattr(scraper, '_LISTING_CACHE_SIZE', 2)
+    s = Scraper('http://example.com/%Y/%m/%d/fd_%Y%m%d_%H%M%S.fts')
+    for directory in ['a/', 'b/', 'a/', 'c/', 'a/']:
+        s._list_directory('http://example.com/' + directory, immutable=True)
+    assert opened == ['http://example.com/a/', 'http://example.com/b/',
+                      'http://example.com/c/']
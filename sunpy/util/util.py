@@ -8,6 +8,7 @@ import os
 from itertools import count
 
 import numpy as np
+import astropy.units as u
 
 from sunpy.extern import six
 from sunpy.extern.six.moves import map, zip
@@ -218,3 +219,28 @@ def expand_list_generator(inp):
                 yield nested_item
         else:
             yield item
+
+
+def _parse_size(size):
+    """Convert a size given as number of bytes or as a string like
+    ``'10 GB'`` to an integer number of bytes. ``None`` and non-positive
+    values mean that there is no limit."""
+    if size is None:
+        return None
+    if isinstance(size, u.Quantity):
+        size = size.to(u.byte).value
+    else:
+        try:
+            size = float(size)
+        except ValueError:
+            size = u.Quantity(size).to(u.byte).value
+    if size <= 0:
+        return None
+    return int(size)
+
+
+def _replace(src, dst):
+    """Rename ``src`` to ``dst``, overwriting ``dst`` also on Windows."""
+    if os.name == 'nt' and os.path.exists(dst):
+        os.remove(dst)
+    os.rename(src, dst)
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark typical queries of `sunpy.database.Database` on a synthetic database.
+
+The script fills an SQLite database with random entries, each with a few FITS
+header entries, and times a set of queries three times: without any secondary
+index, with the indexes declared in `sunpy.database.tables` and additionally
+with the R*Tree index over time and wavelength. Usage::
+
+    python tools/bench_database.py --rows 1000000 --path /tmp/bench.sqlite
+
+Filling a database with 10^6 rows takes a few minutes, so an existing file is
+reused if it has the requested number of rows.
+"""
+from __future__ import absolute_import, division, print_function
+
+import os
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+import astropy.units as u
+import sqlalchemy
+
+from sunpy.database import Database, attrs, tables
+from sunpy.net.vso import attrs as vso_attrs
+
+INSTRUMENTS = ['AIA', 'EIT', 'HMI', 'LASCO', 'SWAP', 'XRT', 'EUVI', 'MDI']
+WAVELENGTHS = [94, 131, 171, 193, 211, 304, 335, 1600, 1700, 4500, 6173]
+START = datetime(2010, 1, 1)
+SECONDS = 5 * 365 * 86400
+
+
+def fill(engine, rows, batch_size=20000):
+    random.seed(0)
+    data = tables.DatabaseEntry.__table__
+    headers = tables.FitsHeaderEntry.__table__
+    header_id = 1
+    with engine.begin() as connection:
+        for first in range(1, rows + 1, batch_size):
+            data_rows, header_rows = [], []
+            for entry_id in range(first, min(first + batch_size, rows + 1)):
+                start = START + timedelta(seconds=random.randrange(SECONDS))
+                instrument = random.choice(INSTRUMENTS)
+                wave = random.choice(WAVELENGTHS)
+                data_rows.append({
+                    'id': entry_id, 'instrument': instrument,
+                    'observation_time_start': start,
+                    'observation_time_end': start + timedelta(seconds=12),
+                    'wavemin': wave, 'wavemax': wave,
+                    'path': '/archive/{0}/{1}.fits'.format(instrument, entry_id),
+                    'starred': False})
+                for key, value in [('INSTRUME', instrument),
+                                   ('WAVELNTH', str(wave)),
+                                   ('EXPTIME', str(random.choice([1, 2, 3])))]:
+                    header_rows.append({'id': header_id, 'dbentry_id': entry_id,
+                                        'key': key, 'value': value})
+                    header_id += 1
+            connection.execute(data.insert(), data_rows)
+            connection.execute(headers.insert(), header_rows)
+
+
+def drop_indexes(engine):
+    for table in tables.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.drop(engine)
+
+
+def queries():
+    day = vso_attrs.Time('2012-03-04', '2012-03-05')
+    # shorter than the rounding of the R*Tree if it stored Julian days
+    minutes = vso_attrs.Time('2012-03-04 12:00', '2012-03-04 12:10')
+    return [
+        ('one day', [day]),
+        ('ten minutes', [minutes]),
+        ('ten minutes, instrument', [minutes, vso_attrs.Instrument('AIA')]),
+        ('one day, instrument', [day, vso_attrs.Instrument('AIA')]),
+        ('one day, wavelength', [day, vso_attrs.Wavelength(170 * u.AA,
+                                                           200 * u.AA)]),
+        ('instrument, first 100', [vso_attrs.Instrument('SWAP')],
+         {'limit': 100}),
+        ('FITS header entry', [attrs.FitsHeaderEntry('WAVELNTH', '6173'),
+                               day]),
+    ]
+
+
+def run(database, repeat):
+    for query in queries():
+        name, attributes = query[:2]
+        kwargs = query[2] if len(query) > 2 else {}
+        timings = []
+        for _ in range(repeat):
+            database.session.expunge_all()
+            begin = time.time()
+            result = database.query(*attributes, **kwargs)
+            timings.append(time.time() - begin)
+        print('  {0:<25} {1:>7} rows {2:>10.4f} s'.format(
+            name, len(result), min(timings)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=10 ** 6)
+    parser.add_argument('--path', default='bench_database.sqlite')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    url = 'sqlite:///' + os.path.abspath(args.path)
+    engine = sqlalchemy.create_engine(url)
+    tables.Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        # start without the R*Tree index of a previous run
+        for statement in ['DROP TRIGGER IF EXISTS data_rtree_insert',
+                          'DROP TRIGGER IF EXISTS data_rtree_update',
+                          'DROP TRIGGER IF EXISTS data_rtree_delete',
+                          'DROP TABLE IF EXISTS data_rtree']:
+            connection.execute(statement)
+    drop_indexes(engine)
+    count = engine.execute('SELECT count(*) FROM data').scalar()
+    if count != args.rows:
+        print('filling the database with {0} rows'.format(args.rows))
+        for table in reversed(tables.Base.metadata.sorted_tables):
+            engine.execute(table.delete())
+        fill(engine, args.rows)
+        engine.execute('ANALYZE')
+
+    # opening the database creates the declared indexes, so they are only
+    # dropped afterwards
+    database = Database(url)
+    drop_indexes(engine)
+    print('without secondary indexes')
+    run(database, args.repeat)
+
+    print('with secondary indexes')
+    database._create_missing_indexes()
+    database.session.execute('ANALYZE')
+    run(database, args.repeat)
+
+    print('with R*Tree index')
+    database._rtree = database._create_rtree(True)
+    run(database, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark parsing a year of EVE Level 0CS files.
+
+The script writes one synthetic 0CS file per day, each with 1440 one-minute
+rows and the header of the truncated test file shipped with sunpy, and times
+reading all of them with `sunpy.timeseries.sources.eve.EVESpWxTimeSeries`.
+With ``--compare`` the files are also read with the previous parser, which
+used the python engine of `pandas.read_csv` and built the index by calling
+`datetime.datetime` for every row. Usage::
+
+    python tools/bench_eve.py --days 365 --path /tmp/eve --compare
+
+Existing files in ``--path`` are reused.
+"""
+from __future__ import absolute_import, division, print_function
+
+import os
+import time
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+from pandas.io.parsers import read_csv
+
+from sunpy.data.test import rootdir
+from sunpy.timeseries.sources.eve import EVESpWxTimeSeries
+
+TEMPLATE = os.path.join(rootdir, 'EVE_L0CS_DIODES_1m_truncated.txt')
+START = datetime(2016, 1, 1)
+
+
+def read_template():
+    header, rows = [], []
+    with open(TEMPLATE) as fp:
+        for line in fp:
+            if line.startswith(';'):
+                header.append(line)
+            elif len(line.split()) > 4:
+                rows.append(line.split()[1:])
+    return header, rows
+
+
+def fill(path, days):
+    header, rows = read_template()
+    random = np.random.RandomState(0)
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    filenames = []
+    for day in range(days):
+        date = START + timedelta(days=day)
+        filename = os.path.join(
+            path, '{0:%Y%m%d}_EVE_L0CS_DIODES_1m.txt'.format(date))
+        filenames.append(filename)
+        if os.path.exists(filename):
+            continue
+        with open(filename, 'w') as fp:
+            fp.writelines(header)
+            fp.write('{0:%Y %j %m %d}\n'.format(date))
+            for minute in range(1440):
+                values = rows[random.randint(len(rows))]
+                fp.write('{0:02d}{1:02d}  {2}\n'.format(
+                    minute // 60, minute % 60, '  '.join(values)))
+    return filenames
+
+
+def parse_previous(fp):
+    """The parser as it was before the C engine and the integer index."""
+    fields = []
+    line = fp.readline()
+    while line.startswith(';'):
+        fields.append(line)
+        line = fp.readline()
+    start = fields.index('; Column descriptions:\n') + 1
+    stop = fields.index('; Format:\n')
+    fields = [hline.split(':')[0].replace(';', ' ').strip()
+              for hline in fields[start:stop]]
+    date_parts = line.split(' ')
+    year, month, day = (int(date_parts[0]), int(date_parts[2]),
+                        int(date_parts[3]))
+    parser = lambda x: datetime(year, month, day, int(x[0:2]), int(x[2:4]))
+    return read_csv(fp, sep='\s*', names=fields, index_col=0,
+                    date_parser=parser, header=None, engine='python')
+
+
+def run(name, parse, filenames, repeat):
+    timings = []
+    for _ in range(repeat):
+        begin = time.time()
+        for filename in filenames:
+            with open(filename) as fp:
+                parse(fp)
+        timings.append(time.time() - begin)
+    print('  {0:<10} {1:>5} files {2:>10.3f} s'.format(
+        name, len(filenames), min(timings)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--path', default='bench_eve')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--compare', action='store_true')
+    args = parser.parse_args()
+
+    filenames = fill(args.path, args.days)
+    run('current', EVESpWxTimeSeries._parse_level_0cs, filenames, args.repeat)
+    if args.compare:
+        run('previous', parse_previous, filenames, args.repeat)
+
+
+if __name__ == '__main__':
+    main()